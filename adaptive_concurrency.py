@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Adaptive per-endpoint concurrency for the shared HTTP client
+Each (method, endpoint) gets an AIMD limit on requests in flight: every clean response
+adds increase/limit (about +increase per round trip of the whole window), and a congested
+one multiplies the limit by backoff, at most once per window so a burst of failures from
+the same round trip only counts once. A response is congested when it errors (exception,
+429 or 5xx), when the smoothed latency exceeds latency_tolerance times the lowest smoothed
+latency seen recently, or when the body reports degraded output: Stage A photo analyses
+that fell back to their 'error: true' stub, or a Stage B fallback report.
+"""
+
+import json
+import math
+import threading
+import time
+from collections import deque
+
+DEFAULT_INITIAL_LIMIT = 4
+DEFAULT_MIN_LIMIT = 1
+DEFAULT_MAX_LIMIT = 64
+DEFAULT_INCREASE = 1.0
+DEFAULT_BACKOFF = 0.7
+DEFAULT_LATENCY_TOLERANCE = 2.0
+
+# Smoothing for the latency signal; per-request size differences (photo counts) average out
+LATENCY_ALPHA = 0.2
+BASELINE_WINDOW = 200
+
+
+def degraded_outputs(response):
+    """Number of fallback analyses reported in a generate-report style JSON body"""
+    if b'error' not in response.content or 'json' not in response.headers.get('Content-Type', ''):
+        return 0
+    try:
+        body = json.loads(response.content)
+    except ValueError:
+        return 0
+    if not isinstance(body, dict):
+        return 0
+    debug = body.get('debug') or {}
+    if 'stage_a_errors' in debug:
+        return debug['stage_a_errors'] + bool(debug.get('stage_b_error'))
+    raw = (body.get('report') or {}).get('raw_json') or body
+    stage_a = raw.get('stage_a') or []
+    stage_b = raw.get('stage_b') or {}
+    return (sum(1 for analysis in stage_a if isinstance(analysis, dict) and analysis.get('error') is True)
+            + (isinstance(stage_b, dict) and stage_b.get('error') is True))
+
+
+class AimdLimiter:
+    """AIMD limit on concurrent requests to one endpoint"""
+
+    def __init__(self, initial_limit=DEFAULT_INITIAL_LIMIT, min_limit=DEFAULT_MIN_LIMIT,
+                 max_limit=DEFAULT_MAX_LIMIT, increase=DEFAULT_INCREASE, backoff=DEFAULT_BACKOFF,
+                 latency_tolerance=DEFAULT_LATENCY_TOLERANCE):
+        self.limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.in_flight = 0
+        self.last_decrease = 0.0
+        self.smoothed = None
+        self.recent = deque(maxlen=BASELINE_WINDOW)
+        self.counts = {'requests': 0, 'errors': 0, 'degraded': 0, 'slow': 0, 'decreases': 0}
+        self.peak_limit = self.limit
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        """Block until a slot is free; returns the start time to hand back to release()"""
+        with self.condition:
+            while self.in_flight >= math.floor(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+            return time.monotonic()
+
+    def try_acquire(self):
+        """Take a slot if one is free right now; returns the start time, or None"""
+        with self.condition:
+            if self.in_flight >= math.floor(self.limit):
+                return None
+            self.in_flight += 1
+            return time.monotonic()
+
+    def release_response(self, started, response):
+        """Release a slot, judging congestion from the response (None when the call raised)"""
+        error = response is None or response.status_code == 429 or response.status_code >= 500
+        self.release(started, error=error, degraded=0 if error else degraded_outputs(response))
+
+    def release(self, started, error=False, degraded=0):
+        latency = time.monotonic() - started
+        with self.condition:
+            self.in_flight -= 1
+            self.counts['requests'] += 1
+            self.counts['errors'] += bool(error)
+            self.counts['degraded'] += bool(degraded)
+            slow = False
+            if not error:
+                self.smoothed = latency if self.smoothed is None else (
+                    LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * self.smoothed)
+                self.recent.append(self.smoothed)
+                slow = (self.latency_tolerance is not None
+                        and self.smoothed > self.latency_tolerance * min(self.recent))
+                self.counts['slow'] += slow
+
+            if error or degraded or slow:
+                # Requests sent before the last decrease saw the old limit; don't punish it twice
+                if started >= self.last_decrease:
+                    self.limit = max(self.min_limit, self.limit * self.backoff)
+                    self.last_decrease = time.monotonic()
+                    self.counts['decreases'] += 1
+                    # The latency baseline restarts at the new, lower load
+                    self.recent.clear()
+            else:
+                self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+                self.peak_limit = max(self.peak_limit, self.limit)
+            self.condition.notify_all()
+
+    def snapshot(self):
+        with self.condition:
+            return dict(self.counts, limit=round(self.limit, 2), peak_limit=round(self.peak_limit, 2),
+                        in_flight=self.in_flight)
+
+
+class AdaptiveConcurrency:
+    """One AimdLimiter per (method, endpoint), created on first use"""
+
+    def __init__(self, **options):
+        self.options = options
+        self.limiters = {}
+        self.lock = threading.Lock()
+
+    def limiter(self, method, endpoint):
+        key = (method.upper(), endpoint)
+        with self.lock:
+            limiter = self.limiters.get(key)
+            if limiter is None:
+                limiter = self.limiters[key] = AimdLimiter(**self.options)
+            return limiter
+
+    def to_dict(self):
+        with self.lock:
+            items = sorted(self.limiters.items(), key=lambda kv: kv[0][1])
+        return {'endpoints': [dict(limiter.snapshot(), method=method, endpoint=endpoint)
+                              for (method, endpoint), limiter in items]}
+
+    def print_summary(self):
+        endpoints = self.to_dict()['endpoints']
+        if not endpoints:
+            return
+        print(f"\n🎚️  Adaptive concurrency per endpoint")
+        print(f"   {'method':<6} {'calls':>5} {'limit':>6} {'peak':>6} {'cuts':>5} {'err':>4} {'degr':>5} "
+              f"{'slow':>5}  endpoint")
+        for e in endpoints:
+            print(f"   {e['method']:<6} {e['requests']:>5} {e['limit']:>6.1f} {e['peak_limit']:>6.1f} "
+                  f"{e['decreases']:>5} {e['errors']:>4} {e['degraded']:>5} {e['slow']:>5}  {e['endpoint']}")
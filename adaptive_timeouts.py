@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Adaptive timeouts and hedged GETs for the shared HTTP client
+Learns each (method, endpoint)'s latency from individual attempts and, once an idempotent
+endpoint has enough samples, replaces the caller's fixed read timeout with
+timeout_multiplier x p99 (never above the caller's value, never below min_timeout). With
+hedging on, an idempotent request that has not answered by its endpoint's p95 gets one
+duplicate on another connection and the first response wins. Hedges draw from a budget of
+max_hedge_ratio per request, so a slow endpoint adds at most that share of extra load.
+POST, PATCH and other non-idempotent methods keep the caller's timeout and are never hedged
+(a timed-out POST may still have taken effect), nor is a request whose body cannot be sent twice.
+
+With adaptive concurrency also enabled, a hedge needs a free slot under its endpoint's AIMD
+limit (it is skipped otherwise) and its outcome feeds the limit like any other request. The
+losing attempt cannot be aborted mid-flight: it runs on in the background, bounded by its
+read timeout, holding a hedge worker (and, for a hedge, its concurrency slot) until it ends.
+
+Latencies exported by a previous run (--latency-json) can seed the learner, so short suites
+get learned timeouts from their first call.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import requests
+
+from latency_histogram import LatencyRecorder, histogram_from_dict
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_TIMEOUT_MULTIPLIER = 3.0
+DEFAULT_MIN_TIMEOUT = 1.0
+DEFAULT_HEDGE_PERCENTILE = 95
+DEFAULT_MAX_HEDGE_RATIO = 0.1
+
+# Hedge tokens banked at most, so a long quiet stretch can't fund a burst of duplicates
+MAX_HEDGE_TOKENS = 10
+
+# Attempts running at once across all hedged calls (primaries and duplicates)
+HEDGE_WORKERS = 64
+
+# Transport failures on the requests path (RequestException is an OSError) and the httpx path
+TRANSPORT_ERRORS = (OSError,)
+TIMEOUT_ERRORS = (TimeoutError, requests.exceptions.Timeout)
+if httpx is not None:
+    TRANSPORT_ERRORS += (httpx.TransportError,)
+    TIMEOUT_ERRORS += (httpx.TimeoutException,)
+
+
+def replayable(kwargs):
+    """True when the request carries no body that may be a one-shot stream"""
+    return all(kwargs.get(name) is None for name in ('data', 'files', 'content'))
+
+
+class AdaptiveTimeouts:
+    """Per-endpoint learned timeouts and the hedging policy built on them"""
+
+    def __init__(self, hedge=False, min_samples=DEFAULT_MIN_SAMPLES, timeout_multiplier=DEFAULT_TIMEOUT_MULTIPLIER,
+                 min_timeout=DEFAULT_MIN_TIMEOUT, hedge_percentile=DEFAULT_HEDGE_PERCENTILE,
+                 max_hedge_ratio=DEFAULT_MAX_HEDGE_RATIO):
+        self.hedge = hedge
+        self.min_samples = min_samples
+        self.timeout_multiplier = timeout_multiplier
+        self.min_timeout = min_timeout
+        self.hedge_percentile = hedge_percentile
+        self.max_hedge_ratio = max_hedge_ratio
+        self.latency = LatencyRecorder()
+        self.hedge_tokens = 1.0
+        self.counts = {}
+        self.lock = threading.Lock()
+        self._executor = None
+
+    def seed(self, path):
+        """Merge per-endpoint histograms exported by http_client.export_timings (HDR or sketch)"""
+        with open(path) as f:
+            endpoints = json.load(f).get('endpoints', [])
+        for entry in endpoints:
+            self.latency.merge_histogram(entry['method'], entry['endpoint'], histogram_from_dict(entry))
+        return len(endpoints)
+
+    def _incr(self, key, name):
+        with self.lock:
+            counts = self.counts.setdefault(key, {'requests': 0, 'learned': 0, 'timeouts': 0, 'errors': 0,
+                                                  'hedged': 0, 'hedge_wins': 0, 'hedges_skipped': 0})
+            counts[name] += 1
+
+    def _percentile_seconds(self, key, q):
+        """Learned percentile in seconds, or None while the endpoint has too few samples"""
+        with self.latency.lock:
+            histogram = self.latency.histograms.get(key)
+            if histogram is None or histogram.total < self.min_samples:
+                return None
+            return histogram.percentile(q) / 1e6
+
+    def timeout_for(self, key, timeout):
+        """The caller's (connect, read) timeout with the read part lowered to the learned bound"""
+        p99 = self._percentile_seconds(key, 99)
+        if p99 is None or timeout is None:
+            return timeout
+        connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        learned = max(self.min_timeout, p99 * self.timeout_multiplier)
+        if read is not None and learned >= read:
+            return timeout
+        self._incr(key, 'learned')
+        return connect, learned
+
+    def hedge_delay(self, key, method, kwargs):
+        """Seconds to wait before hedging this request, or None when it must not be hedged"""
+        if not self.hedge or method.upper() not in IDEMPOTENT_METHODS or not replayable(kwargs):
+            return None
+        with self.lock:
+            self.hedge_tokens = min(MAX_HEDGE_TOKENS, self.hedge_tokens + self.max_hedge_ratio)
+        return self._percentile_seconds(key, self.hedge_percentile)
+
+    def _take_hedge_token(self):
+        with self.lock:
+            if self.hedge_tokens < 1:
+                return False
+            self.hedge_tokens -= 1
+            return True
+
+    def send(self, key, method, send, timeout, kwargs, limiter=None):
+        """Run send(timeout) with the learned timeout, hedging it when allowed; returns the response
+
+        limiter is the endpoint's AimdLimiter when adaptive concurrency is on; the caller already
+        holds a slot for the primary attempt, and a hedge must take one of its own.
+        """
+        self._incr(key, 'requests')
+        if method.upper() in IDEMPOTENT_METHODS:
+            timeout = self.timeout_for(key, timeout)
+
+        def attempt():
+            start = time.perf_counter()
+            try:
+                response = send(timeout)
+            except TRANSPORT_ERRORS as e:
+                # Censored at the failure, but a timeout is still evidence the endpoint can be this slow
+                self.latency.record(*key, time.perf_counter() - start, error=True)
+                self._incr(key, 'timeouts' if isinstance(e, TIMEOUT_ERRORS) else 'errors')
+                raise
+            self.latency.record(*key, time.perf_counter() - start)
+            return response
+
+        delay = self.hedge_delay(key, method, kwargs)
+        if delay is None:
+            return attempt()
+
+        primary = self.executor().submit(attempt)
+        try:
+            return primary.result(timeout=delay)
+        except FutureTimeout:
+            pass
+        if not self._take_hedge_token():
+            return primary.result()
+        slot = limiter.try_acquire() if limiter is not None else None
+        if limiter is not None and slot is None:
+            self._incr(key, 'hedges_skipped')
+            return primary.result()
+
+        def hedge_attempt():
+            response = None
+            try:
+                response = attempt()
+                return response
+            finally:
+                if limiter is not None:
+                    limiter.release_response(slot, response)
+
+        self._incr(key, 'hedged')
+        hedge = self.executor().submit(hedge_attempt)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self._incr(key, 'hedge_wins')
+                    # A loser still queued never starts; a running one finishes in the background
+                    for loser in pending:
+                        loser.cancel()
+                    return future.result()
+        return primary.result()
+
+    def executor(self):
+        with self.lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix='hedge')
+            return self._executor
+
+    def to_dict(self):
+        with self.lock:
+            counts = sorted(self.counts.items(), key=lambda kv: kv[0][1])
+        endpoints = []
+        for key, c in counts:
+            p95, p99 = self._percentile_seconds(key, self.hedge_percentile), self._percentile_seconds(key, 99)
+            if key[0] not in IDEMPOTENT_METHODS:
+                p95 = p99 = None
+            endpoints.append(dict(c, method=key[0], endpoint=key[1],
+                                  hedge_after_s=p95 if self.hedge else None,
+                                  read_timeout_s=None if p99 is None else max(self.min_timeout,
+                                                                              p99 * self.timeout_multiplier)))
+        return {'hedge': self.hedge, 'endpoints': endpoints}
+
+    def print_summary(self):
+        endpoints = self.to_dict()['endpoints']
+        if not endpoints:
+            return
+        print(f"\n⏳ Adaptive timeouts{' and hedging' if self.hedge else ''} per endpoint")
+        print(f"   {'method':<6} {'calls':>5} {'timeout':>8} {'t/o':>4} {'err':>4} {'hedge@':>8} {'hedged':>6} "
+              f"{'won':>4}  endpoint")
+        for e in endpoints:
+            timeout = f"{e['read_timeout_s']:.2f}s" if e['read_timeout_s'] is not None else 'fixed'
+            hedge_at = f"{e['hedge_after_s'] * 1000:.0f}ms" if e['hedge_after_s'] is not None else '-'
+            print(f"   {e['method']:<6} {e['requests']:>5} {timeout:>8} {e['timeouts']:>4} {e['errors']:>4} {hedge_at:>8} "
+                  f"{e['hedged']:>6} {e['hedge_wins']:>4}  {e['endpoint']}")
@@ -276,6 +276,9 @@ async function generateDailyReport(request) {
       gc_markdown: gcMd,
       debug: {
         photos_analyzed: photos.length,
+        // Photos whose Stage A call fell back to a stub, and whether Stage B did
+        stage_a_errors: photoAnalyses.filter(analysis => analysis.error).length,
+        stage_b_error: !!reportData.error,
         weather_included: !!weather,
         model_used: 'gemini-2.0-flash-exp',
         mode: clientPhotos ? 'demo' : 'production'
@@ -653,7 +656,8 @@ async function geminiHealth() {
     const genAI = new GoogleGenerativeAI(process.env.GEMINI_API_KEY)
     
     // Simple test
-    const model = genAI.getGenerativeModel({ model: process.env.GEMINI_MODEL || 'gemini-2.0-flash-exp' })
+    const requestOptions = process.env.GEMINI_BASE_URL ? { baseUrl: process.env.GEMINI_BASE_URL } : {}
+    const model = genAI.getGenerativeModel({ model: process.env.GEMINI_MODEL || 'gemini-2.0-flash-exp' }, requestOptions)
     const result = await model.generateContent('Hello')
     const response = result.response.text()
     
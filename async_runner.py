@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Concurrent check runner for the SiteRecap test scripts
+Runs independent blocking checks on worker threads under an asyncio semaphore,
+buffering each check's printed output so the report still reads in order
+"""
+
+import asyncio
+import io
+import sys
+import threading
+
+DEFAULT_CONCURRENCY = 8
+
+
+class _ThreadLocalStdout:
+    """sys.stdout proxy that sends writes from capturing threads to their own buffer"""
+
+    def __init__(self, target):
+        self.target = target
+        self.local = threading.local()
+
+    def capture(self):
+        self.local.buffer = io.StringIO()
+
+    def release(self):
+        buffer = getattr(self.local, 'buffer', None)
+        self.local.buffer = None
+        return buffer.getvalue() if buffer else ''
+
+    def write(self, text):
+        buffer = getattr(self.local, 'buffer', None)
+        return (buffer or self.target).write(text)
+
+    def flush(self):
+        if not getattr(self.local, 'buffer', None):
+            self.target.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.target, name)
+
+
+_install_lock = threading.Lock()
+
+
+def _stdout_proxy():
+    """Install the stdout proxy once; nested runners share it"""
+    with _install_lock:
+        if not isinstance(sys.stdout, _ThreadLocalStdout):
+            sys.stdout = _ThreadLocalStdout(sys.stdout)
+        return sys.stdout
+
+
+def _captured_call(proxy, name, check):
+    """Run one check on a worker thread, returning (result, printed output)"""
+    proxy.capture()
+    try:
+        result = check()
+    except Exception as e:
+        print(f"❌ {name} raised: {str(e)}")
+        result = False
+    return result, proxy.release()
+
+
+async def _run_checks(checks, concurrency):
+    proxy = _stdout_proxy()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_one(name, check):
+        async with semaphore:
+            return await asyncio.to_thread(_captured_call, proxy, name, check)
+
+    tasks = [asyncio.create_task(run_one(name, check)) for name, check in checks]
+
+    # Checks run concurrently, but output is replayed in schedule order
+    results = []
+    for (name, _), task in zip(checks, tasks):
+        result, output = await task
+        sys.stdout.write(output)
+        results.append((name, result))
+    return results
+
+
+def run_checks(checks, concurrency=DEFAULT_CONCURRENCY):
+    """Run independent (name, callable) checks concurrently and return [(name, result)] in order"""
+    return asyncio.run(_run_checks(list(checks), concurrency))
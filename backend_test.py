@@ -5,28 +5,27 @@ Tests the complete signup flow with custom email backup solution as requested in
 Focus: Supabase signup process, custom email fallback, complete email confirmation flow, logging and debugging
 """
 
-import requests
+import argparse
 import json
 import os
 import sys
 from datetime import datetime
+from functools import partial
+
+import env_config
+import http_client
+import target_compare
+from async_runner import DEFAULT_CONCURRENCY, run_checks
+from source_checks import SourceChecks, ci
 
 # Get base URL from environment
 def get_base_url():
     """Get the base URL for testing from environment variables"""
-    # Read from .env file
-    env_vars = {}
-    try:
-        with open('/app/.env', 'r') as f:
-            for line in f:
-                if '=' in line and not line.strip().startswith('#'):
-                    key, value = line.strip().split('=', 1)
-                    env_vars[key] = value
-    except FileNotFoundError:
+    if not env_config.get_config().exists():
         print("❌ .env file not found")
         return None
     
-    base_url = env_vars.get('NEXT_PUBLIC_BASE_URL', 'https://siterecap.com')
+    base_url = env_config.get_base_url()
     print(f"🌐 Using base URL: {base_url}")
     return base_url
 
@@ -46,6 +45,52 @@ print(f"🏠 Local URL: {LOCAL_BASE_URL}")
 BASE_URL = LOCAL_BASE_URL
 API_BASE = f"{BASE_URL}/api"
 
+# Source files inspected by the configuration checks
+SUPABASE_LIB = '/app/lib/supabase.js'
+LOGIN_PAGE = '/app/app/login/page.js'
+AUTH_CALLBACK_ROUTE = '/app/app/auth/callback/route.js'
+AUTH_SUCCESS_PAGE = '/app/app/auth/success/page.js'
+SEND_CONFIRMATION_ROUTE = '/app/app/api/send-confirmation/route.js'
+RESEND_CONFIRMATION_ROUTE = '/app/app/api/resend-confirmation/route.js'
+
+# Every file is read once and all of its patterns are matched in a single pass
+SOURCE_CHECKS = SourceChecks()
+
+SOURCE_CHECKS.add('config_checks', 'createClient import', (SUPABASE_LIB, 'createClient'))
+SOURCE_CHECKS.add('config_checks', 'NEXT_PUBLIC_SUPABASE_URL', (SUPABASE_LIB, 'NEXT_PUBLIC_SUPABASE_URL'))
+SOURCE_CHECKS.add('config_checks', 'NEXT_PUBLIC_SUPABASE_ANON_KEY', (SUPABASE_LIB, 'NEXT_PUBLIC_SUPABASE_ANON_KEY'))
+SOURCE_CHECKS.add('config_checks', 'SUPABASE_SERVICE_KEY', (SUPABASE_LIB, 'SUPABASE_SERVICE_KEY'))
+SOURCE_CHECKS.add('config_checks', 'supabase export', (SUPABASE_LIB, 'export const supabase'))
+SOURCE_CHECKS.add('config_checks', 'supabaseAdmin export', (SUPABASE_LIB, 'export const supabaseAdmin'))
+
+SOURCE_CHECKS.add('signup_checks', 'Supabase auth import', (LOGIN_PAGE, 'supabase'), (LOGIN_PAGE, 'auth'))
+SOURCE_CHECKS.add('signup_checks', 'signUp function', (LOGIN_PAGE, 'signUp'))
+SOURCE_CHECKS.add('signup_checks', 'emailRedirectTo', (LOGIN_PAGE, 'emailRedirectTo'))
+SOURCE_CHECKS.add('signup_checks', 'siterecap.com redirect', (LOGIN_PAGE, 'siterecap.com/auth/callback'))
+SOURCE_CHECKS.add('signup_checks', 'resend confirmation', (LOGIN_PAGE, 'resend-confirmation'))
+
+SOURCE_CHECKS.add('signup_config_checks', 'Supabase auth import', (LOGIN_PAGE, 'supabase.auth.signUp'))
+SOURCE_CHECKS.add('signup_config_checks', 'Email redirect configuration', (LOGIN_PAGE, 'emailRedirectTo'))
+SOURCE_CHECKS.add('signup_config_checks', 'Production URL redirect', (LOGIN_PAGE, 'https://siterecap.com/auth/callback'))
+SOURCE_CHECKS.add('signup_config_checks', 'Custom email backup logic', (LOGIN_PAGE, 'resend-confirmation'))
+SOURCE_CHECKS.add('signup_config_checks', 'Console logging', (LOGIN_PAGE, 'console.log'), (LOGIN_PAGE, ci('signup')))
+
+SOURCE_CHECKS.add('confirmation_flow_checks', 'Auth callback route exists', (AUTH_CALLBACK_ROUTE, 'exchangeCodeForSession'))
+SOURCE_CHECKS.add('confirmation_flow_checks', 'Token hash handling', (AUTH_CALLBACK_ROUTE, 'token_hash'))
+SOURCE_CHECKS.add('confirmation_flow_checks', 'Redirect to auth/success', (AUTH_CALLBACK_ROUTE, '/auth/success'))
+SOURCE_CHECKS.add('confirmation_flow_checks', 'Session token passing',
+                  (AUTH_CALLBACK_ROUTE, 'access_token'), (AUTH_CALLBACK_ROUTE, 'refresh_token'))
+SOURCE_CHECKS.add('confirmation_flow_checks', 'Auth success page exists', (AUTH_SUCCESS_PAGE, 'setSession'))
+SOURCE_CHECKS.add('confirmation_flow_checks', 'Dashboard redirect', (AUTH_SUCCESS_PAGE, '/dashboard'))
+SOURCE_CHECKS.add('confirmation_flow_checks', 'Error handling',
+                  (AUTH_CALLBACK_ROUTE, ci('error')), (AUTH_SUCCESS_PAGE, ci('error')))
+
+SOURCE_CHECKS.add('debug_checks', 'Login page signup logging', (LOGIN_PAGE, 'console.log'), (LOGIN_PAGE, ci('signup')))
+SOURCE_CHECKS.add('debug_checks', 'Auth callback logging', (AUTH_CALLBACK_ROUTE, 'console.log'))
+SOURCE_CHECKS.add('debug_checks', 'Auth success logging', (AUTH_SUCCESS_PAGE, 'console.log'))
+SOURCE_CHECKS.add('debug_checks', 'Send confirmation logging', (SEND_CONFIRMATION_ROUTE, ci('console')))
+SOURCE_CHECKS.add('debug_checks', 'Resend confirmation logging', (RESEND_CONFIRMATION_ROUTE, ci('console')))
+
 def print_test_header(test_name):
     print(f"\n{'='*60}")
     print(f"🧪 {test_name}")
@@ -66,7 +111,7 @@ def test_email_configuration():
     
     try:
         print(f"🔍 Testing GET {API_BASE}/test-email")
-        response = requests.get(f"{API_BASE}/test-email", timeout=30)
+        response = http_client.get(f"{API_BASE}/test-email")
         print(f"📊 Status Code: {response.status_code}")
         
         if response.status_code == 200:
@@ -109,11 +154,10 @@ def test_email_sending():
     try:
         print(f"🔍 Testing POST {API_BASE}/test-email")
         payload = {"email": test_email}
-        response = requests.post(
+        response = http_client.post(
             f"{API_BASE}/test-email", 
             json=payload,
-            headers={'Content-Type': 'application/json'},
-            timeout=30
+            headers={'Content-Type': 'application/json'}
         )
         
         print(f"📊 Status Code: {response.status_code}")
@@ -157,11 +201,10 @@ def test_send_confirmation():
             "email": test_email,
             "confirmationUrl": confirmation_url
         }
-        response = requests.post(
+        response = http_client.post(
             f"{API_BASE}/send-confirmation", 
             json=payload,
-            headers={'Content-Type': 'application/json'},
-            timeout=30
+            headers={'Content-Type': 'application/json'}
         )
         
         print(f"📊 Status Code: {response.status_code}")
@@ -201,11 +244,10 @@ def test_resend_confirmation():
     try:
         print(f"🔍 Testing POST {API_BASE}/resend-confirmation")
         payload = {"email": test_email}
-        response = requests.post(
+        response = http_client.post(
             f"{API_BASE}/resend-confirmation", 
             json=payload,
-            headers={'Content-Type': 'application/json'},
-            timeout=30
+            headers={'Content-Type': 'application/json'}
         )
         
         print(f"📊 Status Code: {response.status_code}")
@@ -246,11 +288,10 @@ def test_error_handling():
     # Test 1: POST /api/test-email without email parameter
     print("🔍 Testing POST /api/test-email without email parameter")
     try:
-        response = requests.post(
+        response = http_client.post(
             f"{API_BASE}/test-email", 
             json={},
-            headers={'Content-Type': 'application/json'},
-            timeout=30
+            headers={'Content-Type': 'application/json'}
         )
         
         if response.status_code == 400:
@@ -264,11 +305,10 @@ def test_error_handling():
     # Test 2: POST /api/send-confirmation without required parameters
     print("\n🔍 Testing POST /api/send-confirmation without confirmationUrl")
     try:
-        response = requests.post(
+        response = http_client.post(
             f"{API_BASE}/send-confirmation", 
             json={"email": "test@example.com"},  # Missing confirmationUrl
-            headers={'Content-Type': 'application/json'},
-            timeout=30
+            headers={'Content-Type': 'application/json'}
         )
         
         if response.status_code == 400:
@@ -282,11 +322,10 @@ def test_error_handling():
     # Test 3: POST /api/resend-confirmation without email parameter
     print("\n🔍 Testing POST /api/resend-confirmation without email parameter")
     try:
-        response = requests.post(
+        response = http_client.post(
             f"{API_BASE}/resend-confirmation", 
             json={},
-            headers={'Content-Type': 'application/json'},
-            timeout=30
+            headers={'Content-Type': 'application/json'}
         )
         
         if response.status_code == 400:
@@ -307,18 +346,10 @@ def test_supabase_signup_flow():
     try:
         # Check Supabase configuration
         print("🔍 Checking Supabase configuration")
-        with open('/app/lib/supabase.js', 'r') as f:
-            supabase_config = f.read()
+        SOURCE_CHECKS.require('config_checks')
             
         # Check for required configuration elements
-        config_checks = [
-            ('createClient import', 'createClient' in supabase_config),
-            ('NEXT_PUBLIC_SUPABASE_URL', 'NEXT_PUBLIC_SUPABASE_URL' in supabase_config),
-            ('NEXT_PUBLIC_SUPABASE_ANON_KEY', 'NEXT_PUBLIC_SUPABASE_ANON_KEY' in supabase_config),
-            ('SUPABASE_SERVICE_KEY', 'SUPABASE_SERVICE_KEY' in supabase_config),
-            ('supabase export', 'export const supabase' in supabase_config),
-            ('supabaseAdmin export', 'export const supabaseAdmin' in supabase_config)
-        ]
+        config_checks = SOURCE_CHECKS.results('config_checks')
         
         all_config_good = True
         for check_name, check_result in config_checks:
@@ -330,16 +361,9 @@ def test_supabase_signup_flow():
         
         # Check login page signup configuration
         print("\n🔍 Checking login page signup configuration")
-        with open('/app/app/login/page.js', 'r') as f:
-            login_config = f.read()
+        SOURCE_CHECKS.require('signup_checks')
             
-        signup_checks = [
-            ('Supabase auth import', 'supabase' in login_config and 'auth' in login_config),
-            ('signUp function', 'signUp' in login_config),
-            ('emailRedirectTo', 'emailRedirectTo' in login_config),
-            ('siterecap.com redirect', 'siterecap.com/auth/callback' in login_config),
-            ('resend confirmation', 'resend-confirmation' in login_config)
-        ]
+        signup_checks = SOURCE_CHECKS.results('signup_checks')
         
         all_signup_good = True
         for check_name, check_result in signup_checks:
@@ -351,15 +375,14 @@ def test_supabase_signup_flow():
         
         # Check environment variables
         print("\n🔍 Checking email-related environment variables")
-        with open('/app/.env', 'r') as f:
-            env_content = f.read()
+        env_vars = env_config.get_config().load()
             
         env_checks = [
-            ('RESEND_API_KEY', 'RESEND_API_KEY=' in env_content),
-            ('EMAIL_FROM', 'EMAIL_FROM=support@siterecap.com' in env_content),
-            ('NEXT_PUBLIC_BASE_URL', 'NEXT_PUBLIC_BASE_URL=https://siterecap.com' in env_content),
-            ('NEXT_PUBLIC_SUPABASE_URL', 'NEXT_PUBLIC_SUPABASE_URL=' in env_content),
-            ('SUPABASE_SERVICE_KEY', 'SUPABASE_SERVICE_KEY=' in env_content)
+            ('RESEND_API_KEY', 'RESEND_API_KEY' in env_vars),
+            ('EMAIL_FROM', env_vars.get('EMAIL_FROM') == 'support@siterecap.com'),
+            ('NEXT_PUBLIC_BASE_URL', env_vars.get('NEXT_PUBLIC_BASE_URL') == 'https://siterecap.com'),
+            ('NEXT_PUBLIC_SUPABASE_URL', 'NEXT_PUBLIC_SUPABASE_URL' in env_vars),
+            ('SUPABASE_SERVICE_KEY', 'SUPABASE_SERVICE_KEY' in env_vars)
         ]
         
         all_env_good = True
@@ -386,7 +409,7 @@ def test_environment_variables():
     try:
         # Test debug-urls endpoint if available
         print(f"🔍 Testing GET {API_BASE}/debug-urls")
-        response = requests.get(f"{API_BASE}/debug-urls", timeout=30)
+        response = http_client.get(f"{API_BASE}/debug-urls")
         
         if response.status_code == 200:
             data = response.json()
@@ -427,7 +450,24 @@ def test_environment_variables():
         print_info("This is expected in production - environment variables will be checked via other endpoints")
         return True
 
-def test_complete_signup_flow():
+def check_auth_callback_case(test_name, test_url):
+    """Check a single auth callback scenario redirects to siterecap.com"""
+    try:
+        response = http_client.get(test_url, allow_redirects=False)
+        if response.status_code in [302, 307]:  # Redirect responses
+            redirect_location = response.headers.get('Location', '')
+            if 'siterecap.com' in redirect_location:
+                print_success(f"✓ {test_name} → Redirects to siterecap.com")
+                return True
+            print_error(f"✗ {test_name} → Redirects to wrong domain: {redirect_location}")
+            return False
+        print_error(f"✗ {test_name} → Unexpected status: {response.status_code}")
+        return False
+    except Exception as e:
+        print_error(f"✗ {test_name} → Error: {str(e)}")
+        return False
+
+def test_complete_signup_flow(concurrency=DEFAULT_CONCURRENCY):
     """Test the complete signup flow with custom email backup solution as requested in review"""
     print_test_header("COMPLETE SIGNUP FLOW TEST")
     
@@ -448,16 +488,9 @@ def test_complete_signup_flow():
     print("\n🔍 Step 1: Verifying Supabase signup process configuration")
     try:
         # Check if login page has proper signup configuration
-        with open('/app/app/login/page.js', 'r') as f:
-            login_content = f.read()
+        SOURCE_CHECKS.require('signup_config_checks')
             
-        signup_config_checks = [
-            ('Supabase auth import', 'supabase.auth.signUp' in login_content),
-            ('Email redirect configuration', 'emailRedirectTo' in login_content),
-            ('Production URL redirect', 'https://siterecap.com/auth/callback' in login_content),
-            ('Custom email backup logic', 'resend-confirmation' in login_content),
-            ('Console logging', 'console.log' in login_content and 'signup' in login_content.lower())
-        ]
+        signup_config_checks = SOURCE_CHECKS.results('signup_config_checks')
         
         signup_config_good = True
         for check_name, check_result in signup_config_checks:
@@ -478,11 +511,10 @@ def test_complete_signup_flow():
     try:
         # Test the resend-confirmation endpoint that acts as backup
         payload = {"email": test_email}
-        response = requests.post(
+        response = http_client.post(
             f"{API_BASE}/resend-confirmation", 
             json=payload,
-            headers={'Content-Type': 'application/json'},
-            timeout=30
+            headers={'Content-Type': 'application/json'}
         )
         
         if response.status_code == 200:
@@ -504,23 +536,10 @@ def test_complete_signup_flow():
     # Step 3: Test complete email confirmation flow components
     print("\n🔍 Step 3: Testing complete email confirmation flow components")
     try:
-        # Check auth callback route
-        with open('/app/app/auth/callback/route.js', 'r') as f:
-            callback_content = f.read()
-            
-        # Check auth success page
-        with open('/app/app/auth/success/page.js', 'r') as f:
-            success_content = f.read()
+        # Check auth callback route and auth success page
+        SOURCE_CHECKS.require('confirmation_flow_checks')
             
-        confirmation_flow_checks = [
-            ('Auth callback route exists', 'exchangeCodeForSession' in callback_content),
-            ('Token hash handling', 'token_hash' in callback_content),
-            ('Redirect to auth/success', '/auth/success' in callback_content),
-            ('Session token passing', 'access_token' in callback_content and 'refresh_token' in callback_content),
-            ('Auth success page exists', 'setSession' in success_content),
-            ('Dashboard redirect', '/dashboard' in success_content),
-            ('Error handling', 'error' in callback_content.lower() and 'error' in success_content.lower())
-        ]
+        confirmation_flow_checks = SOURCE_CHECKS.results('confirmation_flow_checks')
         
         confirmation_flow_good = True
         for check_name, check_result in confirmation_flow_checks:
@@ -539,38 +558,8 @@ def test_complete_signup_flow():
     # Step 4: Verify logging and debugging
     print("\n🔍 Step 4: Verifying logging and debugging implementation")
     try:
-        debug_checks = []
-        
-        # Check login page logging
-        with open('/app/app/login/page.js', 'r') as f:
-            login_content = f.read()
-            debug_checks.append(('Login page signup logging', 'console.log' in login_content and 'signup' in login_content.lower()))
-        
-        # Check auth callback logging  
-        with open('/app/app/auth/callback/route.js', 'r') as f:
-            callback_content = f.read()
-            debug_checks.append(('Auth callback logging', 'console.log' in callback_content))
-        
-        # Check auth success logging
-        with open('/app/app/auth/success/page.js', 'r') as f:
-            success_content = f.read()
-            debug_checks.append(('Auth success logging', 'console.log' in success_content))
-        
-        # Check email endpoint logging (send-confirmation)
-        try:
-            with open('/app/app/api/send-confirmation/route.js', 'r') as f:
-                send_content = f.read()
-                debug_checks.append(('Send confirmation logging', 'console' in send_content.lower()))
-        except FileNotFoundError:
-            debug_checks.append(('Send confirmation logging', False))
-        
-        # Check email endpoint logging (resend-confirmation)
-        try:
-            with open('/app/app/api/resend-confirmation/route.js', 'r') as f:
-                resend_content = f.read()
-                debug_checks.append(('Resend confirmation logging', 'console' in resend_content.lower()))
-        except FileNotFoundError:
-            debug_checks.append(('Resend confirmation logging', False))
+        # Missing email endpoint files count as missing logging
+        debug_checks = SOURCE_CHECKS.results('debug_checks')
         
         logging_good = True
         for check_name, check_result in debug_checks:
@@ -594,11 +583,10 @@ def test_complete_signup_flow():
             "email": test_email,
             "confirmationUrl": f"https://siterecap.com/auth/callback?token=test123&email={test_email}"
         }
-        response = requests.post(
+        response = http_client.post(
             f"{API_BASE}/send-confirmation", 
             json=payload,
-            headers={'Content-Type': 'application/json'},
-            timeout=30
+            headers={'Content-Type': 'application/json'}
         )
         
         if response.status_code == 200:
@@ -628,23 +616,12 @@ def test_complete_signup_flow():
             ("Invalid code", f"{BASE_URL}/auth/callback?code=invalid123")
         ]
         
-        callback_processing_good = True
-        for test_name, test_url in callback_tests:
-            try:
-                response = requests.get(test_url, timeout=30, allow_redirects=False)
-                if response.status_code in [302, 307]:  # Redirect responses
-                    redirect_location = response.headers.get('Location', '')
-                    if 'siterecap.com' in redirect_location:
-                        print_success(f"✓ {test_name} → Redirects to siterecap.com")
-                    else:
-                        print_error(f"✗ {test_name} → Redirects to wrong domain: {redirect_location}")
-                        callback_processing_good = False
-                else:
-                    print_error(f"✗ {test_name} → Unexpected status: {response.status_code}")
-                    callback_processing_good = False
-            except Exception as e:
-                print_error(f"✗ {test_name} → Error: {str(e)}")
-                callback_processing_good = False
+        callback_results = run_checks(
+            [(test_name, partial(check_auth_callback_case, test_name, test_url))
+             for test_name, test_url in callback_tests],
+            concurrency
+        )
+        callback_processing_good = all(result for _, result in callback_results)
         
         flow_results.append(("Confirmation Link Processing", callback_processing_good))
         
@@ -654,20 +631,38 @@ def test_complete_signup_flow():
     
     return flow_results
 
-def run_complete_signup_flow_tests():
+def run_complete_signup_flow_tests(concurrency=DEFAULT_CONCURRENCY, email_checks=False):
     """Run the complete signup flow tests as requested in review"""
     print(f"\n🏗️ SiteRecap Complete Signup Flow Testing Suite")
     print(f"Testing against: {BASE_URL}")
     print(f"Timestamp: {datetime.now().isoformat()}")
     print(f"Focus: Complete signup flow with custom email backup solution")
-    
-    # Run the complete signup flow test
-    flow_results = test_complete_signup_flow()
-    
-    # Also run essential supporting tests
-    supporting_results = []
-    supporting_results.append(("Environment Configuration", test_environment_variables()))
-    supporting_results.append(("Supabase Configuration", test_supabase_signup_flow()))
+    print(f"Concurrency: {concurrency}")
+    
+    # Only the signup flow sends mail, one step at a time; the supporting checks just read
+    # configuration, so they run alongside it. Output is still printed in this order
+    checks = [
+        ("Complete Signup Flow", partial(test_complete_signup_flow, concurrency)),
+        ("Environment Configuration", test_environment_variables),
+        ("Supabase Configuration", test_supabase_signup_flow)
+    ]
+    if email_checks:
+        # Answered without sending anything: a config read and three requests rejected with 400
+        checks += [
+            ("Email Configuration", test_email_configuration),
+            ("Error Handling", test_error_handling)
+        ]
+    check_results = run_checks(checks, concurrency)
+    
+    # The signup flow reports one result per step
+    flow_results = check_results[0][1] or [("Complete Signup Flow", False)]
+    supporting_results = check_results[1:]
+    if email_checks:
+        # These email the same inboxes as the signup flow, so they run one at a time after it
+        supporting_results += run_checks([
+            ("Send Confirmation", test_send_confirmation),
+            ("Resend Confirmation", test_resend_confirmation)
+        ], 1)
     
     # Combine all results
     all_results = flow_results + supporting_results
@@ -686,6 +681,7 @@ def run_complete_signup_flow_tests():
             print_error(f"{test_name}: FAILED")
     
     print(f"\n📊 Overall Results: {passed}/{total} tests passed")
+    http_client.print_timings()
     
     # Detailed analysis for the complete signup flow
     print_test_header("COMPLETE SIGNUP FLOW ANALYSIS")
@@ -723,5 +719,38 @@ def run_complete_signup_flow_tests():
     return passed == total
 
 if __name__ == "__main__":
-    success = run_complete_signup_flow_tests()
+    parser = argparse.ArgumentParser(description="SiteRecap complete signup flow tests")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help="Maximum number of checks in flight (1 runs them one at a time)")
+    parser.add_argument('--email-checks', action='store_true',
+                        help="Also run the standalone email checks; the two that send real mail run one at a time")
+    parser.add_argument('--latency-json', help="Write per-endpoint latency histograms to this JSON file")
+    parser.add_argument('--phases', action='store_true',
+                        help="Time DNS/connect/TLS/TTFB/transfer per call (fresh connection for every request)")
+    parser.add_argument('--adaptive-timeouts', action='store_true',
+                        help="Lower each endpoint's read timeout to 3x its learned p99")
+    parser.add_argument('--hedge', action='store_true',
+                        help="With adaptive timeouts, re-send GETs still pending at their endpoint's p95")
+    parser.add_argument('--learn-from', help="Latency JSON from an earlier --latency-json run to learn from")
+    parser.add_argument('--target', choices=('local', 'production'), default='local',
+                        help="Which deployment to test (default: local)")
+    parser.add_argument('--compare', action='store_true',
+                        help="Benchmark local against production instead of running the tests")
+    parser.add_argument('--rounds', type=int, default=30, help="Interleaved rounds for --compare")
+    args = parser.parse_args()
+    if args.compare:
+        target_compare.main(['--local', LOCAL_BASE_URL, '--production', PRODUCTION_BASE_URL,
+                             '--rounds', str(args.rounds)] + (['--json', args.latency_json] if args.latency_json else []))
+        sys.exit(0)
+    if args.target == 'production':
+        BASE_URL = PRODUCTION_BASE_URL
+        API_BASE = f"{BASE_URL}/api"
+    if args.phases:
+        http_client.get_client().enable_phase_timing()
+    if args.adaptive_timeouts or args.hedge:
+        http_client.get_client().enable_adaptive_timeouts(hedge=args.hedge, seed_path=args.learn_from)
+    success = run_complete_signup_flow_tests(args.concurrency, args.email_checks)
+    if args.latency_json:
+        http_client.export_timings(args.latency_json)
+        print_info(f"💾 Latency histograms written to {args.latency_json}")
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Nightly batch driver for POST /api/generate-report across every active project
+Lists each org's active projects through /api/projects/active and generates their reports
+for one date from a priority queue (most recently active projects first, retries after fresh
+work). A global cap and a per-org cap bound concurrent requests, a token bucket keeps the
+estimated Gemini calls (one Stage A call per photo plus one Stage B call) under the project's
+per-minute quota, and transient failures are retried with full-jitter exponential backoff.
+
+Every outcome is written to a checkpoint file as it lands, so re-running the same command
+after a crash resumes the night without regenerating finished projects.
+
+    python batch_reports.py --orgs org-a,org-b --date 2025-06-30 --concurrency 8 --per-org 2
+"""
+
+import argparse
+import heapq
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta
+
+from http_client import HttpClient
+from report_load_test import REPORT_TIMEOUT
+
+LOCAL_BASE_URL = "http://localhost:3000"
+CHECKPOINT_DIR = '/app/batch_checkpoints'
+
+# Statuses that are final for the night; everything else is (re)queued on resume
+FINISHED = ('done', 'skipped')
+
+# Worth another attempt: rate limits, server errors and gateway timeouts
+RETRYABLE_STATUS = (408, 429, 500, 502, 503, 504)
+
+
+class GeminiBudget:
+    """Token bucket over estimated Gemini calls; may run into debt when an estimate was low"""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, calls):
+        """Take `calls` tokens and return 0, or return the seconds to wait before there are enough"""
+        with self.lock:
+            self._refill()
+            needed = min(calls, self.capacity)
+            if self.tokens >= needed:
+                self.tokens -= calls
+                return 0.0
+            return (needed - self.tokens) / self.rate
+
+    def adjust(self, calls):
+        """Charge (or refund, when negative) the difference between actual and reserved calls"""
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - calls)
+
+
+class ReportQueue:
+    """Priority queue of project tasks that skips orgs at their cap and tasks still backing off"""
+
+    def __init__(self):
+        self.heap = []
+        self.sequence = itertools.count()
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, task):
+        priority = (task['attempts'], -task['activity'])
+        heapq.heappush(self.heap, (priority, next(self.sequence), task))
+
+    def pop_ready(self, now, org_in_flight, per_org):
+        """Highest-priority task that is due and whose org has a free slot, or None"""
+        held = []
+        found = None
+        while self.heap:
+            entry = heapq.heappop(self.heap)
+            task = entry[2]
+            if task['ready_at'] <= now and org_in_flight.get(task['org_id'], 0) < per_org:
+                found = task
+                break
+            held.append(entry)
+        for entry in held:
+            heapq.heappush(self.heap, entry)
+        return found
+
+    def next_ready_at(self, now):
+        """Earliest time a task still backing off becomes due, or None"""
+        return min((entry[2]['ready_at'] for entry in self.heap if entry[2]['ready_at'] > now), default=None)
+
+
+def activity_timestamp(project):
+    """Sort key for a project row: last activity, falling back to creation time"""
+    value = project.get('last_activity_date') or project.get('created_at')
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, ValueError):
+        return 0.0
+
+
+def backoff_delay(attempt, base, cap, rng):
+    """Full-jitter exponential backoff: uniform over [0, min(cap, base * 2^attempt)]"""
+    return rng.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_after_seconds(response):
+    try:
+        return float(response.headers.get('Retry-After', 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def parse_deadline(value):
+    """HH:MM today (or tomorrow, if already past) as an epoch timestamp"""
+    hour, minute = (int(part) for part in value.split(':'))
+    now = datetime.now()
+    deadline = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if deadline <= now:
+        deadline += timedelta(days=1)
+    return deadline.timestamp()
+
+
+def load_checkpoint(path, report_date):
+    if not os.path.exists(path):
+        return {'date': report_date, 'projects': {}}
+    with open(path) as f:
+        checkpoint = json.load(f)
+    if checkpoint.get('date') != report_date:
+        raise ValueError(f"checkpoint {path} is for {checkpoint.get('date')}, not {report_date}")
+    return checkpoint
+
+
+def save_checkpoint(path, checkpoint):
+    """Write atomically so a crash mid-write never leaves a truncated checkpoint"""
+    checkpoint['updated_at'] = datetime.now().isoformat()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def fetch_active_projects(client, base_url, org_id, timeout):
+    response = client.get(f"{base_url}/api/projects/active", params={'org_id': org_id}, timeout=timeout)
+    if response.status_code != 200:
+        raise RuntimeError(f"listing active projects for org {org_id} failed: HTTP {response.status_code}")
+    return response.json().get('data') or []
+
+
+def generate_report(client, base_url, project_id, report_date):
+    """POST one report; returns (outcome, detail, photos_analyzed, retry_after)"""
+    try:
+        response = client.post(f"{base_url}/api/generate-report",
+                               json={'project_id': project_id, 'date': report_date}, timeout=REPORT_TIMEOUT)
+    except Exception as e:
+        return 'retry', str(e), None, 0.0
+    try:
+        body = response.json()
+    except ValueError:
+        body = {}
+    if response.status_code == 200 and body.get('success'):
+        return 'done', None, (body.get('debug') or {}).get('photos_analyzed'), 0.0
+    detail = f"HTTP {response.status_code}: {body.get('error', '')}".rstrip(': ')
+    if response.status_code == 404:
+        return 'skipped', detail, 0, 0.0
+    if response.status_code in RETRYABLE_STATUS:
+        return 'retry', detail, None, retry_after_seconds(response)
+    return 'failed', detail, None, 0.0
+
+
+def build_queue(projects_by_org, checkpoint, retry_failed):
+    queue = ReportQueue()
+    for org_id, projects in projects_by_org.items():
+        for project in projects:
+            entry = checkpoint['projects'].setdefault(project['id'], {'org_id': org_id, 'status': 'pending',
+                                                                      'attempts': 0})
+            entry['name'] = project.get('name')
+            if entry['status'] in FINISHED or entry['status'] == 'failed' and not retry_failed:
+                continue
+            queue.push({'project_id': project['id'], 'org_id': org_id, 'name': project.get('name'),
+                        'activity': activity_timestamp(project), 'attempts': 0, 'ready_at': 0.0})
+    return queue
+
+
+def run_batch(queue, checkpoint, args):
+    """Drain the queue under the concurrency caps and Gemini budget; returns per-status counts"""
+    client = HttpClient(timeout=REPORT_TIMEOUT, pool_size=max(args.concurrency, 1))
+    if args.adaptive:
+        client.enable_adaptive_concurrency(initial_limit=min(args.concurrency, 4), max_limit=args.concurrency)
+    budget = GeminiBudget(args.gemini_rpm)
+    rng = random.Random(args.seed)
+    deadline = parse_deadline(args.deadline) if args.deadline else None
+    total = len(queue)
+    counts = {'done': 0, 'skipped': 0, 'failed': 0, 'retried': 0}
+    org_in_flight = {}
+    futures = {}
+    started = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        while queue or futures:
+            now = time.monotonic()
+            wake = None
+            past_deadline = deadline is not None and time.time() >= deadline
+            while not past_deadline and len(futures) < args.concurrency:
+                task = queue.pop_ready(now, org_in_flight, args.per_org)
+                if task is None:
+                    break
+                budget_wait = budget.reserve(args.calls_per_report)
+                if budget_wait:
+                    queue.push(task)
+                    wake = budget_wait
+                    break
+                task['attempts'] += 1
+                task['started'] = time.monotonic()
+                org_in_flight[task['org_id']] = org_in_flight.get(task['org_id'], 0) + 1
+                future = executor.submit(generate_report, client, args.base_url, task['project_id'], args.date)
+                futures[future] = task
+
+            if past_deadline and not futures:
+                break
+            backing_off = queue.next_ready_at(now)
+            if backing_off is not None:
+                wake = min(wake or float('inf'), backing_off - now)
+            if not futures:
+                time.sleep(wake or 0.05)
+                continue
+            done, _ = wait(futures, timeout=wake, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                task = futures.pop(future)
+                org_in_flight[task['org_id']] -= 1
+                outcome, detail, photos, retry_after = future.result()
+                elapsed = time.monotonic() - task['started']
+                if photos is not None:
+                    budget.adjust((photos + 1 if photos else 0) - args.calls_per_report)
+                entry = checkpoint['projects'][task['project_id']]
+                entry['attempts'] += 1
+                entry['error'] = detail
+
+                if outcome == 'retry' and task['attempts'] < args.max_attempts:
+                    delay = max(retry_after, backoff_delay(task['attempts'], args.backoff_base, args.backoff_cap, rng))
+                    task['ready_at'] = time.monotonic() + delay
+                    queue.push(task)
+                    entry['status'] = 'pending'
+                    counts['retried'] += 1
+                    print(f"🔁 {task['name'] or task['project_id']}: {detail}; retry {task['attempts']} in {delay:.1f}s")
+                else:
+                    outcome = 'failed' if outcome == 'retry' else outcome
+                    entry['status'] = outcome
+                    entry['seconds'] = round(elapsed, 2)
+                    counts[outcome] += 1
+                    finished = counts['done'] + counts['skipped'] + counts['failed']
+                    mark = {'done': '✅', 'skipped': '⏭️ ', 'failed': '❌'}[outcome]
+                    rate = finished / (time.monotonic() - started) * 3600
+                    print(f"{mark} [{finished}/{total}] {task['name'] or task['project_id']} "
+                          f"({task['org_id']}) {elapsed:.1f}s" + (f" - {detail}" if detail else '')
+                          + f"  ~{rate:.0f}/h")
+                save_checkpoint(args.checkpoint, checkpoint)
+
+    counts['pending'] = len(queue)
+    if client.concurrency:
+        client.concurrency.print_summary()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nightly generate-report batch across all active projects")
+    parser.add_argument('--base-url', default=LOCAL_BASE_URL)
+    parser.add_argument('--orgs', required=True, help="Comma-separated org IDs")
+    parser.add_argument('--date', default=date.today().isoformat(), help="Report date (YYYY-MM-DD)")
+    parser.add_argument('--checkpoint', help=f"Checkpoint file (default {CHECKPOINT_DIR}/generate-report-DATE.json)")
+    parser.add_argument('--concurrency', type=int, default=8, help="Reports in flight across all orgs")
+    parser.add_argument('--per-org', type=int, default=2, help="Reports in flight per org")
+    parser.add_argument('--gemini-rpm', type=float, default=900,
+                        help="Gemini calls per minute to stay under (leave headroom below the project quota)")
+    parser.add_argument('--calls-per-report', type=int, default=6,
+                        help="Estimated Gemini calls per report before it returns (photos + 1)")
+    parser.add_argument('--max-attempts', type=int, default=4)
+    parser.add_argument('--backoff-base', type=float, default=5, help="Seconds")
+    parser.add_argument('--backoff-cap', type=float, default=300, help="Seconds")
+    parser.add_argument('--deadline', help="Local HH:MM after which no new reports start")
+    parser.add_argument('--retry-failed', action='store_true', help="Requeue projects that failed on an earlier run")
+    parser.add_argument('--adaptive', action='store_true',
+                        help="Let the client cut in-flight reports with AIMD on errors, slowdowns and "
+                             "Stage A fallbacks (--concurrency becomes the ceiling)")
+    parser.add_argument('--seed', type=int, help="Seed for backoff jitter")
+    args = parser.parse_args()
+    args.base_url = args.base_url.rstrip('/')
+    if not args.checkpoint:
+        os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+        args.checkpoint = os.path.join(CHECKPOINT_DIR, f"generate-report-{args.date}.json")
+
+    print(f"🌙 NIGHTLY REPORT BATCH for {args.date}")
+    print(f"📍 Target: {args.base_url}")
+    checkpoint = load_checkpoint(args.checkpoint, args.date)
+    finished = sum(entry['status'] in FINISHED for entry in checkpoint['projects'].values())
+    if finished:
+        print(f"♻️  Resuming from {args.checkpoint}: {finished} project(s) already finished")
+
+    client = HttpClient()
+    projects_by_org = {}
+    for org_id in args.orgs.split(','):
+        projects_by_org[org_id] = fetch_active_projects(client, args.base_url, org_id, REPORT_TIMEOUT)
+        print(f"🏢 {org_id}: {len(projects_by_org[org_id])} active project(s)")
+
+    queue = build_queue(projects_by_org, checkpoint, args.retry_failed)
+    save_checkpoint(args.checkpoint, checkpoint)
+    quota_per_hour = args.gemini_rpm * 60 / args.calls_per_report
+    print(f"📋 {len(queue)} report(s) to generate; {args.concurrency} in flight, ≤ {args.per_org} per org; "
+          f"Gemini budget {args.gemini_rpm:g} calls/min ≈ {quota_per_hour:.0f} reports/h")
+    if args.deadline:
+        hours_left = (parse_deadline(args.deadline) - time.time()) / 3600
+        if len(queue) > quota_per_hour * hours_left:
+            print(f"⚠️  The Gemini budget allows ~{quota_per_hour * hours_left:.0f} reports before {args.deadline}")
+
+    counts = run_batch(queue, checkpoint, args)
+    print(f"\n📊 {counts['done']} generated, {counts['skipped']} without photos, {counts['failed']} failed, "
+          f"{counts['pending']} not started, {counts['retried']} retries")
+    print(f"💾 Checkpoint: {args.checkpoint}")
+    return counts['failed'] == 0 and counts['pending'] == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+SiteRecap API benchmark suite with stored baselines and a regression gate
+Benchmarks the /api/* routes (catch-all route plus send-confirmation, resend-confirmation and
+create-trial-subscription), stores each run under the current git commit and fails when p95
+or throughput regresses against a baseline run beyond a threshold with statistical confidence.
+
+Every case gets warmup requests, then several repetitions of a fixed request batch; each
+repetition contributes one p95 and one throughput sample. Repetitions outside Tukey's fences
+are dropped as outliers before the Mann-Whitney comparison against the baseline.
+"""
+
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from http_client import HttpClient
+from latency_histogram import LatencyHistogram
+from report_load_test import percentile
+from target_compare import compare_samples
+
+LOCAL_BASE_URL = "http://localhost:3000"
+RESULTS_DIR = '/app/bench_results'
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+PLACEHOLDER_ID = '00000000-0000-0000-0000-000000000001'
+
+# (name, method, path, json body). POST bodies are incomplete on purpose: the routes parse and
+# validate them and answer 400 without emailing, billing or writing. auto-close-projects is left
+# out because it closes projects, and upload-photo has its own bench in storage_standin.py.
+# Override bodies with --case-file to benchmark the full paths against a disposable backend.
+BENCHMARKS = (
+    ('debug-urls', 'GET', '/api/debug-urls', None),
+    ('project-count', 'GET', '/api/project-count?org_id={org_id}&status=active', None),
+    ('projects', 'GET', '/api/projects?org_id={org_id}', None),
+    ('projects-active', 'GET', '/api/projects/active?org_id={org_id}', None),
+    ('projects-completed', 'GET', '/api/projects/completed?org_id={org_id}', None),
+    ('project-status', 'GET', '/api/project-status/{project_id}', None),
+    ('geocode-project', 'POST', '/api/geocode-project', {}),
+    ('create-project', 'POST', '/api/create-project', {}),
+    ('generate-report', 'POST', '/api/generate-report', {}),
+    ('email-report', 'POST', '/api/email-report', {}),
+    ('export-pdf', 'POST', '/api/export-pdf', {}),
+    ('send-confirmation', 'POST', '/api/send-confirmation', {}),
+    ('resend-confirmation', 'POST', '/api/resend-confirmation', {}),
+    ('create-trial-subscription', 'POST', '/api/create-trial-subscription', {}),
+)
+
+# Cases that call paid upstream APIs on every request; run only with --include-gemini
+OPT_IN_BENCHMARKS = (
+    ('gemini-health', 'GET', '/api/gemini-health', None),
+)
+
+# Metric name -> +1 if higher is worse, -1 if lower is worse
+GATED_METRICS = {'p95_ms': 1, 'throughput_rps': -1}
+
+
+def git_revision(repo=REPO_DIR):
+    """(commit sha, dirty flag) of the checkout, or ('unknown', False) outside git"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=repo, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=repo,
+                                capture_output=True, text=True, check=True).stdout
+        return commit, bool(status.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+
+
+def resolve_ref(ref, repo=REPO_DIR):
+    try:
+        return subprocess.run(['git', 'rev-parse', ref], cwd=repo, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ref
+
+
+def tukey_inliers(values, k=1.5):
+    """Indexes of values inside [Q1 - k*IQR, Q3 + k*IQR]; everything with fewer than 4 values"""
+    if len(values) < 4:
+        return list(range(len(values)))
+    q1, _, q3 = statistics.quantiles(values, n=4)
+    low, high = q1 - k * (q3 - q1), q3 + k * (q3 - q1)
+    return [i for i, value in enumerate(values) if low <= value <= high]
+
+
+def time_call(client, method, url, body, timeout):
+    start = time.perf_counter()
+    try:
+        response = client.request(method, url, timeout=timeout, json=body)
+        error = response.status_code >= 500
+    except Exception:
+        error = True
+    return time.perf_counter() - start, error
+
+
+def run_batch(client, executor, method, url, body, requests_per_rep, timeout):
+    start = time.perf_counter()
+    results = list(executor.map(lambda _: time_call(client, method, url, body, timeout), range(requests_per_rep)))
+    elapsed = time.perf_counter() - start
+    latencies = sorted(latency for latency, error in results if not error)
+    return {
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'throughput_rps': len(latencies) / elapsed if elapsed else 0.0,
+        'errors': len(results) - len(latencies)
+    }, latencies
+
+
+def run_case(client, url, method, body, args):
+    """Warmup, then args.repetitions batches; outlier repetitions are flagged, not deleted"""
+    histogram = LatencyHistogram()
+    repetitions = []
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        for _ in range(args.warmup):
+            time_call(client, method, url, body, args.timeout)
+        for _ in range(args.repetitions):
+            repetition, latencies = run_batch(client, executor, method, url, body, args.requests, args.timeout)
+            for latency in latencies:
+                histogram.record_seconds(latency)
+            repetitions.append(repetition)
+    inliers = tukey_inliers([r['p95_ms'] for r in repetitions])
+    for i, repetition in enumerate(repetitions):
+        repetition['outlier'] = i not in inliers
+    return {
+        'method': method,
+        'url': url,
+        'repetitions': repetitions,
+        'histogram': histogram.to_dict()
+    }
+
+
+def kept(case, metric):
+    return [r[metric] for r in case['repetitions'] if not r['outlier']]
+
+
+def compare_runs(current, baseline, threshold, alpha):
+    """Gate every case present in both runs; returns a list of per-metric verdicts"""
+    verdicts = []
+    for name, case in current['cases'].items():
+        if name not in baseline['cases']:
+            continue
+        for metric, worse in GATED_METRICS.items():
+            now, before = kept(case, metric), kept(baseline['cases'][name], metric)
+            if not now or not before or not statistics.median(before):
+                continue
+            change = statistics.median(now) / statistics.median(before) - 1
+            test = compare_samples(now, before, alpha)
+            regressed = test['significant'] and change * worse > threshold
+            verdicts.append({
+                'case': name,
+                'metric': metric,
+                'baseline': statistics.median(before),
+                'current': statistics.median(now),
+                'change': change,
+                'p_value': test['p_value'],
+                'regressed': regressed
+            })
+    return verdicts
+
+
+def result_path(results_dir, commit, dirty):
+    return os.path.join(results_dir, f"{commit[:12]}{'-dirty' if dirty else ''}.json")
+
+
+def comparable(run, base_url, config):
+    """True when `run` measured the same target with the same batch configuration"""
+    return run.get('base_url') == base_url and run.get('config') == config
+
+
+def load_baseline(results_dir, ref, current_path, base_url, config):
+    """The clean run stored for `ref`, or the newest clean comparable run other than `current_path`"""
+    if ref:
+        commit = resolve_ref(ref)
+        path = result_path(results_dir, commit, False)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            run = json.load(f)
+        if not comparable(run, base_url, config):
+            print(f"⚠️  Run of {commit[:12]} measured {run.get('base_url')} with {run.get('config')}; "
+                  f"not comparable to this run")
+            return None
+        return run
+    runs = []
+    for path in glob.glob(os.path.join(results_dir, '*.json')):
+        if os.path.abspath(path) == os.path.abspath(current_path):
+            continue
+        with open(path) as f:
+            run = json.load(f)
+        # A dirty run has no commit to reproduce it from, so it never becomes the reference
+        if not run.get('dirty') and comparable(run, base_url, config):
+            runs.append(run)
+    return max(runs, key=lambda run: run['timestamp']) if runs else None
+
+
+def print_cases(run):
+    print(f"\n{'case':<26} {'reps':>5} {'out':>4} {'err':>4} {'p95 ms':>9} {'req/s':>8}")
+    for name, case in run['cases'].items():
+        repetitions = case['repetitions']
+        outliers = sum(r['outlier'] for r in repetitions)
+        errors = sum(r['errors'] for r in repetitions)
+        p95 = statistics.median(kept(case, 'p95_ms')) if repetitions else 0.0
+        throughput = statistics.median(kept(case, 'throughput_rps')) if repetitions else 0.0
+        print(f"{name:<26} {len(repetitions):>5} {outliers:>4} {errors:>4} {p95:>9.1f} {throughput:>8.1f}")
+
+
+def print_verdicts(verdicts, baseline, threshold, alpha):
+    print(f"\n📏 Against {baseline['commit'][:12]} ({baseline['timestamp']}), "
+          f"threshold {threshold:.0%}, α={alpha}")
+    print(f"   {'case':<26} {'metric':<15} {'baseline':>9} {'current':>9} {'change':>8} {'p-value':>9}")
+    for v in verdicts:
+        marker = '❌' if v['regressed'] else '  '
+        print(f"{marker} {v['case']:<26} {v['metric']:<15} {v['baseline']:>9.1f} {v['current']:>9.1f} "
+              f"{v['change']:>+8.1%} {v['p_value']:>9.4f}")
+
+
+def load_case_file(path, builtin=BENCHMARKS):
+    """JSON list of {name, method, path, body} replacing or adding to the built-in cases"""
+    with open(path) as f:
+        overrides = {case['name']: (case['name'], case.get('method', 'POST'), case['path'], case.get('body'))
+                     for case in json.load(f)}
+    cases = [overrides.pop(name, (name, method, path, body)) for name, method, path, body in builtin]
+    return cases + list(overrides.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--base-url', default=LOCAL_BASE_URL)
+    parser.add_argument('--cases', help="Comma-separated case names to run (default: all)")
+    parser.add_argument('--case-file', help="JSON list of {name, method, path, body} overriding the built-in cases")
+    parser.add_argument('--include-gemini', action='store_true',
+                        help="Also run gemini-health, which calls the paid Gemini API on every request")
+    parser.add_argument('--org-id', default=PLACEHOLDER_ID)
+    parser.add_argument('--project-id', default=PLACEHOLDER_ID)
+    parser.add_argument('--warmup', type=int, default=5, help="Unmeasured requests per case")
+    parser.add_argument('--repetitions', type=int, default=10, help="Measured batches per case")
+    parser.add_argument('--requests', type=int, default=20, help="Requests per batch")
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--results-dir', default=RESULTS_DIR)
+    parser.add_argument('--baseline', help="Git ref of the baseline run (default: newest clean run of another commit "
+                             "against the same --base-url and batch settings)")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Relative p95 increase or throughput drop that counts as a regression")
+    parser.add_argument('--alpha', type=float, default=0.05, help="Significance level of the gate")
+    parser.add_argument('--no-save', action='store_true', help="Do not store this run")
+    args = parser.parse_args()
+
+    builtin = BENCHMARKS + (OPT_IN_BENCHMARKS if args.include_gemini else ())
+    cases = load_case_file(args.case_file, builtin) if args.case_file else list(builtin)
+    if args.cases:
+        wanted = set(args.cases.split(','))
+        cases = [case for case in cases if case[0] in wanted]
+    commit, dirty = git_revision()
+    base_url = args.base_url.rstrip('/')
+
+    print(f"🧪 SITERECAP API BENCHMARK SUITE")
+    print(f"📍 Target: {base_url}")
+    print(f"🔖 Commit: {commit[:12]}{' (dirty)' if dirty else ''}")
+    print(f"🔁 {args.warmup} warmup + {args.repetitions}x{args.requests} requests per case "
+          f"at concurrency {args.concurrency}")
+
+    client = HttpClient(timeout=args.timeout, pool_size=max(args.concurrency, 1), recorder=None)
+    run = {
+        'commit': commit,
+        'dirty': dirty,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'base_url': base_url,
+        'config': {key: getattr(args, key) for key in ('warmup', 'repetitions', 'requests', 'concurrency')},
+        'cases': {}
+    }
+    for name, method, path, body in cases:
+        url = base_url + path.format(org_id=args.org_id, project_id=args.project_id)
+        print(f"🔍 {name}")
+        run['cases'][name] = run_case(client, url, method, body, args)
+    print_cases(run)
+
+    path = result_path(args.results_dir, commit, dirty)
+    if not args.no_save:
+        os.makedirs(args.results_dir, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(run, f, indent=2)
+        print(f"\n💾 Run stored as {path}")
+
+    baseline = load_baseline(args.results_dir, args.baseline, path, base_url, run['config'])
+    if baseline is None:
+        print(f"\nℹ️  No clean baseline run of {base_url} with this configuration in {args.results_dir}; "
+              f"nothing to gate against")
+        return True
+    verdicts = compare_runs(run, baseline, args.threshold, args.alpha)
+    print_verdicts(verdicts, baseline, args.threshold, args.alpha)
+    regressions = [v for v in verdicts if v['regressed']]
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        return False
+    print(f"\n✅ No regressions beyond {args.threshold:.0%}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
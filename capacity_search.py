@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Capacity search for SiteRecap endpoints against p99 and error-rate SLOs
+For each endpoint, drives open-loop load at increasing rates (doubling until the SLO breaks),
+then binary-searches between the last passing and first failing rate for the highest rate
+that still keeps p99 (measured from the intended send time) and the error rate within the SLO.
+A probe also fails when successes come back markedly slower than the requests were sent,
+so a backlog the endpoint works off after the schedule ends does not pass as sustained load.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import http_client
+import open_loop
+from bench_suite import BENCHMARKS, OPT_IN_BENCHMARKS, PLACEHOLDER_ID
+from report_load_test import REPORT_TIMEOUT, build_payload, make_photo_pool, send_report_request
+
+LOCAL_BASE_URL = "http://localhost:3000"
+
+DEFAULT_ENDPOINTS = ('projects', 'generate-report', 'send-confirmation', 'auth-callback')
+
+# Endpoints beyond the benchmark suite's cases; generate-report sends real photos on the demo path
+EXTRA_ENDPOINTS = {
+    'auth-callback': ('GET', '/auth/callback?code=invalid123', None),
+}
+
+# A probe's successes must arrive at this share of the rate its requests were sent at to count as
+# sustained; below 1 so latency jitter on the first and last responses doesn't fail a probe that keeps up
+MIN_ACHIEVED_SHARE = 0.9
+
+
+def endpoint_sender(name, base_url, args):
+    """send(index) for open_loop, returning None or an error string"""
+    if name == 'generate-report':
+        photo_pool = make_photo_pool(args.photos, 640, 480, 12)
+        url = f"{base_url}/api/generate-report"
+        return lambda index: send_report_request(url, build_payload(photo_pool, args.photos, index), REPORT_TIMEOUT)[1]
+
+    cases = {case[0]: case[1:] for case in BENCHMARKS + OPT_IN_BENCHMARKS}
+    cases.update(EXTRA_ENDPOINTS)
+    if name not in cases:
+        raise ValueError(f"unknown endpoint {name!r}; choose from {', '.join(sorted(cases) + ['generate-report'])}")
+    method, path, body = cases[name]
+    url = base_url + path.format(org_id=args.org_id, project_id=args.project_id)
+
+    def send(_):
+        response = http_client.get_client().request(method, url, json=body, timeout=args.timeout,
+                                                    allow_redirects=False)
+        return f"HTTP {response.status_code}" if response.status_code >= 500 else None
+    return send
+
+
+def probe(send, rate, args):
+    """Run one open-loop probe and judge it against the SLO"""
+    result = open_loop.run_open_loop(send, rate, args.probe_duration, args.arrival, args.seed)
+    scheduled = result['scheduled'] or 1
+    p99_ms = result['corrected'].percentile(99) / 1000
+    error_rate = result['errors'] / scheduled
+    # Both rates are taken over their own first-to-last span, so the wait for the first response
+    # and the drain don't count, but a backlog the endpoint works off after the schedule ends does
+    achieved = result['throughput_rps'] / result['offered_rps'] if result['offered_rps'] else 0.0
+    failures = []
+    if p99_ms > args.p99_ms:
+        failures.append(f"p99 {p99_ms:.0f} ms > {args.p99_ms:g} ms")
+    if error_rate > args.error_rate:
+        failures.append(f"errors {error_rate:.1%} > {args.error_rate:.1%}")
+    if achieved < MIN_ACHIEVED_SHARE:
+        failures.append(f"throughput {result['throughput_rps']:.2f} of {result['offered_rps']:.2f} req/s sent")
+    outcome = {
+        'rate': rate,
+        'p50_ms': result['corrected'].percentile(50) / 1000,
+        'p99_ms': p99_ms,
+        'error_rate': error_rate,
+        'throughput_rps': result['throughput_rps'],
+        'passed': not failures,
+        'failures': failures
+    }
+    mark = '✅' if outcome['passed'] else '❌'
+    print(f"   {mark} {rate:>8.2f} req/s: p99 {p99_ms:>8.1f} ms, errors {error_rate:>6.1%}"
+          + (f" ({'; '.join(failures)})" if failures else ''))
+    if args.cooldown:
+        time.sleep(args.cooldown)
+    return outcome
+
+
+def search_capacity(send, args):
+    """Highest passing rate found by ramp-then-bisect; returns (capacity probe or None, all probes)"""
+    probes = []
+    passed, failed = None, None
+    rate = args.start_rate
+    while rate <= args.max_rate:
+        outcome = probe(send, rate, args)
+        probes.append(outcome)
+        if not outcome['passed']:
+            failed = outcome
+            break
+        passed = outcome
+        rate *= 2
+    if passed is None or failed is None:
+        return passed, probes
+
+    for _ in range(args.max_steps):
+        low, high = passed['rate'], failed['rate']
+        if (high - low) / low <= args.tolerance:
+            break
+        outcome = probe(send, (low + high) / 2, args)
+        probes.append(outcome)
+        if outcome['passed']:
+            passed = outcome
+        else:
+            failed = outcome
+    return passed, probes
+
+
+def print_report(report, args):
+    print(f"\n📋 CAPACITY REPORT (SLO: p99 ≤ {args.p99_ms:g} ms, errors ≤ {args.error_rate:.1%})")
+    print(f"   {'endpoint':<26} {'max req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}  limit")
+    for entry in report:
+        capacity = entry['capacity']
+        if capacity is None:
+            print(f"   {entry['endpoint']:<26} {'-':>10} {'':>9} {'':>9} {'':>7}  fails at {args.start_rate:g} req/s")
+            continue
+        limit = entry['limit'] or f"≥ {args.max_rate:g} req/s (search ceiling)"
+        print(f"   {entry['endpoint']:<26} {capacity['rate']:>10.2f} {capacity['p50_ms']:>9.1f} "
+              f"{capacity['p99_ms']:>9.1f} {capacity['error_rate']:>7.1%}  {limit}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--base-url', default=LOCAL_BASE_URL)
+    parser.add_argument('--endpoints', default=','.join(DEFAULT_ENDPOINTS),
+                        help="Comma-separated endpoints: benchmark suite case names, auth-callback, generate-report")
+    parser.add_argument('--p99-ms', type=float, default=1000, help="p99 latency SLO in milliseconds")
+    parser.add_argument('--error-rate', type=float, default=0.01, help="Error-rate SLO (fraction of requests)")
+    parser.add_argument('--start-rate', type=float, default=1.0, help="First probe rate (req/s)")
+    parser.add_argument('--max-rate', type=float, default=512.0, help="Stop ramping above this rate")
+    parser.add_argument('--tolerance', type=float, default=0.05,
+                        help="Stop bisecting once the pass/fail rates are this close (relative)")
+    parser.add_argument('--max-steps', type=int, default=8, help="Bisection probes per endpoint")
+    parser.add_argument('--probe-duration', type=float, default=20, help="Seconds of arrivals per probe")
+    parser.add_argument('--cooldown', type=float, default=2, help="Seconds to idle between probes")
+    parser.add_argument('--arrival', choices=open_loop.ARRIVALS, default='poisson')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--photos', type=int, default=3, help="Photos per generate-report request")
+    parser.add_argument('--org-id', default=PLACEHOLDER_ID)
+    parser.add_argument('--project-id', default=PLACEHOLDER_ID)
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--json', dest='json_path', help="Write the capacity report to this JSON file")
+    args = parser.parse_args()
+
+    base_url = args.base_url.rstrip('/')
+    print(f"🧪 CAPACITY SEARCH")
+    print(f"📍 Target: {base_url}")
+    print(f"🎯 SLO: p99 ≤ {args.p99_ms:g} ms, errors ≤ {args.error_rate:.1%}; "
+          f"{args.probe_duration:g}s {args.arrival} probes from {args.start_rate:g} req/s")
+
+    report = []
+    for name in args.endpoints.split(','):
+        print(f"\n🔍 {name}")
+        capacity, probes = search_capacity(endpoint_sender(name, base_url, args), args)
+        failing = [p for p in probes if not p['passed']]
+        report.append({
+            'endpoint': name,
+            'capacity': capacity,
+            'limit': '; '.join(failing[-1]['failures']) if failing else None,
+            'probes': probes
+        })
+
+    print_report(report, args)
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'target': base_url, 'slo': {'p99_ms': args.p99_ms, 'error_rate': args.error_rate},
+                       'endpoints': report}, f, indent=2)
+        print(f"\n💾 Capacity report written to {args.json_path}")
+    return all(entry['capacity'] is not None for entry in report)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Synthetic dataset generator for SiteRecap scale tests
+Generates organizations, projects, photos and reports with a seeded, chunk-deterministic
+layout across worker processes and streams them to SQLite, CSV or Postgres COPY text
+without holding the dataset in memory. The SQLite output uses the PostgREST stand-in's
+schema and indexes, so it can be served directly:
+
+    python dataset_generator.py --orgs 20 --projects-per-org lognormal:5000,1 --out /tmp/siterecap.db
+    python postgrest_standin.py serve --db /tmp/siterecap.db
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from gemini_standin import aggregate_report, stage_a_analysis
+from postgrest_standin import TableStore, iso_timestamp
+from standin_server import LatencyDistribution
+
+# Output bytes per worker task; chunks are sized from the bytes per project seen so far, starting
+# small. Every project is seeded by its own index, so output never depends on chunk or worker count
+CHUNK_BYTES = 4 * 1024 * 1024
+FIRST_CHUNK_PROJECTS = 16
+
+TABLE_COLUMNS = {
+    'organizations': ('id', 'name', 'plan', 'company_name', 'brand_color', 'created_at'),
+    'projects': ('id', 'org_id', 'name', 'city', 'state', 'postal_code', 'lat', 'lon', 'owner_name',
+                 'owner_email', 'gc_name', 'gc_email', 'status', 'created_at', 'updated_at', 'last_activity_date'),
+    'photos': ('id', 'project_id', 'shot_date', 'url', 'storage_path', 'created_at'),
+    'reports': ('id', 'project_id', 'date', 'owner_md', 'gc_md', 'raw_json', 'status', 'created_at'),
+}
+
+FORMATS = ('sqlite', 'csv', 'copy')
+
+FIRST_NAMES = ['James', 'Maria', 'Robert', 'Linda', 'Carlos', 'Aisha', 'Wei', 'Priya', 'Tom', 'Grace',
+               'Diego', 'Fatima', 'Noah', 'Emma', 'Liam', 'Olivia', 'Mateo', 'Sofia', 'Kenji', 'Hannah']
+LAST_NAMES = ['Smith', 'Johnson', 'Garcia', 'Nguyen', 'Patel', 'Brown', 'Kim', 'Lopez', 'Miller', 'Davis',
+              'Wilson', 'Martinez', 'Anderson', 'Thomas', 'Moore', 'Jackson', 'Lee', 'Walker', 'Hall', 'Young']
+OWNER_DOMAINS = ['gmail.com', 'outlook.com', 'yahoo.com', 'icloud.com', 'example.com']
+GC_DOMAINS = ['buildright.example', 'summitbuilders.example', 'ironwoodgc.example', 'crestconstruction.example']
+CITIES = [('Austin', 'TX', 30.27, -97.74, '787'), ('Dallas', 'TX', 32.78, -96.80, '752'),
+          ('Denver', 'CO', 39.74, -104.99, '802'), ('Phoenix', 'AZ', 33.45, -112.07, '850'),
+          ('Raleigh', 'NC', 35.78, -78.64, '276'), ('Seattle', 'WA', 47.61, -122.33, '981'),
+          ('Tampa', 'FL', 27.95, -82.46, '336'), ('Boise', 'ID', 43.62, -116.20, '837')]
+PROJECT_TYPES = ['Kitchen Remodel', 'Bathroom Renovation', 'Addition', 'New Build', 'Basement Finish',
+                 'Roof Replacement', 'Deck Build', 'Whole Home Remodel']
+PLANS = ['free', 'pro', 'enterprise']
+
+
+def _uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def synthetic_email(rng, domains):
+    """A plausible, mostly unique address instead of one shared test address"""
+    first = rng.choice(FIRST_NAMES).lower()
+    last = rng.choice(LAST_NAMES).lower()
+    return f"{first}.{last}{rng.randint(1, 9999)}@{rng.choice(domains)}"
+
+
+def _markdown(report, project_name, day, audience):
+    lines = [f"# {audience} Daily Report - {project_name}", f"**Date:** {day}", "", report['site_summary'], ""]
+    for section in report['sections']:
+        lines.append(f"## {section['space']} {section['phase']}".rstrip())
+        lines.extend(f"- {task['name']}" for task in section['tasks'])
+    return '\n'.join(lines)
+
+
+def _report_row(rng, config, project_id, project_name, day, photo_ids, created_at):
+    analyses = []
+    for index, photo_id in enumerate(photo_ids[:config['analyses_per_report']], 1):
+        analysis = stage_a_analysis(photo_id)
+        analysis['photoIndex'] = index
+        analyses.append(analysis)
+    report = aggregate_report(analyses)
+    raw_json = {
+        'stage_a': analyses,
+        'stage_b': report,
+        'weather': None,
+        'photos': [{'id': photo_id} for photo_id in photo_ids],
+        'generated_at': created_at,
+        'model_used': 'gemini-2.0-flash-exp'
+    }
+    return (_uuid(rng), project_id, day, _markdown(report, project_name, day, 'Owner'),
+            _markdown(report, project_name, day, 'GC'), json.dumps(raw_json, separators=(',', ':')),
+            'generated', created_at)
+
+
+def generate_project(config, org_id, index, now):
+    """Rows for one project and its photos and reports, seeded by (seed, org, index) alone"""
+    rng = random.Random(f"{config['seed']}:{org_id}:{index}")
+    project_id = _uuid(rng)
+    city, state, lat, lon, zip_prefix = rng.choice(CITIES)
+    name = f"{rng.choice(PROJECT_TYPES)} - {rng.choice(LAST_NAMES)} Residence"
+    created = now - timedelta(days=rng.uniform(1, config['history_days']))
+
+    inactive = rng.random() < config['inactive_share']
+    idle_days = rng.uniform(15, 120) if inactive else rng.uniform(0, 13)
+    last_activity = max(created, now - timedelta(days=idle_days))
+    roll = rng.random()
+    if roll < config['archived_share']:
+        status = 'archived'
+    elif roll < config['archived_share'] + config['completed_share']:
+        status = 'completed'
+    else:
+        status = 'active'
+
+    owner_email = synthetic_email(rng, OWNER_DOMAINS) if rng.random() < config['owner_email_share'] else None
+    gc_email = synthetic_email(rng, GC_DOMAINS) if rng.random() < config['gc_email_share'] else None
+    project = (
+        project_id, org_id, name, city, state, f"{zip_prefix}{rng.randint(0, 99):02d}",
+        round(lat + rng.uniform(-0.2, 0.2), 5), round(lon + rng.uniform(-0.2, 0.2), 5),
+        owner_email and f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", owner_email,
+        gc_email and f"{rng.choice(LAST_NAMES)} Builders", gc_email,
+        status, iso_timestamp(created), iso_timestamp(last_activity), iso_timestamp(last_activity)
+    )
+
+    photos = []
+    reports = []
+    first_day = max(created.date(), last_activity.date() - timedelta(days=config['max_days'] - 1))
+    day = first_day
+    while day <= last_activity.date():
+        if rng.random() < config['site_day_share']:
+            shot_date = day.isoformat()
+            photo_ids = []
+            for _ in range(round(config['photos_per_day'].sample(rng))):
+                photo_id = _uuid(rng)
+                storage_path = f"{project_id}/{shot_date}/{photo_id}.jpg"
+                taken = datetime.combine(day, datetime.min.time(), timezone.utc) + timedelta(
+                    seconds=rng.randint(7 * 3600, 17 * 3600))
+                photos.append((photo_id, project_id, shot_date,
+                               f"{config['storage_url']}/storage/v1/object/public/photos/{storage_path}",
+                               storage_path, iso_timestamp(taken)))
+                photo_ids.append(photo_id)
+            if photo_ids and rng.random() < config['report_share']:
+                generated = datetime.combine(day, datetime.min.time(), timezone.utc) + timedelta(hours=18)
+                reports.append(_report_row(rng, config, project_id, name, shot_date, photo_ids,
+                                           iso_timestamp(generated)))
+        day += timedelta(days=1)
+    return project, photos, reports
+
+
+def _escape_copy(value):
+    if value is None:
+        return '\\N'
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def format_rows(fmt, rows):
+    """Rows as tuples for SQLite or as ready-to-write text for CSV and COPY"""
+    if fmt == 'sqlite':
+        return rows
+    if fmt == 'copy':
+        return ''.join('\t'.join(_escape_copy(v) for v in row) + '\n' for row in rows)
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator='\n').writerows(rows)
+    return buffer.getvalue()
+
+
+def generate_chunk(config, fmt, org_id, start, stop):
+    """Worker task: every table's rows for projects [start, stop) of one org"""
+    now = config['now']
+    tables = {'projects': [], 'photos': [], 'reports': []}
+    for index in range(start, stop):
+        project, photos, reports = generate_project(config, org_id, index, now)
+        tables['projects'].append(project)
+        tables['photos'].extend(photos)
+        tables['reports'].extend(reports)
+    counts = {table: len(rows) for table, rows in tables.items()}
+    tables = {table: format_rows(fmt, rows) for table, rows in tables.items()}
+    if fmt == 'sqlite':
+        size = sum(len(v) for rows in tables.values() for row in rows for v in row if isinstance(v, str))
+    else:
+        size = sum(len(text) for text in tables.values())
+    return tables, counts, size
+
+
+class SqliteWriter:
+    def __init__(self, path):
+        if os.path.exists(path):
+            os.remove(path)
+        self.store = TableStore(path)
+        self.db = self.store.db
+        self.db.execute("PRAGMA journal_mode = OFF")
+        self.db.execute("PRAGMA synchronous = OFF")
+
+    def write(self, table, rows):
+        columns = TABLE_COLUMNS[table]
+        self.db.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                            rows)
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+
+class TextWriter:
+    """One file per table in a directory, CSV with a header or COPY text with a load script"""
+
+    def __init__(self, directory, fmt):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.fmt = fmt
+        self.extension = 'csv' if fmt == 'csv' else 'copy'
+        self.files = {}
+        for table, columns in TABLE_COLUMNS.items():
+            f = open(os.path.join(directory, f"{table}.{self.extension}"), 'w', newline='')
+            if fmt == 'csv':
+                f.write(','.join(columns) + '\n')
+            self.files[table] = f
+
+    def write(self, table, text):
+        self.files[table].write(text if isinstance(text, str) else format_rows(self.fmt, text))
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+        if self.fmt == 'copy':
+            with open(os.path.join(self.directory, 'load.sql'), 'w') as f:
+                f.write("-- psql -f load.sql, from this directory\nBEGIN;\n")
+                for table, columns in TABLE_COLUMNS.items():
+                    f.write(f"\\copy {table} ({', '.join(columns)}) FROM '{table}.copy'\n")
+                f.write("COMMIT;\n")
+
+
+def organization_rows(config, now):
+    """Org rows plus each org's project count, drawn in the parent so chunking is deterministic"""
+    rng = random.Random(f"{config['seed']}:orgs")
+    orgs = []
+    for i in range(config['orgs']):
+        org_id = _uuid(rng)
+        company = f"{rng.choice(LAST_NAMES)} {rng.choice(['Construction', 'Builders', 'Remodeling', 'Homes'])}"
+        created = now - timedelta(days=rng.uniform(config['history_days'], config['history_days'] + 365))
+        row = (org_id, company, rng.choice(PLANS), company, '#168995', iso_timestamp(created))
+        orgs.append((row, max(1, round(config['projects_per_org'].sample(rng)))))
+    return orgs
+
+
+def generate(config, fmt, out, workers):
+    """Stream the dataset to `out`; return per-table row counts"""
+    now = config['now']
+    writer = SqliteWriter(out) if fmt == 'sqlite' else TextWriter(out, fmt)
+    orgs = organization_rows(config, now)
+    writer.write('organizations', [row for row, _ in orgs])
+    totals = {'organizations': len(orgs), 'projects': 0, 'photos': 0, 'reports': 0}
+    observed = {'bytes': 0, 'projects': 0}
+
+    def chunks():
+        for row, size in orgs:
+            start = 0
+            while start < size:
+                if observed['projects']:
+                    count = max(1, int(CHUNK_BYTES * observed['projects'] / max(observed['bytes'], 1)))
+                else:
+                    count = FIRST_CHUNK_PROJECTS
+                yield row[0], start, min(size, start + count)
+                start += count
+
+    def drain(future):
+        tables, counts, size = future.result()
+        observed['bytes'] += size
+        observed['projects'] += counts['projects']
+        for table, rows in tables.items():
+            writer.write(table, rows)
+        for table, count in counts.items():
+            totals[table] += count
+        print(f"   {totals['projects']:,} projects, {totals['photos']:,} photos, {totals['reports']:,} reports",
+              end='\r', flush=True)
+
+    # Bounded in-flight work keeps memory flat however large the dataset is
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks():
+            pending.append(executor.submit(generate_chunk, config, fmt, *chunk))
+            if len(pending) >= workers * 2:
+                drain(pending.popleft())
+        while pending:
+            drain(pending.popleft())
+    print()
+    writer.close()
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic SiteRecap projects, photos and reports")
+    parser.add_argument('--format', choices=FORMATS, default='sqlite')
+    parser.add_argument('--out', required=True, help="SQLite file, or a directory for csv/copy")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--orgs', type=int, default=10)
+    parser.add_argument('--projects-per-org', type=LatencyDistribution.parse, default='fixed:1000',
+                        help="Distribution of projects per org, e.g. lognormal:5000,1")
+    parser.add_argument('--photos-per-day', type=LatencyDistribution.parse, default='poisson:6',
+                        help="Distribution of photos on a site day, e.g. poisson:6 or uniform:0,20")
+    parser.add_argument('--site-day-share', type=float, default=0.6, help="Share of days with photos")
+    parser.add_argument('--report-share', type=float, default=0.8, help="Share of site days with a report")
+    parser.add_argument('--inactive-share', type=float, default=0.1,
+                        help="Share of projects idle for more than 14 days")
+    parser.add_argument('--completed-share', type=float, default=0.25)
+    parser.add_argument('--archived-share', type=float, default=0.05)
+    parser.add_argument('--owner-email-share', type=float, default=0.7)
+    parser.add_argument('--gc-email-share', type=float, default=0.5)
+    parser.add_argument('--history-days', type=float, default=730, help="Oldest project age in days")
+    parser.add_argument('--max-days', type=int, default=30, help="Most recent days of photos per project")
+    parser.add_argument('--analyses-per-report', type=int, default=3,
+                        help="Stage A analyses kept in each report's raw_json")
+    parser.add_argument('--storage-url', default='https://example.supabase.co')
+    args = parser.parse_args()
+
+    config = {
+        'seed': args.seed,
+        'now': datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0),
+        'orgs': args.orgs,
+        'projects_per_org': args.projects_per_org,
+        'photos_per_day': args.photos_per_day,
+        'site_day_share': args.site_day_share,
+        'report_share': args.report_share,
+        'inactive_share': args.inactive_share,
+        'completed_share': args.completed_share,
+        'archived_share': args.archived_share,
+        'owner_email_share': args.owner_email_share,
+        'gc_email_share': args.gc_email_share,
+        'history_days': args.history_days,
+        'max_days': args.max_days,
+        'analyses_per_report': args.analyses_per_report,
+        'storage_url': args.storage_url.rstrip('/')
+    }
+
+    print(f"🏗️  SYNTHETIC DATASET GENERATOR")
+    print(f"📍 Output: {args.out} ({args.format})")
+    print(f"🎲 Seed {args.seed}, {args.orgs} org(s), projects per org {args.projects_per_org}, "
+          f"photos per site day {args.photos_per_day}, {args.workers} worker(s)")
+    start = time.perf_counter()
+    totals = generate(config, args.format, args.out, args.workers)
+    elapsed = time.perf_counter() - start
+    rows = sum(totals.values())
+    print(f"✅ {rows:,} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+    for table, count in totals.items():
+        print(f"   {table}: {count:,}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
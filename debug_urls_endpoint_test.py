@@ -3,19 +3,12 @@
 Create and test a debug-urls endpoint to verify URL configuration
 """
 
-import requests
+import argparse
 import json
 import os
 
-def get_base_url():
-    try:
-        with open('/app/.env', 'r') as f:
-            for line in f:
-                if line.startswith('NEXT_PUBLIC_BASE_URL='):
-                    return line.split('=', 1)[1].strip()
-    except:
-        pass
-    return 'https://siterecap.com'
+import http_client
+from env_config import get_base_url
 
 BASE_URL = get_base_url()
 API_BASE = f"{BASE_URL}/api"
@@ -116,7 +109,7 @@ def test_debug_urls_endpoint():
     print("\n🔍 Testing GET /api/debug-urls endpoint...")
     
     try:
-        response = requests.get(f"{API_BASE}/debug-urls", timeout=10)
+        response = http_client.get(f"{API_BASE}/debug-urls")
         
         print(f"   Status: {response.status_code}")
         
@@ -183,12 +176,11 @@ def test_email_confirmation_urls():
         for test_case in test_cases:
             print(f"\n   Testing: {test_case['name']}")
             
-            response = requests.post(f"{API_BASE}/send-confirmation",
-                                   json={
-                                       "email": test_case["email"],
-                                       "confirmationUrl": test_case["confirmationUrl"]
-                                   },
-                                   timeout=10)
+            response = http_client.post(f"{API_BASE}/send-confirmation",
+                                      json={
+                                          "email": test_case["email"],
+                                          "confirmationUrl": test_case["confirmationUrl"]
+                                      })
             
             print(f"   Status: {response.status_code}")
             
@@ -208,9 +200,8 @@ def test_email_confirmation_urls():
         # Test resend-confirmation to see what URL it generates
         print(f"\n   Testing resend-confirmation URL generation...")
         
-        response = requests.post(f"{API_BASE}/resend-confirmation",
-                               json={"email": "user@siterecap.com"},
-                               timeout=10)
+        response = http_client.post(f"{API_BASE}/resend-confirmation",
+                                  json={"email": "user@siterecap.com"})
         
         print(f"   Status: {response.status_code}")
         
@@ -266,7 +257,7 @@ def test_auth_callback_detailed():
             print(f"\n   Testing: {test_case['name']}")
             print(f"   URL: {test_case['url']}")
             
-            response = requests.get(test_case['url'], allow_redirects=False, timeout=10)
+            response = http_client.get(test_case['url'], allow_redirects=False)
             
             print(f"   Status: {response.status_code}")
             
@@ -332,9 +323,27 @@ def main():
             passed += 1
     
     print(f"\nOverall: {passed}/{total} tests passed")
+    http_client.print_timings()
     
     return passed >= 3
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--latency-json', help="Write per-endpoint latency histograms to this JSON file")
+    parser.add_argument('--phases', action='store_true',
+                        help="Time DNS/connect/TLS/TTFB/transfer per call (fresh connection for every request)")
+    parser.add_argument('--adaptive-timeouts', action='store_true',
+                        help="Lower each endpoint's read timeout to 3x its learned p99")
+    parser.add_argument('--hedge', action='store_true',
+                        help="With adaptive timeouts, re-send GETs still pending at their endpoint's p95")
+    parser.add_argument('--learn-from', help="Latency JSON from an earlier --latency-json run to learn from")
+    args = parser.parse_args()
+    if args.phases:
+        http_client.get_client().enable_phase_timing()
+    if args.adaptive_timeouts or args.hedge:
+        http_client.get_client().enable_adaptive_timeouts(hedge=args.hedge, seed_path=args.learn_from)
     success = main()
+    if args.latency_json:
+        http_client.export_timings(args.latency_json)
+        print(f"💾 Latency histograms written to {args.latency_json}")
     exit(0 if success else 1)
\ No newline at end of file
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Multi-process and multi-node open-loop load generation
+Splits one open-loop schedule across local worker processes, or across worker nodes reached
+over TCP, so the GIL and per-request overhead of a single Python process stop capping the
+offered load. Each share runs open_loop.run_open_loop at rate/N (constant arrivals are phase
+shifted so the shares interleave into the original even spacing; Poisson shares superpose
+into a Poisson stream at the full rate), all shares start at the same wall-clock instant,
+and their histograms are merged into the same report a single process prints.
+
+Protocol: one JSON object per line. The coordinator sends {"op": "hello"} and the worker
+answers {"processes": N}; then {"op": "run", "job": {...}, "shares": [...], "total": T}
+is answered with {"results": [...]} holding one summarised open-loop result per share.
+"""
+
+import argparse
+import json
+import socket
+import socketserver
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import http_client
+import open_loop
+from latency_histogram import DDSketch, LatencyHistogram, histogram_from_dict
+
+DEFAULT_PORT = 8154
+
+# Seconds between sending the job and the shared start, to cover process start-up.
+# Worker nodes compare it with their own clock, so keep them NTP-synced
+START_LEAD = 2.0
+
+
+def run_share(job, index, total):
+    """Run share `index` of `total` of the job's schedule; returns a summarised result"""
+    rate = job['rate'] / total
+    # The in-flight cap is for the whole run, like the rate; each share gets its part of it
+    max_in_flight = max(1, job['max_in_flight'] // total)
+    seed = None if job.get('seed') is None else f"{job['seed']}:{index}"
+
+    def send(_):
+        response = http_client.get_client().request(job['method'], job['url'], json=job.get('body'),
+                                                    timeout=job['timeout'])
+        return f"HTTP {response.status_code}" if response.status_code >= 400 else None
+
+    delay = job['start_at'] - time.time()
+    if delay > 0:
+        time.sleep(delay)
+    result = open_loop.run_open_loop(send, rate, job['duration'], job['arrival'], seed,
+                                     max_in_flight, phase=index / job['rate'],
+                                     histogram_class=DDSketch if job.get('sketch') else LatencyHistogram)
+    return open_loop.summarise(result)
+
+
+def run_shares(job, shares, total, processes):
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(run_share, [job] * len(shares), shares, [total] * len(shares)))
+
+
+def _offset_span(summaries, event):
+    """Earliest first_<event>_s and latest last_<event>_s across shares, or (None, None)"""
+    firsts = [summary[f'first_{event}_s'] for summary in summaries if summary[f'first_{event}_s'] is not None]
+    lasts = [summary[f'last_{event}_s'] for summary in summaries if summary[f'last_{event}_s'] is not None]
+    return (min(firsts), max(lasts)) if firsts else (None, None)
+
+
+def merge_results(summaries, rate):
+    """Combine per-share summaries into one run_open_loop-shaped result"""
+    merged = {key: LatencyHistogram() for key in open_loop.HISTOGRAM_KEYS}
+    for i, summary in enumerate(summaries):
+        for key in open_loop.HISTOGRAM_KEYS:
+            histogram = histogram_from_dict(summary[key])
+            merged[key] = histogram if i == 0 else merged[key].merge(histogram)
+    errors = sorted({sample for summary in summaries for sample in summary['error_samples']})
+    elapsed = max((summary['elapsed_s'] for summary in summaries), default=0.0)
+    arrival_window = max((summary['elapsed_s'] - summary['drain_s'] for summary in summaries), default=0.0)
+    completed = sum(summary['completed'] for summary in summaries)
+    scheduled = sum(summary['scheduled'] for summary in summaries)
+    # Shares start together at job['start_at'], so their offsets share one time base
+    first_arrival, last_arrival = _offset_span(summaries, 'arrival')
+    first_success, last_success = _offset_span(summaries, 'success')
+    return dict(
+        merged,
+        arrival=summaries[0]['arrival'] if summaries else 'constant',
+        target_rate=rate,
+        duration_s=summaries[0]['duration_s'] if summaries else 0.0,
+        scheduled=scheduled,
+        completed=completed,
+        errors=sum(summary['errors'] for summary in summaries),
+        error_samples=errors[:3],
+        elapsed_s=elapsed,
+        drain_s=elapsed - arrival_window,
+        first_arrival_s=first_arrival,
+        last_arrival_s=last_arrival,
+        first_success_s=first_success,
+        last_success_s=last_success,
+        offered_rps=open_loop.completion_rate(scheduled, first_arrival, last_arrival, arrival_window),
+        throughput_rps=open_loop.completion_rate(completed, first_success, last_success, arrival_window)
+    )
+
+
+def _send_message(stream, message):
+    stream.write(json.dumps(message).encode() + b'\n')
+    stream.flush()
+
+
+def _read_message(stream):
+    line = stream.readline()
+    if not line:
+        raise ConnectionError("worker closed the connection")
+    return json.loads(line)
+
+
+class WorkerHandler(socketserver.StreamRequestHandler):
+    """Serves hello/run messages from a coordinator"""
+
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            message = json.loads(line)
+            if message['op'] == 'hello':
+                _send_message(self.wfile, {'processes': self.server.processes})
+            elif message['op'] == 'run':
+                shares = message['shares']
+                print(f"▶️  {len(shares)} share(s) of {message['total']} at {message['job']['rate']:g} req/s total")
+                results = run_shares(message['job'], shares, message['total'], self.server.processes)
+                _send_message(self.wfile, {'results': results})
+            else:
+                _send_message(self.wfile, {'error': f"unknown op {message['op']!r}"})
+
+
+class WorkerServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, processes):
+        super().__init__(address, WorkerHandler)
+        self.processes = processes
+
+
+def parse_address(value):
+    host, _, port = value.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+class RemoteWorker:
+    """Coordinator-side connection to one worker node"""
+
+    def __init__(self, address, timeout=None):
+        self.address = address
+        self.sock = socket.create_connection(address, timeout=timeout)
+        self.stream = self.sock.makefile('rwb')
+        _send_message(self.stream, {'op': 'hello'})
+        self.processes = _read_message(self.stream)['processes']
+
+    def run(self, job, shares, total):
+        _send_message(self.stream, {'op': 'run', 'job': job, 'shares': shares, 'total': total})
+        reply = _read_message(self.stream)
+        if 'error' in reply:
+            raise RuntimeError(f"worker {self.address}: {reply['error']}")
+        return reply['results']
+
+    def close(self):
+        self.stream.close()
+        self.sock.close()
+
+
+def run_distributed(job, processes=1, workers=()):
+    """Run the job across local processes, or across the given RemoteWorkers when any are passed"""
+    job = dict(job, start_at=time.time() + START_LEAD)
+    if not workers:
+        return merge_results(run_shares(job, list(range(processes)), processes, processes), job['rate'])
+
+    total = sum(worker.processes for worker in workers)
+    assignments = []
+    first = 0
+    for worker in workers:
+        assignments.append((worker, list(range(first, first + worker.processes))))
+        first += worker.processes
+    with ThreadPoolExecutor(max_workers=len(workers)) as executor:
+        replies = list(executor.map(lambda a: a[0].run(job, a[1], total), assignments))
+    return merge_results([summary for reply in replies for summary in reply], job['rate'])
+
+
+def serve(args):
+    server = WorkerServer((args.host, args.port), args.processes)
+    print(f"🛰️  Load worker with {args.processes} process(es) listening on {args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return True
+
+
+def run(args):
+    body = None
+    if args.body_file:
+        with open(args.body_file) as f:
+            body = json.load(f)
+
+    workers = [RemoteWorker(parse_address(a)) for a in args.workers.split(',')] if args.workers else []
+    total = sum(worker.processes for worker in workers) if workers else args.processes
+    where = f"{len(workers)} worker node(s)" if workers else "this node"
+    print(f"🧪 OPEN-LOOP LOAD: {args.method} {args.url}")
+    print(f"🔀 {total} process(es) on {where}")
+
+    results = []
+    try:
+        for rate in args.rate:
+            job = {'url': args.url, 'method': args.method, 'body': body, 'rate': rate,
+                   'duration': args.duration, 'arrival': args.arrival, 'seed': args.seed,
+                   'max_in_flight': args.max_in_flight, 'timeout': args.timeout, 'sketch': args.sketch}
+            result = run_distributed(job, args.processes, workers)
+            open_loop.print_open_loop(result)
+            results.append(open_loop.summarise(result))
+    finally:
+        for worker in workers:
+            worker.close()
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'target': args.url, 'results': results}, f, indent=2)
+        print(f"\n💾 Results written to {args.json_path}")
+    return all(r['errors'] == 0 for r in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-process and multi-node open-loop load generation")
+    sub = parser.add_subparsers(dest='command')
+    for name in ('run', 'worker'):
+        p = sub.add_parser(name)
+        p.add_argument('--processes', type=int, default=1,
+                       help="Load processes on this node (run: ignored with --workers)")
+    run_parser = sub.choices['run']
+    run_parser.add_argument('url', help="Full URL to load")
+    run_parser.add_argument('--method', default='GET')
+    run_parser.add_argument('--body-file', help="JSON file sent as the request body")
+    run_parser.add_argument('--rate', type=open_loop.parse_float_list, default=[1.0],
+                            help="Comma-separated total arrival rates (req/s)")
+    run_parser.add_argument('--duration', type=float, default=30, help="Seconds of arrivals per rate")
+    run_parser.add_argument('--arrival', choices=open_loop.ARRIVALS, default='constant')
+    run_parser.add_argument('--seed', type=int, help="Seed for Poisson arrivals")
+    run_parser.add_argument('--max-in-flight', type=int, default=open_loop.DEFAULT_MAX_IN_FLIGHT,
+                            help="Concurrent requests across all processes, split evenly between them")
+    run_parser.add_argument('--sketch', action='store_true',
+                            help="Record and ship DDSketches instead of HDR histograms (constant memory)")
+    run_parser.add_argument('--timeout', type=float, default=600)
+    run_parser.add_argument('--workers', help="Comma-separated host:port worker nodes")
+    run_parser.add_argument('--json', dest='json_path', help="Write results to this JSON file")
+    worker_parser = sub.choices['worker']
+    worker_parser.add_argument('--host', default='0.0.0.0')
+    worker_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    argv = sys.argv[1:]
+    if not argv or argv[0] not in sub.choices and argv[0] not in ('-h', '--help'):
+        argv = ['run'] + argv
+    args = parser.parse_args(argv)
+
+    return serve(args) if args.command == 'worker' else run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+.env configuration loader for the SiteRecap test scripts
+Parses /app/.env once into a mapping and reparses only when the file's mtime changes,
+so scripts running in a loop don't reread it on every check
+"""
+
+import os
+import threading
+from types import MappingProxyType
+
+ENV_PATH = '/app/.env'
+DEFAULT_BASE_URL = 'https://siterecap.com'
+
+_ESCAPES = {'n': '\n', 'r': '\r', 't': '\t', '"': '"', '\\': '\\', '$': '$'}
+
+
+def _parse_value(raw):
+    """Parse the text after `=`: quoted values keep '#', unquoted values end at ' #'"""
+    raw = raw.strip()
+    if raw[:1] == '"':
+        value = []
+        i = 1
+        while i < len(raw) and raw[i] != '"':
+            if raw[i] == '\\' and i + 1 < len(raw):
+                i += 1
+                value.append(_ESCAPES.get(raw[i], '\\' + raw[i]))
+            else:
+                value.append(raw[i])
+            i += 1
+        return ''.join(value)
+    if raw[:1] == "'":
+        end = raw.find("'", 1)
+        return raw[1:end] if end != -1 else raw[1:]
+    comment = raw.find(' #')
+    if comment != -1:
+        raw = raw[:comment]
+    return raw.strip()
+
+
+def parse_env(text):
+    """Parse .env text into a dict; later assignments win"""
+    env_vars = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#') or '=' not in line:
+            continue
+        key, raw = line.split('=', 1)
+        key = key.strip()
+        if key.startswith('export '):
+            key = key[len('export '):].strip()
+        if key:
+            env_vars[key] = _parse_value(raw)
+    return env_vars
+
+
+class EnvConfig:
+    """Memoized view of one .env file, invalidated by mtime"""
+
+    def __init__(self, path=ENV_PATH):
+        self.path = path
+        self._stamp = None
+        self._values = MappingProxyType({})
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Return the parsed mapping; raises FileNotFoundError if the file is missing"""
+        st = os.stat(self.path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            if stamp != self._stamp:
+                with open(self.path, 'r') as f:
+                    self._values = MappingProxyType(parse_env(f.read()))
+                self._stamp = stamp
+            return self._values
+
+    def values(self):
+        """Return the parsed mapping, or an empty one if the file is missing"""
+        try:
+            return self.load()
+        except FileNotFoundError:
+            return MappingProxyType({})
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def get(self, key, default=None):
+        return self.values().get(key, default)
+
+
+_configs = {}
+_configs_lock = threading.Lock()
+
+
+def get_config(path=ENV_PATH):
+    """Return the shared loader for a .env path"""
+    with _configs_lock:
+        config = _configs.get(path)
+        if config is None:
+            config = _configs[path] = EnvConfig(path)
+        return config
+
+
+def get_all_env_vars(path=ENV_PATH):
+    """Get all environment variables from the .env file"""
+    return get_config(path).values()
+
+
+def get_env(key, default=None, path=ENV_PATH):
+    return get_config(path).get(key, default)
+
+
+def get_base_url(default=DEFAULT_BASE_URL, path=ENV_PATH):
+    """NEXT_PUBLIC_BASE_URL from the .env file, falling back to the production URL"""
+    return get_config(path).get('NEXT_PUBLIC_BASE_URL', default)
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Caching reverse proxy for Gemini Stage A photo analyses
+Sits between the app and the Generative Language API and answers repeated Stage A calls
+(same prompt, same photo bytes) from cache, so regenerating a report for the same
+project and date, or replaying the demo photos, costs no model time. Responses are keyed
+on a hash of the model, prompt, generation settings and decoded inline image bytes, and
+kept in an LRU-with-TTL memory tier backed by an LRU-with-TTL SQLite tier on disk.
+Stage B (text only) passes through uncached unless --all-stages is set.
+
+Point the app at it with GEMINI_BASE_URL=http://127.0.0.1:8155
+
+    python gemini_cache_proxy.py serve --upstream https://generativelanguage.googleapis.com
+    python gemini_cache_proxy.py bench --photos 20 --repeats 3
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from gemini_standin import GENERATE_PATH, start_gemini_standin
+from http_client import HttpClient
+from report_load_test import percentile
+from standin_server import Counters, JsonRequestHandler, server_url, start_server
+from synthetic_jpeg import make_jpeg
+
+DEFAULT_PORT = 8155
+DEFAULT_UPSTREAM = 'https://generativelanguage.googleapis.com'
+DEFAULT_TTL = 7 * 24 * 3600
+
+# Stage A calls a vision model per photo; give the upstream as long as the app would
+UPSTREAM_TIMEOUT = (10, 120)
+
+# Request headers forwarded upstream; everything else is hop-by-hop or irrelevant
+FORWARD_HEADERS = ('x-goog-api-key', 'x-goog-api-client', 'content-type', 'user-agent')
+
+DISK_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    upstream_ms REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_used_at_idx ON responses(used_at);
+"""
+
+
+def cache_key(model, body):
+    """sha256 over everything that shapes the answer; inline images enter as hashes of their bytes"""
+    digest = hashlib.sha256(model.encode())
+    for content in body.get('contents', []):
+        digest.update(f"\0role:{content.get('role', '')}".encode())
+        for part in content.get('parts', []):
+            if 'text' in part:
+                digest.update(b'\0text:' + part['text'].encode())
+            elif 'inlineData' in part:
+                data = base64.b64decode(part['inlineData'].get('data', ''))
+                digest.update(f"\0image:{part['inlineData'].get('mimeType', '')}:".encode())
+                digest.update(hashlib.sha256(data).digest())
+            else:
+                digest.update(b'\0part:' + json.dumps(part, sort_keys=True).encode())
+    for field in ('generationConfig', 'safetySettings', 'systemInstruction', 'tools'):
+        if field in body:
+            digest.update(f"\0{field}:".encode() + json.dumps(body[field], sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def usable_answer(content):
+    """True when the first candidate finished with STOP and its text parses as JSON
+
+    analyzePhoto and generateReport JSON.parse the text and fall back to a stub otherwise, so
+    caching anything else would pin that stub for the whole TTL.
+    """
+    try:
+        candidate = json.loads(content)['candidates'][0]
+        json.loads(''.join(part.get('text', '') for part in candidate['content']['parts']).strip())
+    except (ValueError, KeyError, IndexError, TypeError, AttributeError):
+        return False
+    return candidate.get('finishReason') == 'STOP'
+
+
+def has_inline_image(body):
+    return any('inlineData' in part for content in body.get('contents', []) for part in content.get('parts', []))
+
+
+class MemoryTier:
+    """LRU with TTL, bounded by entry count and total body bytes"""
+
+    def __init__(self, max_entries=10000, max_bytes=256 * 1024 * 1024, ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            body, upstream_ms, expires_at = entry
+            if expires_at < time.time():
+                self._drop(key)
+                return None
+            self.entries.move_to_end(key)
+            return body, upstream_ms
+
+    def put(self, key, body, upstream_ms, expires_at=None):
+        if len(body) > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._drop(key)
+            self.entries[key] = (body, upstream_ms, expires_at or time.time() + self.ttl)
+            self.bytes += len(body)
+            while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+                self._drop(next(iter(self.entries)))
+
+    def _drop(self, key):
+        body, _, _ = self.entries.pop(key)
+        self.bytes -= len(body)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+
+class DiskTier:
+    """SQLite-backed LRU with TTL, bounded by total body bytes"""
+
+    def __init__(self, path, max_bytes=2 * 1024 * 1024 * 1024, ttl=DEFAULT_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.executescript(DISK_SCHEMA)
+        self.bytes = self.db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def get(self, key):
+        now = time.time()
+        with self.lock:
+            row = self.db.execute('SELECT body, upstream_ms, expires_at FROM responses WHERE key = ?',
+                                  (key,)).fetchone()
+            if row is None:
+                return None
+            if row[2] < now:
+                self._delete(key)
+                return None
+            self.db.execute('UPDATE responses SET used_at = ? WHERE key = ?', (now, key))
+            return bytes(row[0]), row[1], row[2]
+
+    def put(self, key, body, upstream_ms):
+        now = time.time()
+        with self.lock:
+            self._delete(key)
+            self.db.execute('INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?)',
+                            (key, body, len(body), upstream_ms, now + self.ttl, now))
+            self.bytes += len(body)
+            if self.bytes > self.max_bytes:
+                self._evict(now)
+
+    def _delete(self, key):
+        row = self.db.execute('DELETE FROM responses WHERE key = ? RETURNING size', (key,)).fetchone()
+        if row:
+            self.bytes -= row[0]
+
+    def _evict(self, now):
+        """Drop expired entries, then least recently used ones until under the byte budget"""
+        self.db.execute('BEGIN')
+        for (size,) in self.db.execute('DELETE FROM responses WHERE expires_at < ? RETURNING size', (now,)).fetchall():
+            self.bytes -= size
+        rows = self.db.execute('SELECT key, size FROM responses ORDER BY used_at').fetchall()
+        for key, size in rows:
+            if self.bytes <= self.max_bytes:
+                break
+            self.db.execute('DELETE FROM responses WHERE key = ?', (key,))
+            self.bytes -= size
+        self.db.execute('COMMIT')
+
+    def clear(self):
+        with self.lock:
+            self.db.execute('DELETE FROM responses')
+            self.bytes = 0
+
+
+class ResponseCache:
+    """Memory tier in front of an optional disk tier; disk hits are promoted to memory"""
+
+    def __init__(self, memory, disk=None):
+        self.memory = memory
+        self.disk = disk
+        self.counters = Counters()
+        self.bytes_saved = 0
+        self.upstream_ms_saved = 0.0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        hit = self.memory.get(key)
+        tier = 'memory'
+        if hit is None and self.disk:
+            found = self.disk.get(key)
+            if found:
+                body, upstream_ms, expires_at = found
+                self.memory.put(key, body, upstream_ms, expires_at)
+                hit, tier = (body, upstream_ms), 'disk'
+        if hit is None:
+            self.counters.incr('misses')
+            return None
+        self.counters.incr(f"hits.{tier}")
+        with self.lock:
+            self.bytes_saved += len(hit[0])
+            self.upstream_ms_saved += hit[1]
+        return hit[0]
+
+    def put(self, key, body, upstream_ms):
+        self.memory.put(key, body, upstream_ms)
+        if self.disk:
+            self.disk.put(key, body, upstream_ms)
+
+    def stats(self):
+        counts = self.counters.snapshot()
+        hits = counts.get('hits.memory', 0) + counts.get('hits.disk', 0)
+        lookups = hits + counts.get('misses', 0)
+        with self.lock:
+            saved = {'bytes_saved': self.bytes_saved, 'upstream_seconds_saved': self.upstream_ms_saved / 1000}
+        return dict(
+            counts, **saved,
+            hit_rate=hits / lookups if lookups else 0.0,
+            memory_entries=len(self.memory.entries),
+            memory_bytes=self.memory.bytes,
+            disk_bytes=self.disk.bytes if self.disk else 0
+        )
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk:
+            self.disk.clear()
+        self.counters = Counters()
+        with self.lock:
+            self.bytes_saved = 0
+            self.upstream_ms_saved = 0.0
+
+
+class GeminiCacheHandler(JsonRequestHandler):
+    def route(self, method):
+        server = self.server
+        if self.route_path == '/_cache/stats' and method == 'GET':
+            return self.send_json(200, server.cache.stats())
+        if self.route_path == '/_cache/clear' and method == 'POST':
+            server.cache.clear()
+            return self.send_json(200, {'cleared': True})
+
+        raw = self.read_body()
+        match = GENERATE_PATH.match(self.route_path)
+        body = json.loads(raw) if match and method == 'POST' and raw else None
+        cacheable = body is not None and (server.all_stages or has_inline_image(body))
+        if not cacheable:
+            server.cache.counters.incr('passthrough')
+            return self.forward(method, raw)
+
+        key = cache_key(match.group(2), body)
+        cached = server.cache.get(key)
+        if cached is not None:
+            return self.send_body(200, cached, headers={'X-Cache': 'HIT'})
+        start = time.perf_counter()
+        response = self.forward(method, raw, {'X-Cache': 'MISS'})
+        if response is None or response.status_code != 200:
+            return
+        if usable_answer(response.content):
+            server.cache.put(key, response.content, (time.perf_counter() - start) * 1000)
+        else:
+            server.cache.counters.incr('unusable')
+
+    def forward(self, method, raw, extra_headers=None):
+        """Relay the request upstream and its answer back; returns the upstream response"""
+        headers = {name: value for name, value in self.headers.items() if name.lower() in FORWARD_HEADERS}
+        try:
+            response = self.server.client.request(method, self.server.upstream + self.path, data=raw or None,
+                                                  headers=headers, timeout=UPSTREAM_TIMEOUT)
+        except Exception as e:
+            self.server.cache.counters.incr('upstream_errors')
+            self.send_json(502, {'error': {'code': 502, 'message': f"Upstream unreachable: {e}", 'status': 'UNAVAILABLE'}})
+            return None
+        if response.status_code >= 400:
+            self.server.cache.counters.incr('upstream_errors')
+        self.send_body(response.status_code, response.content,
+                       response.headers.get('Content-Type', 'application/json'), extra_headers)
+        return response
+
+
+def start_gemini_cache_proxy(upstream=DEFAULT_UPSTREAM, host='127.0.0.1', port=0, ttl=DEFAULT_TTL,
+                             memory_entries=10000, memory_mb=256, disk_path=None, disk_mb=2048, all_stages=False):
+    """Start the proxy on a background thread and return the server"""
+    memory = MemoryTier(memory_entries, memory_mb * 1024 * 1024, ttl)
+    disk = DiskTier(disk_path, disk_mb * 1024 * 1024, ttl) if disk_path else None
+    return start_server(
+        GeminiCacheHandler, host, port,
+        upstream=upstream.rstrip('/'),
+        client=HttpClient(timeout=UPSTREAM_TIMEOUT, recorder=None),
+        cache=ResponseCache(memory, disk),
+        all_stages=all_stages
+    )
+
+
+def stage_a_request(image_bytes):
+    """generateContent body shaped like analyzePhoto's [prompt, imagePart] call"""
+    return {'contents': [{'role': 'user', 'parts': [
+        {'text': 'You are an expert construction site analyst. Analyze this construction site photo.'},
+        {'inlineData': {'data': base64.b64encode(image_bytes).decode('ascii'), 'mimeType': 'image/jpeg'}}
+    ]}]}
+
+
+def run_bench(args):
+    """Replay the same photo set several times through the proxy, as regenerations would"""
+    standin = start_gemini_standin('fast', seed=args.seed, latency_a=args.latency_a)
+    disk_path = os.path.join(args.disk_dir, 'gemini-cache.sqlite') if args.disk_dir else None
+    proxy = start_gemini_cache_proxy(server_url(standin), disk_path=disk_path, ttl=args.ttl)
+    url = f"{server_url(proxy)}/v1beta/models/gemini-2.0-flash-exp:generateContent"
+    bodies = [json.dumps(stage_a_request(make_jpeg(640, 480, seed=i))).encode() for i in range(args.photos)]
+    client = HttpClient(recorder=None)
+
+    print(f"🧠 GEMINI STAGE A CACHE BENCHMARK")
+    print(f"📍 Proxy {server_url(proxy)} → stand-in {server_url(standin)} (Stage A latency {standin.latency_a})")
+    print(f"🔁 {args.photos} photos x {args.repeats} passes at concurrency {args.concurrency}"
+          f"{', disk tier ' + disk_path if disk_path else ''}")
+
+    def send(body):
+        start = time.perf_counter()
+        response = client.post(url, data=body, headers={'Content-Type': 'application/json'})
+        return time.perf_counter() - start, response.headers.get('X-Cache'), response.status_code
+
+    ok = True
+    for repeat in range(args.repeats):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            results = list(executor.map(send, bodies))
+        elapsed = time.perf_counter() - start
+        latencies = sorted(latency for latency, _, _ in results)
+        hits = sum(cache == 'HIT' for _, cache, _ in results)
+        ok &= all(status == 200 for _, _, status in results)
+        print(f"   pass {repeat + 1}: {elapsed:.2f}s, {hits}/{len(results)} hits, "
+              f"p50 {percentile(latencies, 50) * 1000:.1f} ms, p99 {percentile(latencies, 99) * 1000:.1f} ms")
+
+    stats = proxy.cache.stats()
+    print(f"\n📊 Hit rate {stats['hit_rate']:.1%} (memory {stats.get('hits.memory', 0)}, disk {stats.get('hits.disk', 0)}, "
+          f"misses {stats.get('misses', 0)}, not cached as unusable {stats.get('unusable', 0)})")
+    print(f"💾 {stats['bytes_saved'] / 1024:.0f} KiB served from cache, "
+          f"{stats['upstream_seconds_saved']:.1f}s of model time saved; "
+          f"stand-in saw {standin.counters.snapshot().get('stage_a.requests', 0)} Stage A calls")
+    proxy.shutdown()
+    standin.shutdown()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Caching reverse proxy for Gemini Stage A analyses")
+    sub = parser.add_subparsers(dest='command')
+    for name in ('serve', 'bench'):
+        p = sub.add_parser(name)
+        p.add_argument('--ttl', type=float, default=DEFAULT_TTL, help="Seconds a cached analysis stays valid")
+    serve = sub.choices['serve']
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve.add_argument('--upstream', default=DEFAULT_UPSTREAM, help="Gemini API base URL")
+    serve.add_argument('--memory-entries', type=int, default=10000)
+    serve.add_argument('--memory-mb', type=int, default=256)
+    serve.add_argument('--disk', help="SQLite file for the on-disk tier (memory only without it)")
+    serve.add_argument('--disk-mb', type=int, default=2048)
+    serve.add_argument('--all-stages', action='store_true', help="Also cache text-only (Stage B) calls")
+    bench = sub.choices['bench']
+    bench.add_argument('--photos', type=int, default=20)
+    bench.add_argument('--repeats', type=int, default=3)
+    bench.add_argument('--concurrency', type=int, default=4)
+    bench.add_argument('--latency-a', default='lognormal:1800,0.35', help="Stand-in Stage A latency")
+    bench.add_argument('--disk-dir', help="Directory for an on-disk tier during the bench")
+    bench.add_argument('--seed', type=int, default=0)
+    argv = sys.argv[1:]
+    if not argv or argv[0] not in sub.choices and argv[0] not in ('-h', '--help'):
+        argv = ['serve'] + argv
+    args = parser.parse_args(argv)
+
+    if args.command == 'bench':
+        return run_bench(args)
+
+    server = start_gemini_cache_proxy(args.upstream, args.host, args.port, args.ttl, args.memory_entries,
+                                      args.memory_mb, args.disk, args.disk_mb, args.all_stages)
+    print(f"🧠 Gemini cache proxy listening on {server_url(server)} → {server.upstream}")
+    print(f"   Memory tier: {args.memory_entries} entries / {args.memory_mb} MiB, "
+          f"disk tier: {args.disk or 'off'}, TTL {args.ttl:g}s")
+    print(f"   Set GEMINI_BASE_URL={server_url(server)} for the Next.js app")
+    print(f"   Cache metrics at {server_url(server)}/_cache/stats")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Local Gemini stand-in for offline generate-report benchmarks
+Speaks enough of the Generative Language API (models/{model}:generateContent) to answer
+the Stage A photo analysis and Stage B report prompts in lib/ai-pipeline.js with
+schema-valid JSON, with configurable latency, rate limiting and malformed responses.
+
+Point the app at it with GEMINI_BASE_URL=http://127.0.0.1:8150
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+
+from standin_server import (
+    Counters, JsonRequestHandler, LatencyDistribution, SeededRandom, TokenBucket, sleep_ms, start_server
+)
+
+DEFAULT_PORT = 8150
+
+GENERATE_PATH = re.compile(r'^/(v1beta|v1)/models/([^/:]+):generateContent$')
+
+# Named profiles; any field can be overridden from the command line
+PROFILES = {
+    'fast': {'latency_a': 'fixed:5', 'latency_b': 'fixed:10',
+             'rate_limit_rate': 0.0, 'malformed_rate': 0.0, 'error_rate': 0.0},
+    'realistic': {'latency_a': 'lognormal:1800,0.35', 'latency_b': 'lognormal:4500,0.3',
+                  'rate_limit_rate': 0.0, 'malformed_rate': 0.0, 'error_rate': 0.0},
+    'degraded': {'latency_a': 'lognormal:6000,0.6', 'latency_b': 'lognormal:12000,0.5',
+                 'rate_limit_rate': 0.05, 'malformed_rate': 0.02, 'error_rate': 0.01},
+    'flaky': {'latency_a': 'lognormal:1800,0.35', 'latency_b': 'lognormal:4500,0.3',
+              'rate_limit_rate': 0.15, 'malformed_rate': 0.05, 'error_rate': 0.05},
+}
+
+SPACES = ['Kitchen', 'Bathroom', 'Bedroom', 'Living', 'Exterior', 'Garage', 'Hall', 'Dining', 'Stair', 'Basement']
+PHASES = ['Demo', 'Framing', 'Electrical Rough', 'Plumbing Rough', 'Drywall', 'Paint', 'Flooring', 'Cabinets', 'Finish', 'Punch']
+TRADES = ['Carpentry', 'Electrical', 'Plumbing', 'Drywall', 'Painting', 'Flooring', 'HVAC']
+EQUIPMENT = [('Circular saw', 'power_tool'), ('Drill driver', 'power_tool'), ('8ft step ladder', 'hand_tool'),
+             ('Laser level', 'hand_tool'), ('Skid steer', 'heavy_machinery'), ('Pickup truck', 'vehicle')]
+MATERIALS = ['2x4 SPF lumber', '1/2" drywall sheets', '12/2 Romex cable', 'PEX tubing', 'Base cabinets', 'LVP flooring']
+HAZARDS = [('Trip hazard', 'Loose cords across walkway'), ('Fall hazard', 'Unguarded stair opening'),
+           ('Debris accumulation', 'Offcuts on work surface'), ('Missing PPE', 'Worker without safety glasses')]
+SEVERITIES = ['low', 'med', 'high']
+
+
+def stage_a_analysis(image_data):
+    """Deterministic analyzePhoto-shaped JSON for one image"""
+    rng = random.Random(hashlib.sha256(image_data.encode()).digest()[:8])
+    space = rng.choice(SPACES)
+    phase = rng.choice(PHASES)
+    trade = rng.choice(TRADES)
+    tasks = [{
+        'name': f"{phase} work - {trade.lower()} in {space.lower()}",
+        'confidence': round(rng.uniform(0.6, 0.95), 2),
+        'progress_percentage': rng.randint(10, 100),
+        'quality_notes': rng.choice(['Level and plumb', 'Within tolerance', 'Minor touch-up needed'])
+    } for _ in range(rng.randint(1, 3))]
+    hazard_type, hazard_description = rng.choice(HAZARDS)
+    equipment_name, equipment_category = rng.choice(EQUIPMENT)
+    material = rng.choice(MATERIALS)
+    return {
+        'space': space,
+        'phase': phase,
+        'caption': f"{phase} in progress in the {space.lower()} with {trade.lower()} crew on site",
+        'objects': [material, equipment_name],
+        'tasks': tasks,
+        'hazards': [{'type': hazard_type, 'severity': rng.choice(SEVERITIES), 'description': hazard_description}]
+                   if rng.random() < 0.5 else [],
+        'personnel_count': rng.randint(0, 6),
+        'equipment': [{'name': equipment_name, 'category': equipment_category,
+                       'condition': rng.choice(['good', 'fair', 'poor', 'unknown'])}],
+        'materials': [{'name': material, 'status': rng.choice(['delivered', 'in_use', 'stored', 'waste']),
+                       'quantity': f"{rng.randint(2, 200)} units", 'condition': rng.choice(['new', 'used'])}],
+        'deliveries': [],
+        'safety_issues': [],
+        'delaying_events': [],
+        'trade_work': [{'trade': trade, 'work_description': tasks[0]['name'],
+                        'completion_estimate': f"{tasks[0]['progress_percentage']}%"}],
+        'next_steps': [f"Continue {phase.lower()} in {space.lower()}"],
+        'confidence_score': round(rng.uniform(6.5, 9.5), 1),
+        'confidence_notes': 'Synthetic analysis from the Gemini stand-in'
+    }
+
+
+def _photo_analyses(prompt):
+    match = re.search(r'Photo Analyses:\s*(.*?)\n\s*\nGenerate a professional', prompt, re.S)
+    if not match:
+        return []
+    try:
+        analyses = json.loads(match.group(1))
+        return analyses if isinstance(analyses, list) else []
+    except ValueError:
+        return []
+
+
+def stage_b_report(prompt):
+    """generateReport-shaped JSON aggregated from the analyses embedded in the prompt"""
+    return aggregate_report(_photo_analyses(prompt))
+
+
+def aggregate_report(analyses):
+    """generateReport-shaped JSON for a list of Stage A analyses"""
+    sections = {}
+    personnel = 0
+    trades = set()
+    for analysis in analyses:
+        index = analysis.get('photoIndex', 0)
+        key = (analysis.get('space') or 'Unspecified', analysis.get('phase') or '')
+        section = sections.setdefault(key, {
+            'space': key[0], 'phase': key[1], 'tasks': [], 'hazards': [],
+            'trade_activities': [], 'materials_used': [], 'next_phase_requirements': []
+        })
+        for task in analysis.get('tasks') or []:
+            section['tasks'].append(dict(task, photos=[index]))
+        for hazard in analysis.get('hazards') or []:
+            section['hazards'].append({'type': hazard.get('type', ''), 'severity': hazard.get('severity', 'low'),
+                                       'osha_concern': hazard.get('description', ''),
+                                       'corrective_action': 'Address before next shift', 'photo': index})
+        for work in analysis.get('trade_work') or []:
+            trades.add(work.get('trade', ''))
+        personnel += analysis.get('personnel_count') or 0
+    if not sections:
+        sections[('Unspecified', '')] = {'space': 'Unspecified', 'phase': '',
+                                         'tasks': [{'name': 'Progress documented', 'confidence': 0.5, 'photos': []}],
+                                         'hazards': []}
+    return {
+        'site_summary': f"Work documented across {len(sections)} area(s) from {len(analyses)} photo(s)",
+        'sections': list(sections.values()),
+        'personnel_summary': {'total_count': personnel, 'trades_present': sorted(t for t in trades if t),
+                              'safety_compliance': 'PPE observed', 'productivity_notes': 'Crew working steadily'},
+        'equipment_summary': [],
+        'materials_summary': [],
+        'deliveries_summary': [],
+        'safety_summary': {'osha_compliance': 'No major violations observed', 'ppe_usage': 'Hard hats and boots',
+                           'incidents': 'None reported', 'concerns': []},
+        'quality_control': [],
+        'delays_summary': [],
+        'budget_impact': {'labor_hours': personnel * 8, 'overtime_hours': 0, 'material_waste': 'minimal',
+                          'cost_impacts': 'On budget'},
+        'changes_since_yesterday': [f"{key[1] or 'Work'} progressed in {key[0]}" for key in sections],
+        'next_day_plan': ['Continue work as planned'],
+        'inspector_notes': 'Synthetic report from the Gemini stand-in',
+        'weather_impact': 'No weather impact recorded',
+        'overall_progress': 'On schedule'
+    }
+
+
+def malformed_text(valid_text, rng):
+    """Responses that make JSON.parse(response.trim()) throw, as real models sometimes do"""
+    kind = rng.choice(['fenced', 'truncated', 'prose'])
+    if kind == 'fenced':
+        return f"```json\n{valid_text}\n```"
+    if kind == 'truncated':
+        return valid_text[:max(1, len(valid_text) // 2)]
+    return f"Here is the analysis you asked for:\n{valid_text}"
+
+
+def _error(code, status, message):
+    return {'error': {'code': code, 'message': message, 'status': status}}
+
+
+class GeminiHandler(JsonRequestHandler):
+    def route(self, method):
+        server = self.server
+        if self.route_path == '/_standin/stats' and method == 'GET':
+            return self.send_json(200, server.counters.snapshot())
+        if self.route_path == '/_standin/reset' and method == 'POST':
+            server.counters = Counters()
+            return self.send_json(200, {'reset': True})
+
+        match = GENERATE_PATH.match(self.route_path)
+        if not match or method != 'POST':
+            return self.send_json(404, _error(404, 'NOT_FOUND', f"Unknown path {self.route_path}"))
+
+        body = self.read_json()
+        parts = [part for content in body.get('contents', []) for part in content.get('parts', [])]
+        prompt = '\n'.join(part['text'] for part in parts if 'text' in part)
+        images = [part['inlineData']['data'] for part in parts if 'inlineData' in part]
+        stage = 'stage_a' if images else ('stage_b' if 'Photo Analyses:' in prompt else 'other')
+        counters = server.counters
+        counters.incr(f"{stage}.requests")
+
+        if server.bucket and not server.bucket.take():
+            counters.incr(f"{stage}.rate_limited")
+            return self.send_json(429, _error(429, 'RESOURCE_EXHAUSTED', 'Resource has been exhausted (e.g. check quota).'))
+        if server.random.random() < server.rate_limit_rate:
+            counters.incr(f"{stage}.rate_limited")
+            return self.send_json(429, _error(429, 'RESOURCE_EXHAUSTED', 'Resource has been exhausted (e.g. check quota).'))
+        if server.random.random() < server.error_rate:
+            counters.incr(f"{stage}.errors")
+            return self.send_json(503, _error(503, 'UNAVAILABLE', 'The model is overloaded. Please try again later.'))
+
+        latency = server.latency_b if stage == 'stage_b' else server.latency_a
+        sleep_ms(server.random.latency_ms(latency))
+
+        if stage == 'stage_a':
+            text = json.dumps(stage_a_analysis(images[0]))
+        elif stage == 'stage_b':
+            text = json.dumps(stage_b_report(prompt))
+        else:
+            text = 'Hello from the Gemini stand-in'
+
+        if stage != 'other' and server.random.random() < server.malformed_rate:
+            counters.incr(f"{stage}.malformed")
+            with server.text_lock:
+                text = malformed_text(text, server.text_random)
+        else:
+            counters.incr(f"{stage}.ok")
+
+        prompt_tokens = len(prompt) // 4 + 258 * len(images)
+        output_tokens = len(text) // 4
+        self.send_json(200, {
+            'candidates': [{
+                'content': {'parts': [{'text': text}], 'role': 'model'},
+                'finishReason': 'STOP',
+                'index': 0
+            }],
+            'usageMetadata': {
+                'promptTokenCount': prompt_tokens,
+                'candidatesTokenCount': output_tokens,
+                'totalTokenCount': prompt_tokens + output_tokens
+            },
+            'modelVersion': match.group(2)
+        })
+
+
+def start_gemini_standin(profile='fast', host='127.0.0.1', port=0, seed=None, rpm=None, **overrides):
+    """Start the stand-in on a background thread and return the server"""
+    settings = dict(PROFILES[profile])
+    settings.update({k: v for k, v in overrides.items() if v is not None})
+    return start_server(
+        GeminiHandler, host, port,
+        latency_a=LatencyDistribution.parse(settings['latency_a']),
+        latency_b=LatencyDistribution.parse(settings['latency_b']),
+        rate_limit_rate=float(settings['rate_limit_rate']),
+        malformed_rate=float(settings['malformed_rate']),
+        error_rate=float(settings['error_rate']),
+        bucket=TokenBucket(rpm) if rpm else None,
+        random=SeededRandom(seed),
+        text_random=random.Random(seed),
+        text_lock=threading.Lock(),
+        counters=Counters()
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Gemini stand-in for generate-report benchmarks")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='realistic')
+    parser.add_argument('--latency-a', help="Stage A latency, e.g. lognormal:1800,0.35")
+    parser.add_argument('--latency-b', help="Stage B latency, e.g. lognormal:4500,0.3")
+    parser.add_argument('--rate-limit-rate', type=float, help="Share of requests answered with 429")
+    parser.add_argument('--rpm', type=int, help="Requests-per-minute quota before answering 429")
+    parser.add_argument('--malformed-rate', type=float, help="Share of responses that are not valid JSON")
+    parser.add_argument('--error-rate', type=float, help="Share of requests answered with 503")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    server = start_gemini_standin(
+        args.profile, args.host, args.port, seed=args.seed, rpm=args.rpm,
+        latency_a=args.latency_a, latency_b=args.latency_b, rate_limit_rate=args.rate_limit_rate,
+        malformed_rate=args.malformed_rate, error_rate=args.error_rate
+    )
+    print(f"🤖 Gemini stand-in listening on http://{args.host}:{server.server_address[1]} (profile: {args.profile})")
+    print(f"   Stage A latency: {server.latency_a}, Stage B latency: {server.latency_b}")
+    print(f"   429 rate: {server.rate_limit_rate}, malformed rate: {server.malformed_rate}, 503 rate: {server.error_rate}")
+    print(f"   Set GEMINI_BASE_URL=http://{args.host}:{server.server_address[1]} for the Next.js app")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
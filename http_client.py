@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP client for the SiteRecap test scripts
+Keeps connections alive per host so repeated calls skip the TCP+TLS handshake,
+uses HTTP/2 when httpx and h2 are installed, owns the timeouts for every call and
+records every call's latency per endpoint. With phase timing enabled, each call instead
+goes over a fresh connection whose DNS/connect/TLS/TTFB/transfer times are recorded.
+With adaptive concurrency enabled, calls wait for a slot under a per-endpoint AIMD limit.
+With adaptive timeouts enabled, read timeouts follow each endpoint's learned p99 and slow
+idempotent calls can be hedged with a duplicate request.
+"""
+
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from adaptive_concurrency import AdaptiveConcurrency
+from adaptive_timeouts import AdaptiveTimeouts
+from latency_histogram import LatencyRecorder
+from phase_timing import PhaseTimingTransport
+
+try:
+    import httpx
+    import h2  # noqa: F401 - httpx needs it for http2=True
+    HTTP2_AVAILABLE = True
+except ImportError:
+    httpx = None
+    HTTP2_AVAILABLE = False
+
+# Single place for timeouts: (connect, read) in seconds
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 30
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+# Keep-alive connections held per host; raise for hosts the suites hit in parallel
+DEFAULT_POOL_SIZE = 16
+HOST_POOL_SIZES = {
+    'siterecap.com': 16,
+    'www.siterecap.com': 16,
+    'localhost:3000': 32,
+}
+
+
+# Latency of every call made through the shared client, keyed by (method, endpoint)
+LATENCY = LatencyRecorder()
+
+
+def host_key(url):
+    """Return the host[:port] a URL's connections are pooled under"""
+    return urlsplit(url).netloc
+
+
+def endpoint_key(url):
+    """scheme://host/path without the query string, so latencies group per endpoint"""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}{parts.path or '/'}"
+
+
+class HttpClient:
+    """Pooled client with a requests-style get/post API"""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, pool_size=DEFAULT_POOL_SIZE,
+                 host_pool_sizes=None, http2=None, recorder=LATENCY):
+        self.timeout = timeout
+        self.recorder = recorder
+        self.phase_transport = None
+        self.concurrency = None
+        self.timeouts = None
+        self.pool_size = pool_size
+        self.host_pool_sizes = dict(HOST_POOL_SIZES if host_pool_sizes is None else host_pool_sizes)
+        self.http2 = HTTP2_AVAILABLE if http2 is None else (http2 and HTTP2_AVAILABLE)
+        self._session = requests.Session()
+        self._mounted = set()
+        self._http2_clients = {}
+        self._lock = threading.Lock()
+
+    def _pool_size_for(self, host):
+        return self.host_pool_sizes.get(host, self.pool_size)
+
+    def _requests_session(self, url):
+        parts = urlsplit(url)
+        prefix = f"{parts.scheme}://{parts.netloc}"
+        with self._lock:
+            if prefix not in self._mounted:
+                size = self._pool_size_for(parts.netloc)
+                self._session.mount(prefix, HTTPAdapter(pool_connections=1, pool_maxsize=size))
+                self._mounted.add(prefix)
+        return self._session
+
+    def _http2_client(self, url):
+        host = host_key(url)
+        with self._lock:
+            client = self._http2_clients.get(host)
+            if client is None:
+                size = self._pool_size_for(host)
+                client = httpx.Client(
+                    http2=True,
+                    limits=httpx.Limits(max_connections=size, max_keepalive_connections=size),
+                )
+                self._http2_clients[host] = client
+        return client
+
+    def request(self, method, url, timeout=None, allow_redirects=True, **kwargs):
+        """Send a request over the pooled connection for the URL's host, recording its latency"""
+        if self.concurrency is None:
+            return self._recorded(method, url, timeout, allow_redirects, **kwargs)
+        limiter = self.concurrency.limiter(method, endpoint_key(url))
+        started = limiter.acquire()
+        response = None
+        try:
+            response = self._recorded(method, url, timeout, allow_redirects, **kwargs)
+            return response
+        finally:
+            limiter.release_response(started, response)
+
+    def _recorded(self, method, url, timeout, allow_redirects, **kwargs):
+        if self.recorder is None:
+            return self._adaptive(method, url, timeout, allow_redirects, **kwargs)
+        start = time.perf_counter()
+        try:
+            response = self._adaptive(method, url, timeout, allow_redirects, **kwargs)
+        except Exception:
+            self.recorder.record(method, endpoint_key(url), time.perf_counter() - start, error=True)
+            raise
+        self.recorder.record(method, endpoint_key(url), time.perf_counter() - start,
+                             error=response.status_code >= 500)
+        return response
+
+    def _adaptive(self, method, url, timeout, allow_redirects, **kwargs):
+        if self.timeouts is None:
+            return self._send(method, url, timeout, allow_redirects, **kwargs)
+        key = (method.upper(), endpoint_key(url))
+        return self.timeouts.send(
+            key, method,
+            lambda attempt_timeout: self._send(method, url, attempt_timeout, allow_redirects, **kwargs),
+            timeout if timeout is not None else self.timeout, kwargs,
+            limiter=self.concurrency.limiter(*key) if self.concurrency else None
+        )
+
+    def enable_phase_timing(self, verify=True):
+        """Time connection phases from now on; connections are no longer reused"""
+        self.phase_transport = PhaseTimingTransport(verify=verify)
+        return self.phase_transport.recorder
+
+    def enable_adaptive_concurrency(self, **options):
+        """Limit calls per endpoint with AIMD from now on; options go to AimdLimiter"""
+        self.concurrency = AdaptiveConcurrency(**options)
+        return self.concurrency
+
+    def enable_adaptive_timeouts(self, hedge=False, seed_path=None, **options):
+        """Learn per-endpoint timeouts from now on (seeded from an exported latency JSON), optionally hedging GETs"""
+        self.timeouts = AdaptiveTimeouts(hedge=hedge, **options)
+        if seed_path:
+            self.timeouts.seed(seed_path)
+        return self.timeouts
+
+    def _send(self, method, url, timeout, allow_redirects, **kwargs):
+        timeout = timeout if timeout is not None else self.timeout
+        if self.phase_transport:
+            return self.phase_transport.request(method, url, timeout, allow_redirects,
+                                                endpoint_key=endpoint_key, **kwargs)
+        if self.http2 and url.startswith('https://'):
+            if isinstance(timeout, tuple):
+                timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+            if 'data' in kwargs and not isinstance(kwargs['data'], dict):
+                kwargs['content'] = kwargs.pop('data')  # httpx takes raw and streamed bodies as content
+            return self._http2_client(url).request(
+                method, url, timeout=timeout, follow_redirects=allow_redirects, **kwargs
+            )
+        return self._requests_session(url).request(
+            method, url, timeout=timeout, allow_redirects=allow_redirects, **kwargs
+        )
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        self._session.close()
+        for client in self._http2_clients.values():
+            client.close()
+        self._http2_clients.clear()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide shared client"""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
+
+
+def get(url, **kwargs):
+    return get_client().get(url, **kwargs)
+
+
+def post(url, **kwargs):
+    return get_client().post(url, **kwargs)
+
+
+def export_timings(path):
+    """Write the shared client's latency histograms, plus any enabled phase, concurrency and timeout data, as JSON"""
+    client = get_client()
+    data = client.recorder.to_dict() if client.recorder else {}
+    if client.phase_transport:
+        data['phases'] = client.phase_transport.recorder.to_dict()
+    if client.concurrency:
+        data['concurrency'] = client.concurrency.to_dict()
+    if client.timeouts:
+        data['timeouts'] = client.timeouts.to_dict()
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def print_timings():
+    """Print the shared client's latency summary, plus any enabled phase, concurrency and timeout data"""
+    client = get_client()
+    if client.recorder:
+        client.recorder.print_summary()
+    if client.phase_transport:
+        client.phase_transport.recorder.print_summary()
+    if client.concurrency:
+        client.concurrency.print_summary()
+    if client.timeouts:
+        client.timeouts.print_summary()
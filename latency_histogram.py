@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+HDR-style latency histograms for the SiteRecap test scripts
+Values are recorded in microseconds into log-linear buckets that keep three significant
+figures at any magnitude, so p99 of a 40 ms call and of a 40 s call are equally precise
+and histograms from different runs merge by adding counts.
+
+DDSketch offers the same interface with a fixed-size array of logarithmic bins and a chosen
+relative accuracy, so memory per endpoint stays constant on soak and distributed runs; it backs
+LatencyRecorder, the per-endpoint latency store of the shared HTTP client.
+"""
+
+import json
+import math
+import threading
+from array import array
+
+# Two sub-bucket halves of 1024 give a worst-case relative error of 1/1024 (three significant figures)
+SUB_BUCKET_BITS = 11
+
+SUMMARY_PERCENTILES = (50, 90, 99)
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+# Bins kept per DDSketch; at 1% accuracy 2048 bins span 1 µs to beyond a day before collapsing
+DEFAULT_MAX_BINS = 2048
+
+
+class LatencyHistogram:
+    """Sparse HDR-style histogram of integer microsecond values"""
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self.sum = 0
+
+    @staticmethod
+    def bucket_index(value):
+        shift = max(0, value.bit_length() - SUB_BUCKET_BITS)
+        return (shift << (SUB_BUCKET_BITS - 1)) + (value >> shift)
+
+    @staticmethod
+    def bucket_range(index):
+        """(lowest, highest) value that lands in bucket `index`"""
+        shift = max(0, (index >> (SUB_BUCKET_BITS - 1)) - 1)
+        sub = index - (shift << (SUB_BUCKET_BITS - 1))
+        return sub << shift, ((sub + 1) << shift) - 1
+
+    def record(self, value_us, count=1):
+        value = max(0, int(value_us))
+        index = self.bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total += count
+        self.sum += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = max(self.max, value)
+
+    def record_seconds(self, seconds):
+        self.record(seconds * 1e6)
+
+    def merge(self, other):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        if other.total:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        self.total += other.total
+        self.sum += other.sum
+        return self
+
+    def percentile(self, q):
+        """Highest value equivalent to the q-th percentile sample, like HdrHistogram reports it"""
+        if not self.total:
+            return 0
+        target = max(1, math.ceil(q / 100 * self.total))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self.bucket_range(index)[1], self.max)
+        return self.max
+
+    def mean(self):
+        return self.sum / self.total if self.total else 0.0
+
+    def buckets(self):
+        """(value reported for the bucket, count) per non-empty bucket, lowest first"""
+        for index in sorted(self.counts):
+            yield min(self.bucket_range(index)[1], self.max), self.counts[index]
+
+    def to_dict(self):
+        return {
+            'count': self.total,
+            'min_us': self.min or 0,
+            'max_us': self.max,
+            'mean_us': self.mean(),
+            'percentiles_us': {f"p{q}": self.percentile(q) for q in SUMMARY_PERCENTILES},
+            'sub_bucket_bits': SUB_BUCKET_BITS,
+            'buckets': {str(index): count for index, count in sorted(self.counts.items())}
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls()
+        histogram.counts = {int(index): count for index, count in data['buckets'].items()}
+        histogram.total = data['count']
+        histogram.min = data['min_us'] if data['count'] else None
+        histogram.max = data['max_us']
+        histogram.sum = int(data['mean_us'] * data['count'])
+        return histogram
+
+
+class DDSketch:
+    """Mergeable quantile sketch with bounded relative error (Masson et al., VLDB 2019)
+
+    Value v > 0 lands in bin ceil(log_gamma(v)) with gamma = (1 + a) / (1 - a), so every bin's
+    midpoint is within relative accuracy a of any value in it. Bins live in one contiguous
+    array; past max_bins the lowest bins are collapsed together, which only costs accuracy
+    at the bottom of the distribution, never at the tail percentiles that matter here.
+    """
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY, max_bins=DEFAULT_MAX_BINS):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.max_bins = max_bins
+        self.bins = array('Q')
+        self.offset = 0
+        self.zero_count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self.sum = 0
+
+    def key(self, value):
+        return math.ceil(math.log(value) / self.log_gamma)
+
+    def value(self, key):
+        """Midpoint of bin `key` in the relative-error sense"""
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def _reserve(self, low, high):
+        """Grow the bin array to cover keys low..high, collapsing the lowest bins if needed"""
+        if not self.bins:
+            self.offset = max(low, high - self.max_bins + 1)
+            self.bins = array('Q', [0]) * (high - self.offset + 1)
+            return
+        if low < self.offset:
+            self.bins = array('Q', [0]) * (self.offset - low) + self.bins
+            self.offset = low
+        top = self.offset + len(self.bins) - 1
+        if high > top:
+            self.bins.extend(array('Q', [0]) * (high - top))
+        excess = len(self.bins) - self.max_bins
+        if excess > 0:
+            collapsed = sum(self.bins[:excess + 1])
+            del self.bins[:excess]
+            self.bins[0] = collapsed
+            self.offset += excess
+
+    def _index(self, key):
+        return max(key, self.offset) - self.offset
+
+    def record(self, value_us, count=1):
+        value = max(0, int(value_us))
+        if value == 0:
+            self.zero_count += count
+        else:
+            key = self.key(value)
+            self._reserve(key, key)
+            self.bins[self._index(key)] += count
+        self.total += count
+        self.sum += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = max(self.max, value)
+
+    def record_seconds(self, seconds):
+        self.record(seconds * 1e6)
+
+    def merge(self, other):
+        """Add another sketch's counts; exact when both share the same relative accuracy"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("cannot merge sketches with different relative accuracy")
+        if other.bins:
+            self._reserve(other.offset, other.offset + len(other.bins) - 1)
+            for i, count in enumerate(other.bins):
+                if count:
+                    self.bins[self._index(other.offset + i)] += count
+        self.zero_count += other.zero_count
+        if other.total:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        self.total += other.total
+        self.sum += other.sum
+        return self
+
+    def percentile(self, q):
+        """Estimate of the nearest-rank q-th percentile, within relative_accuracy of it"""
+        if not self.total:
+            return 0
+        target = max(1, math.ceil(q / 100 * self.total))
+        seen = self.zero_count
+        if seen >= target:
+            return 0
+        for i, count in enumerate(self.bins):
+            seen += count
+            if seen >= target:
+                return min(max(self.value(self.offset + i), self.min), self.max)
+        return self.max
+
+    def mean(self):
+        return self.sum / self.total if self.total else 0.0
+
+    def buckets(self):
+        """(value reported for the bin, count) per non-empty bin, lowest first"""
+        if self.zero_count:
+            yield 0, self.zero_count
+        for i, count in enumerate(self.bins):
+            if count:
+                yield min(max(self.value(self.offset + i), self.min), self.max), count
+
+    def to_dict(self):
+        return {
+            'count': self.total,
+            'min_us': self.min or 0,
+            'max_us': self.max,
+            'mean_us': self.mean(),
+            'percentiles_us': {f"p{q}": self.percentile(q) for q in SUMMARY_PERCENTILES},
+            'sketch': 'ddsketch',
+            'relative_accuracy': self.relative_accuracy,
+            'max_bins': self.max_bins,
+            'zero_count': self.zero_count,
+            'offset': self.offset,
+            'bins': list(self.bins)
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['relative_accuracy'], data['max_bins'])
+        sketch.bins = array('Q', data['bins'])
+        sketch.offset = data['offset']
+        sketch.zero_count = data['zero_count']
+        sketch.total = data['count']
+        sketch.min = data['min_us'] if data['count'] else None
+        sketch.max = data['max_us']
+        sketch.sum = int(data['mean_us'] * data['count'])
+        return sketch
+
+
+def histogram_from_dict(data):
+    """Rebuild whichever histogram type produced `data`"""
+    return (DDSketch if data.get('sketch') == 'ddsketch' else LatencyHistogram).from_dict(data)
+
+
+def convert_histogram(histogram, histogram_class):
+    """`histogram` as a `histogram_class`, re-binned bucket by bucket (count, min, max and sum kept)"""
+    if isinstance(histogram, histogram_class):
+        return histogram
+    converted = histogram_class()
+    for value, count in histogram.buckets():
+        converted.record(value, count)
+    if histogram.total:
+        converted.min, converted.max = histogram.min, histogram.max
+    converted.sum = histogram.sum
+    return converted
+
+
+class LatencyRecorder:
+    """One histogram per (method, endpoint), safe to record into from many threads
+
+    DDSketch by default, so a soak run's memory stays flat however many calls it makes.
+    """
+
+    def __init__(self, histogram_class=DDSketch):
+        self.histogram_class = histogram_class
+        self.histograms = {}
+        self.errors = {}
+        self.lock = threading.Lock()
+
+    def record(self, method, endpoint, seconds, error=False):
+        key = (method.upper(), endpoint)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = self.histogram_class()
+            histogram.record_seconds(seconds)
+            if error:
+                self.errors[key] = self.errors.get(key, 0) + 1
+
+    def merge_histogram(self, method, endpoint, histogram):
+        """Fold in a histogram from another run or worker, converting it to this recorder's type"""
+        key = (method.upper(), endpoint)
+        histogram = convert_histogram(histogram, self.histogram_class)
+        with self.lock:
+            current = self.histograms.get(key)
+            self.histograms[key] = histogram if current is None else current.merge(histogram)
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.errors.clear()
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                'unit': 'microseconds',
+                'endpoints': [
+                    dict(histogram.to_dict(), method=method, endpoint=endpoint,
+                         errors=self.errors.get((method, endpoint), 0))
+                    for (method, endpoint), histogram in sorted(self.histograms.items(), key=lambda kv: kv[0][1])
+                ]
+            }
+
+    def export_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def print_summary(self):
+        """p50/p90/p99/max per endpoint, in milliseconds"""
+        with self.lock:
+            items = sorted(self.histograms.items(), key=lambda kv: kv[0][1])
+            errors = dict(self.errors)
+        if not items:
+            return
+        print(f"\n⏱️  HTTP latency per endpoint (ms)")
+        print(f"   {'method':<6} {'calls':>5} {'err':>4} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}  endpoint")
+        for (method, endpoint), histogram in items:
+            p50, p90, p99 = (histogram.percentile(q) / 1000 for q in SUMMARY_PERCENTILES)
+            print(f"   {method:<6} {histogram.total:>5} {errors.get((method, endpoint), 0):>4} "
+                  f"{p50:>8.1f} {p90:>8.1f} {p99:>8.1f} {histogram.max / 1000:>8.1f}  {endpoint}")
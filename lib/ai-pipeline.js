@@ -2,10 +2,13 @@ import { GoogleGenerativeAI } from '@google/generative-ai'
 
 const genAI = new GoogleGenerativeAI(process.env.GEMINI_API_KEY)
 
+// Optional API base override, e.g. a local Gemini stand-in for offline benchmarks
+const requestOptions = process.env.GEMINI_BASE_URL ? { baseUrl: process.env.GEMINI_BASE_URL } : {}
+
 // Stage A: Per-photo analysis using vision model
 export async function analyzePhoto(imageBytes, photoIndex = 0) {
   try {
-    const model = genAI.getGenerativeModel({ model: process.env.GEMINI_MODEL || 'gemini-2.0-flash-exp' })
+    const model = genAI.getGenerativeModel({ model: process.env.GEMINI_MODEL || 'gemini-2.0-flash-exp' }, requestOptions)
     
     const prompt = `You are an expert construction site analyst and daily report writer with 20+ years of experience in residential and commercial construction projects. Your role is to analyze construction site photos and generate professional, detailed analysis.
 
@@ -91,7 +94,7 @@ Rules:
 // Stage B: Aggregate multiple photo analyses into final report
 export async function generateReport(photoAnalyses, projectName, date) {
   try {
-    const model = genAI.getGenerativeModel({ model: process.env.GEMINI_MODEL || 'gemini-2.0-flash-exp' })
+    const model = genAI.getGenerativeModel({ model: process.env.GEMINI_MODEL || 'gemini-2.0-flash-exp' }, requestOptions)
     
     const prompt = `You are an expert construction site analyst and daily report writer with 20+ years of experience. Analyze these construction photo analyses and create a comprehensive daily report summary using professional construction terminology.
 
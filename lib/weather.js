@@ -1,11 +1,16 @@
 // Open-Meteo weather integration
+
+// Optional API base override for both endpoints, e.g. a local caching proxy or stand-in
+const forecastBaseUrl = process.env.OPEN_METEO_BASE_URL || 'https://api.open-meteo.com'
+const geocodingBaseUrl = process.env.OPEN_METEO_BASE_URL || 'https://geocoding-api.open-meteo.com'
+
 export async function getCurrentWeather(lat, lon) {
   if (!lat || !lon) {
     return null
   }
   
   try {
-    const url = `https://api.open-meteo.com/v1/forecast?latitude=${lat}&longitude=${lon}&current_weather=true&temperature_unit=fahrenheit&timezone=auto`
+    const url = `${forecastBaseUrl}/v1/forecast?latitude=${lat}&longitude=${lon}&current_weather=true&temperature_unit=fahrenheit&timezone=auto`
     
     const response = await fetch(url)
     const data = await response.json()
@@ -46,7 +51,7 @@ export async function getCurrentWeather(lat, lon) {
 export async function geocodeLocation(city, state, postalCode) {
   try {
     const location = [city, state, postalCode].filter(Boolean).join(', ')
-    const url = `https://geocoding-api.open-meteo.com/v1/search?name=${encodeURIComponent(location)}&count=1&language=en&format=json`
+    const url = `${geocodingBaseUrl}/v1/search?name=${encodeURIComponent(location)}&count=1&language=en&format=json`
     
     const response = await fetch(url)
     const data = await response.json()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Open-loop load driver for the SiteRecap load tests
+Requests are issued on a fixed schedule (constant or Poisson arrivals) whether or not earlier
+ones have finished, and latency is measured from each request's intended send time. A slow
+response therefore shows up in the percentiles of every request queued behind it, as it would
+for real users, instead of quietly lowering the send rate (coordinated omission). Failed and
+timed-out requests stay in the latency histograms at the time they took to fail, since under
+overload they are the tail; they are also kept in a histogram of their own.
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import http_client
+from latency_histogram import DDSketch, LatencyHistogram
+
+ARRIVALS = ('constant', 'poisson')
+
+REPORT_PERCENTILES = (50, 90, 99, 99.9)
+
+DEFAULT_MAX_IN_FLIGHT = 256
+
+
+def parse_float_list(value):
+    return [float(v) for v in value.split(',') if v.strip()]
+
+
+def arrival_offsets(rate, duration, arrival='constant', rng=None, phase=0.0):
+    """Intended send times in seconds from the start of the run; constant arrivals start at `phase`"""
+    if arrival not in ARRIVALS:
+        raise ValueError(f"arrival must be one of {', '.join(ARRIVALS)}")
+    rng = rng or random.Random()
+    offset = phase if arrival == 'constant' else rng.expovariate(rate)
+    while offset < duration:
+        yield offset
+        offset += 1 / rate if arrival == 'constant' else rng.expovariate(rate)
+
+
+HISTOGRAM_KEYS = ('corrected', 'service', 'start_lag', 'failed')
+
+
+def completion_rate(count, first, last, arrival_window):
+    """Events per second between the first and the last of `count` events (successes or arrivals)
+
+    For successes, the wait for the first response and the idle drain after the last one are
+    left out, so a slow endpoint keeping up with the schedule reads at the offered rate; a
+    saturated one is still judged over the time it took to work through its backlog.
+    """
+    span = (last - first) if count > 1 else 0.0
+    if span > 0:
+        return (count - 1) / span
+    return count / arrival_window if arrival_window else 0.0
+
+
+def run_open_loop(send, rate, duration, arrival='constant', seed=None, max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                  phase=0.0, histogram_class=LatencyHistogram):
+    """Call send(index) on schedule; it returns None on success or an error string.
+
+    Up to max_in_flight calls run at once; beyond that, scheduled requests wait for a worker
+    and the wait counts toward their latency, like a queue in front of a real server.
+    Pass histogram_class=DDSketch to keep memory constant on long soak runs.
+    """
+    corrected = histogram_class()
+    service = histogram_class()
+    lag = histogram_class()
+    failed = histogram_class()
+    errors = []
+    # Offsets from start of the first and last successful response
+    first_success = last_success = None
+    lock = threading.Lock()
+
+    def fire(index, intended):
+        nonlocal first_success, last_success
+        started = time.perf_counter()
+        try:
+            error = send(index)
+        except Exception as e:
+            error = str(e)
+        finished = time.perf_counter()
+        with lock:
+            lag.record_seconds(started - intended)
+            corrected.record_seconds(finished - intended)
+            service.record_seconds(finished - started)
+            if error is not None:
+                failed.record_seconds(finished - intended)
+                errors.append(error)
+            else:
+                offset = finished - start
+                first_success = offset if first_success is None else min(first_success, offset)
+                last_success = offset if last_success is None else max(last_success, offset)
+
+    scheduled = 0
+    first_arrival = last_arrival = None
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        for index, offset in enumerate(arrival_offsets(rate, duration, arrival, random.Random(seed), phase)):
+            first_arrival = offset if first_arrival is None else first_arrival
+            last_arrival = offset
+            intended = start + offset
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(fire, index, intended)
+            scheduled += 1
+        arrival_window = max(duration, time.perf_counter() - start)
+    elapsed = time.perf_counter() - start
+    completed = corrected.total - failed.total
+
+    return {
+        'arrival': arrival,
+        'target_rate': rate,
+        'duration_s': duration,
+        'scheduled': scheduled,
+        'completed': completed,
+        'errors': len(errors),
+        'error_samples': sorted(set(errors))[:3],
+        'elapsed_s': elapsed,
+        'drain_s': elapsed - arrival_window,
+        'first_arrival_s': first_arrival,
+        'last_arrival_s': last_arrival,
+        'first_success_s': first_success,
+        'last_success_s': last_success,
+        # The schedule's own rate, measured like throughput so the two compare directly
+        'offered_rps': completion_rate(scheduled, first_arrival, last_arrival, arrival_window),
+        'throughput_rps': completion_rate(completed, first_success, last_success, arrival_window),
+        'corrected': corrected,
+        'service': service,
+        'start_lag': lag,
+        'failed': failed
+    }
+
+
+def summarise(result):
+    """JSON-ready copy of a run_open_loop result"""
+    summary = {key: value for key, value in result.items() if key not in HISTOGRAM_KEYS}
+    for key in HISTOGRAM_KEYS:
+        histogram = result[key]
+        summary[key] = dict(histogram.to_dict(),
+                            percentiles_ms={f"p{q:g}": histogram.percentile(q) / 1000 for q in REPORT_PERCENTILES})
+    return summary
+
+
+def print_open_loop(result, label=''):
+    print(f"\n📈 {label}{result['target_rate']:g} req/s {result['arrival']}: {result['completed']}/{result['scheduled']} ok, "
+          f"{result['errors']} errors, {result['throughput_rps']:.2f} req/s achieved")
+    header = ' '.join(f"{'p' + format(q, 'g'):>9}" for q in REPORT_PERCENTILES)
+    print(f"   {'latency (ms)':<22} {header} {'max':>9}")
+    for key, name in (('corrected', 'from intended send'), ('service', 'from actual send'),
+                      ('start_lag', 'send lag'), ('failed', 'failed, from intended')):
+        histogram = result[key]
+        if key == 'failed' and not histogram.total:
+            continue
+        values = ' '.join(f"{histogram.percentile(q) / 1000:>9.1f}" for q in REPORT_PERCENTILES)
+        print(f"   {name:<22} {values} {histogram.max / 1000:>9.1f}")
+    for sample in result['error_samples']:
+        print(f"   ❌ {sample}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('url', help="Full URL to load")
+    parser.add_argument('--method', default='GET')
+    parser.add_argument('--body-file', help="JSON file sent as the request body")
+    parser.add_argument('--rate', type=parse_float_list, default=[1.0], help="Comma-separated arrival rates (req/s)")
+    parser.add_argument('--duration', type=float, default=30, help="Seconds of arrivals per rate")
+    parser.add_argument('--arrival', choices=ARRIVALS, default='constant')
+    parser.add_argument('--seed', type=int, help="Seed for Poisson arrivals")
+    parser.add_argument('--max-in-flight', type=int, default=DEFAULT_MAX_IN_FLIGHT)
+    parser.add_argument('--sketch', action='store_true', help="Record into DDSketches (constant memory)")
+    parser.add_argument('--timeout', type=float, default=600)
+    parser.add_argument('--json', dest='json_path', help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    body = None
+    if args.body_file:
+        with open(args.body_file) as f:
+            body = json.load(f)
+
+    def send(_):
+        response = http_client.get_client().request(args.method, args.url, json=body, timeout=args.timeout)
+        return f"HTTP {response.status_code}" if response.status_code >= 400 else None
+
+    print(f"🧪 OPEN-LOOP LOAD: {args.method} {args.url}")
+    results = []
+    for rate in args.rate:
+        result = run_open_loop(send, rate, args.duration, args.arrival, args.seed, args.max_in_flight,
+                               histogram_class=DDSketch if args.sketch else LatencyHistogram)
+        print_open_loop(result)
+        results.append(summarise(result))
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'target': args.url, 'results': results}, f, indent=2)
+        print(f"\n💾 Results written to {args.json_path}")
+    return all(r['errors'] == 0 for r in results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
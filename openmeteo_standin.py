@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Local Open-Meteo stand-in for offline weather and geocoding benchmarks
+Answers GET /v1/forecast?current_weather=true and GET /v1/search like api.open-meteo.com
+and geocoding-api.open-meteo.com, with configurable latency. Answers are deterministic:
+weather depends on the 0.01° cell and the hour, geocodes on the normalized place name.
+
+Point the app at it with OPEN_METEO_BASE_URL=http://127.0.0.1:8156
+"""
+
+import argparse
+import hashlib
+import re
+import threading
+import unicodedata
+from datetime import datetime, timezone
+
+from standin_server import (Counters, JsonRequestHandler, LatencyDistribution, SeededRandom, server_url, sleep_ms,
+                            start_server)
+
+DEFAULT_PORT = 8156
+
+WEATHER_CODES = (0, 1, 2, 3, 45, 51, 61, 63, 71, 80, 95)
+
+STATES = ('TX', 'CA', 'FL', 'NY', 'IL', 'WA', 'CO', 'GA', 'NC', 'AZ')
+
+
+def normalize_place(name):
+    """Case-, width- and punctuation-insensitive form of a 'City, State Postal' string"""
+    text = unicodedata.normalize('NFKC', name).casefold()
+    return re.sub(r'[\s,.]+', ' ', text).strip()
+
+
+def _unit(*values):
+    """Deterministic float in [0, 1) from the given values"""
+    digest = hashlib.sha256('|'.join(str(v) for v in values).encode()).digest()
+    return int.from_bytes(digest[:8], 'big') / 2 ** 64
+
+
+def current_weather(lat, lon, fahrenheit=False, now=None):
+    now = now or datetime.now(timezone.utc)
+    hour = now.strftime('%Y-%m-%dT%H:00')
+    cell = (round(lat, 2), round(lon, 2))
+    celsius = 30 - abs(lat) * 0.45 + 8 * (_unit(*cell, hour, 't') - 0.5)
+    return {
+        'temperature': round(celsius * 9 / 5 + 32 if fahrenheit else celsius, 1),
+        'windspeed': round(25 * _unit(*cell, hour, 'w'), 1),
+        'winddirection': int(360 * _unit(*cell, hour, 'd')),
+        'weathercode': WEATHER_CODES[int(len(WEATHER_CODES) * _unit(*cell, hour, 'c'))],
+        'is_day': int(6 <= now.hour < 20),
+        'time': hour
+    }
+
+
+def geocode(name):
+    """One plausible continental-US result per normalized place name, none for blank names"""
+    key = normalize_place(name)
+    if not key:
+        return []
+    city = ' '.join(word for word in key.split() if not word.isdigit() and len(word) > 2).title()
+    return [{
+        'id': int(_unit(key, 'id') * 10 ** 7),
+        'name': city,
+        'latitude': round(25 + 23 * _unit(key, 'lat'), 5),
+        'longitude': round(-124 + 57 * _unit(key, 'lon'), 5),
+        'country': 'United States',
+        'country_code': 'US',
+        'admin1': STATES[int(len(STATES) * _unit(key, 'state'))]
+    }]
+
+
+class OpenMeteoHandler(JsonRequestHandler):
+    def route(self, method):
+        server = self.server
+        if self.route_path == '/_standin/stats' and method == 'GET':
+            return self.send_json(200, server.counters.snapshot())
+        if self.route_path == '/_standin/reset' and method == 'POST':
+            server.counters = Counters()
+            return self.send_json(200, {'reset': True})
+        if method != 'GET' or self.route_path not in ('/v1/forecast', '/v1/search'):
+            return self.send_json(404, {'error': True, 'reason': f"Unknown path {self.route_path}"})
+
+        kind = 'forecast' if self.route_path == '/v1/forecast' else 'search'
+        server.counters.incr(f"{kind}.requests")
+        sleep_ms(server.random.latency_ms(server.latency))
+
+        if kind == 'search':
+            return self.send_json(200, {'results': geocode(self.query.get('name', '')), 'generationtime_ms': 0.5})
+        try:
+            lat, lon = float(self.query['latitude']), float(self.query['longitude'])
+        except (KeyError, ValueError):
+            return self.send_json(400, {'error': True, 'reason': 'Parameter latitude and longitude required'})
+        payload = {'latitude': lat, 'longitude': lon, 'generationtime_ms': 0.5, 'utc_offset_seconds': 0,
+                   'timezone': 'GMT', 'elevation': 150.0}
+        if self.query.get('current_weather') == 'true':
+            payload['current_weather'] = current_weather(lat, lon, self.query.get('temperature_unit') == 'fahrenheit')
+        self.send_json(200, payload)
+
+
+def start_openmeteo_standin(host='127.0.0.1', port=0, latency='lognormal:150,0.4', seed=None):
+    """Start the stand-in on a background thread and return the server"""
+    return start_server(
+        OpenMeteoHandler, host, port,
+        latency=LatencyDistribution.parse(latency),
+        random=SeededRandom(seed),
+        counters=Counters()
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Open-Meteo stand-in for weather and geocoding")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--latency', default='lognormal:150,0.4', help="Response latency, e.g. lognormal:150,0.4")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    server = start_openmeteo_standin(args.host, args.port, args.latency, args.seed)
+    print(f"🌦️  Open-Meteo stand-in listening on {server_url(server)} (latency {server.latency})")
+    print(f"   Set OPEN_METEO_BASE_URL={server_url(server)} for the Next.js app")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Connection-phase timing transport for the shared HTTP client
+Sends each request over a fresh connection built step by step, so every call records
+DNS lookup, TCP connect, TLS handshake, request send, time to first byte (server plus
+edge routing) and body transfer separately. Responses are ordinary requests.Response
+objects, so the suites run unchanged when the mode is switched on.
+"""
+
+import http.client
+import socket
+import ssl
+import threading
+import time
+import zlib
+from datetime import timedelta
+from urllib.parse import urljoin, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from latency_histogram import LatencyHistogram
+
+PHASES = ('dns', 'connect', 'tls', 'send', 'ttfb', 'transfer')
+
+MAX_REDIRECTS = 30
+
+DEFAULT_HEADERS = {
+    'User-Agent': requests.utils.default_user_agent(),
+    'Accept-Encoding': 'gzip, deflate',
+    'Accept': '*/*',
+    'Connection': 'close'
+}
+
+
+class PhaseRecorder:
+    """Per-phase histograms for each (method, endpoint)"""
+
+    def __init__(self):
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def record(self, method, endpoint, phases):
+        key = (method.upper(), endpoint)
+        with self.lock:
+            histograms = self.histograms.setdefault(key, {phase: LatencyHistogram() for phase in PHASES})
+            for phase, seconds in phases.items():
+                histograms[phase].record_seconds(seconds)
+
+    def _items(self):
+        with self.lock:
+            return sorted(self.histograms.items(), key=lambda kv: kv[0][1])
+
+    def to_dict(self):
+        return {
+            'unit': 'microseconds',
+            'endpoints': [
+                {'method': method, 'endpoint': endpoint,
+                 'phases': {phase: histogram.to_dict() for phase, histogram in histograms.items()}}
+                for (method, endpoint), histograms in self._items()
+            ]
+        }
+
+    def print_summary(self):
+        """Median milliseconds spent in each phase, per endpoint"""
+        items = self._items()
+        if not items:
+            return
+        print(f"\n🔬 Connection phases per endpoint (p50 ms)")
+        print(f"   {'method':<6} {'calls':>5} " + ' '.join(f"{phase:>8}" for phase in PHASES) + "  endpoint")
+        for (method, endpoint), histograms in items:
+            medians = ' '.join(f"{histograms[phase].percentile(50) / 1000:>8.1f}" for phase in PHASES)
+            print(f"   {method:<6} {histograms['dns'].total:>5} {medians}  {endpoint}")
+
+
+class PhaseTimingTransport:
+    """Requests-compatible sender that times each connection phase"""
+
+    def __init__(self, recorder=None, verify=True):
+        self.recorder = recorder if recorder is not None else PhaseRecorder()
+        self.ssl_context = ssl.create_default_context()
+        if not verify:
+            self.ssl_context.check_hostname = False
+            self.ssl_context.verify_mode = ssl.CERT_NONE
+
+    def request(self, method, url, timeout, allow_redirects=True, endpoint_key=None, **kwargs):
+        headers = dict(DEFAULT_HEADERS)
+        headers.update(kwargs.pop('headers', None) or {})
+        prepared = requests.Request(method, url, headers=headers, **kwargs).prepare()
+        history = []
+        while True:
+            response = self._send(prepared, timeout, endpoint_key)
+            if not (allow_redirects and response.is_redirect) or len(history) >= MAX_REDIRECTS:
+                response.history = history
+                return response
+            history.append(response)
+            # Follow like requests does: 303 (and 301/302 for POST) become a bodiless GET
+            redirect_method = prepared.method
+            if response.status_code == 303 and redirect_method != 'HEAD' or \
+                    response.status_code in (301, 302) and redirect_method == 'POST':
+                redirect_method = 'GET'
+            next_headers = {k: v for k, v in prepared.headers.items()
+                            if k.lower() not in ('content-length', 'content-type', 'transfer-encoding', 'host')}
+            prepared = requests.Request(
+                redirect_method, urljoin(response.url, response.headers['location']), headers=next_headers,
+                data=prepared.body if redirect_method == prepared.method else None
+            ).prepare()
+
+    def _connect(self, parts, timeout, phases):
+        connect_timeout, read_timeout = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+
+        start = time.perf_counter()
+        family, socktype, proto, _, address = socket.getaddrinfo(parts.hostname, port, type=socket.SOCK_STREAM)[0]
+        phases['dns'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        sock = socket.socket(family, socktype, proto)
+        sock.settimeout(connect_timeout)
+        try:
+            sock.connect(address)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            phases['connect'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            if parts.scheme == 'https':
+                sock = self.ssl_context.wrap_socket(sock, server_hostname=parts.hostname)
+            phases['tls'] = time.perf_counter() - start
+            sock.settimeout(read_timeout)
+        except BaseException:
+            sock.close()
+            raise
+
+        connection = http.client.HTTPConnection(parts.hostname, port, timeout=read_timeout)
+        connection.sock = sock
+        return connection
+
+    def _send(self, prepared, timeout, endpoint_key):
+        parts = urlsplit(prepared.url)
+        phases = {}
+        connection = self._connect(parts, timeout, phases)
+        try:
+            path = parts.path or '/'
+            if parts.query:
+                path += '?' + parts.query
+            body = prepared.body
+            chunked = 'chunked' in (prepared.headers.get('Transfer-Encoding') or '').lower()
+            start = time.perf_counter()
+            connection.request(prepared.method, path, body=body, headers=dict(prepared.headers),
+                               encode_chunked=chunked)
+            phases['send'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            raw = connection.getresponse()
+            phases['ttfb'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            content = b'' if prepared.method == 'HEAD' else raw.read()
+            phases['transfer'] = time.perf_counter() - start
+        finally:
+            connection.close()
+
+        encoding = (raw.getheader('Content-Encoding') or '').lower()
+        if encoding == 'gzip':
+            content = zlib.decompress(content, 16 + zlib.MAX_WBITS)
+        elif encoding == 'deflate':
+            content = zlib.decompress(content)
+
+        response = requests.Response()
+        response.status_code = raw.status
+        response.reason = raw.reason
+        response.headers = CaseInsensitiveDict(raw.getheaders())
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = prepared.url
+        response.request = prepared
+        response._content = content
+        response.elapsed = timedelta(seconds=sum(phases.values()))
+        response.phases = phases
+        self.recorder.record(prepared.method, endpoint_key(prepared.url) if endpoint_key else prepared.url, phases)
+        return response
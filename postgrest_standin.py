@@ -0,0 +1,634 @@
+#!/usr/bin/env python3
+"""
+Local Supabase/PostgREST stand-in for data-scale benchmarks
+Serves /rest/v1/{table} on top of SQLite with the filters the project handlers use
+(eq, neq, lt, lte, gt, gte, in, is, order, limit, count=exact with HEAD, upsert on_conflict)
+and the indexes declared in database-updates.sql.
+
+Point the app at it with NEXT_PUBLIC_SUPABASE_URL=http://127.0.0.1:8152 (any keys work) and
+run it with NODE_ENV=production, since development mode answers from mock data.
+
+    python postgrest_standin.py serve --projects 100000
+    python postgrest_standin.py bench --scales 1000,100000,1000000
+"""
+
+import argparse
+import csv
+import json
+import random
+import re
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qsl, quote, urlsplit
+
+import http_client
+from report_load_test import parse_int_list, percentile
+from standin_server import Counters, JsonRequestHandler, server_url, start_server
+
+DEFAULT_PORT = 8152
+
+SCHEMA_UPDATES_PATH = '/app/database-updates.sql'
+
+# Supabase caps every response at this many rows unless the project raises db-max-rows
+DEFAULT_MAX_ROWS = 1000
+
+# ids per autoClose PATCH; the app's single id=in.(...) filter outgrows the request line at scale
+AUTO_CLOSE_BATCH = 500
+
+NOW_SQL = "(strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))"
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS organizations (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    plan TEXT DEFAULT 'free',
+    company_name TEXT,
+    logo_url TEXT,
+    brand_color TEXT DEFAULT '#168995',
+    created_at TEXT DEFAULT {NOW_SQL}
+);
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    org_id TEXT REFERENCES organizations(id),
+    name TEXT,
+    city TEXT,
+    state TEXT,
+    postal_code TEXT,
+    lat REAL,
+    lon REAL,
+    owner_name TEXT,
+    owner_email TEXT,
+    gc_name TEXT,
+    gc_email TEXT,
+    status TEXT DEFAULT 'active' CHECK (status IN ('active', 'completed', 'archived')),
+    created_at TEXT DEFAULT {NOW_SQL},
+    updated_at TEXT DEFAULT {NOW_SQL},
+    last_activity_date TEXT DEFAULT {NOW_SQL}
+);
+CREATE TABLE IF NOT EXISTS photos (
+    id TEXT PRIMARY KEY,
+    project_id TEXT REFERENCES projects(id),
+    shot_date TEXT,
+    url TEXT,
+    storage_path TEXT,
+    created_at TEXT DEFAULT {NOW_SQL}
+);
+CREATE TABLE IF NOT EXISTS reports (
+    id TEXT PRIMARY KEY,
+    project_id TEXT REFERENCES projects(id),
+    date TEXT,
+    owner_md TEXT,
+    gc_md TEXT,
+    raw_json TEXT,
+    status TEXT,
+    created_at TEXT DEFAULT {NOW_SQL},
+    UNIQUE (project_id, date)
+);
+CREATE INDEX IF NOT EXISTS photos_project_date_idx ON photos(project_id, shot_date);
+"""
+
+# Columns stored as JSON text and decoded on the way out
+JSON_COLUMNS = {'reports': {'raw_json'}}
+
+FILTER_OPERATORS = {'eq': '=', 'neq': '!=', 'lt': '<', 'lte': '<=', 'gt': '>', 'gte': '>='}
+
+RESERVED_PARAMS = {'select', 'order', 'limit', 'offset', 'on_conflict', 'columns'}
+
+INDEX_STATEMENT = re.compile(r'CREATE\s+(?:UNIQUE\s+)?INDEX\b[^;]*;', re.I)
+
+# Embedded resources such as organizations(*) are not joined, only stripped from select
+EMBEDDED_RESOURCE = re.compile(r'\w+\([^)]*\)')
+
+
+class PostgrestError(Exception):
+    """Error answered with PostgREST's {code, message, details, hint} body"""
+
+    def __init__(self, status, code, message, details=None):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.details = details
+
+    def body(self):
+        return {'code': self.code, 'message': str(self), 'details': self.details, 'hint': None}
+
+
+def schema_indexes(path=SCHEMA_UPDATES_PATH):
+    """CREATE INDEX statements from the migration file, so the stand-in indexes what production does"""
+    with open(path, 'r') as f:
+        return INDEX_STATEMENT.findall(f.read())
+
+
+def iso_timestamp(moment):
+    """Timestamp in the format Date.toISOString() produces, so text comparison orders correctly"""
+    return moment.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.') + f"{moment.microsecond // 1000:03d}Z"
+
+
+def _in_values(text):
+    if not (text.startswith('(') and text.endswith(')')):
+        raise PostgrestError(400, 'PGRST100', f'"failed to parse filter (in.{text})"')
+    return next(csv.reader([text[1:-1]]), [])
+
+
+class TableStore:
+    """SQLite tables with PostgREST-shaped select, insert, upsert, update and delete"""
+
+    def __init__(self, path=':memory:', index_path=SCHEMA_UPDATES_PATH):
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+        for statement in schema_indexes(index_path):
+            self.db.execute(statement)
+        self.db.commit()
+        self.columns = {
+            table: [row['name'] for row in self.db.execute(f"PRAGMA table_info({table})")]
+            for (table,) in self.db.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+        }
+        self.lock = threading.Lock()
+
+    def _table(self, table):
+        if table not in self.columns:
+            raise PostgrestError(404, '42P01', f'relation "public.{table}" does not exist')
+        return table
+
+    def _column(self, table, column):
+        if column not in self.columns[table]:
+            raise PostgrestError(400, '42703', f'column {table}.{column} does not exist')
+        return column
+
+    def _select_list(self, table, select):
+        columns = []
+        for item in EMBEDDED_RESOURCE.sub('', select or '*').split(','):
+            item = item.strip()
+            if item == '*':
+                columns.extend(self.columns[table])
+            elif item:
+                columns.append(self._column(table, item))
+        return ', '.join(columns or self.columns[table])
+
+    def _where(self, table, filters):
+        clauses = []
+        params = []
+        for column, expression in filters:
+            self._column(table, column)
+            negate = expression.startswith('not.')
+            if negate:
+                expression = expression[4:]
+            op, _, value = expression.partition('.')
+            if op == 'in':
+                values = _in_values(value)
+                clause = f"{column} IN ({', '.join('?' * len(values))})" if values else '0'
+                params.extend(values)
+            elif op == 'is':
+                if value.lower() not in ('null', 'true', 'false'):
+                    raise PostgrestError(400, 'PGRST100', f'"failed to parse filter (is.{value})"')
+                clause = f"{column} IS {value.upper()}"
+            elif op in FILTER_OPERATORS:
+                clause = f"{column} {FILTER_OPERATORS[op]} ?"
+                params.append(value)
+            else:
+                raise PostgrestError(400, 'PGRST100', f'"failed to parse filter ({expression})"')
+            clauses.append(f"NOT ({clause})" if negate else clause)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def _order(self, table, order):
+        terms = []
+        for term in (order or '').split(','):
+            if not term.strip():
+                continue
+            column, *modifiers = term.strip().split('.')
+            direction = 'DESC' if 'desc' in modifiers else 'ASC'
+            nulls = ' NULLS FIRST' if 'nullsfirst' in modifiers else (' NULLS LAST' if 'nullslast' in modifiers else '')
+            terms.append(f"{self._column(table, column)} {direction}{nulls}")
+        return (' ORDER BY ' + ', '.join(terms)) if terms else ''
+
+    def _decode(self, table, row):
+        record = dict(row)
+        for column in JSON_COLUMNS.get(table, ()):
+            if record.get(column) is not None:
+                record[column] = json.loads(record[column])
+        return record
+
+    def _encode(self, table, record):
+        json_columns = JSON_COLUMNS.get(table, ())
+        return {self._column(table, column): json.dumps(value) if column in json_columns and value is not None else value
+                for column, value in record.items()}
+
+    def select_sql(self, table, filters, select='*', order=None, limit=None, offset=None):
+        """SQL and parameters for a GET, also used by the benchmark's query-plan report"""
+        self._table(table)
+        where, params = self._where(table, filters)
+        sql = f"SELECT {self._select_list(table, select)} FROM {table}{where}{self._order(table, order)}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+            if offset:
+                sql += " OFFSET ?"
+                params.append(int(offset))
+        return sql, params
+
+    def count_sql(self, table, filters):
+        self._table(table)
+        where, params = self._where(table, filters)
+        return f"SELECT COUNT(*) FROM {table}{where}", params
+
+    def select(self, table, filters, select='*', order=None, limit=None, offset=None, count=False, head=False):
+        """Return (rows, exact count or None)"""
+        sql, params = self.select_sql(table, filters, select, order, limit, offset)
+        with self.lock:
+            total = None
+            if count:
+                total = self.db.execute(*self.count_sql(table, filters)).fetchone()[0]
+            rows = [] if head else self.db.execute(sql, params).fetchall()
+        return [self._decode(table, row) for row in rows], total
+
+    def insert(self, table, records, on_conflict=None, merge=True):
+        self._table(table)
+        inserted = []
+        with self.lock, self.db:
+            for record in records:
+                record = self._encode(table, record)
+                if 'id' in self.columns[table] and not record.get('id'):
+                    record['id'] = str(uuid.uuid4())
+                columns = list(record)
+                sql = (f"INSERT INTO {table} ({', '.join(columns)}) "
+                       f"VALUES ({', '.join('?' * len(columns))})")
+                if on_conflict:
+                    keys = [self._column(table, key.strip()) for key in on_conflict.split(',')]
+                    updates = [c for c in columns if c not in keys and c != 'id']
+                    if merge and updates:
+                        sql += (f" ON CONFLICT ({', '.join(keys)}) DO UPDATE SET "
+                                + ', '.join(f"{c} = excluded.{c}" for c in updates))
+                    else:
+                        sql += f" ON CONFLICT ({', '.join(keys)}) DO NOTHING"
+                try:
+                    inserted.extend(self.db.execute(sql + " RETURNING *", list(record.values())).fetchall())
+                except sqlite3.IntegrityError as e:
+                    if 'UNIQUE' in str(e):
+                        raise PostgrestError(409, '23505', 'duplicate key value violates unique constraint', str(e))
+                    raise PostgrestError(400, '23514', 'new row violates check constraint', str(e))
+        return [self._decode(table, row) for row in inserted]
+
+    def update(self, table, filters, changes):
+        self._table(table)
+        changes = self._encode(table, changes)
+        where, params = self._where(table, filters)
+        assignments = ', '.join(f"{column} = ?" for column in changes)
+        with self.lock, self.db:
+            rows = self.db.execute(f"UPDATE {table} SET {assignments}{where} RETURNING *",
+                                   list(changes.values()) + params).fetchall()
+        return [self._decode(table, row) for row in rows]
+
+    def delete(self, table, filters):
+        self._table(table)
+        where, params = self._where(table, filters)
+        with self.lock, self.db:
+            rows = self.db.execute(f"DELETE FROM {table}{where} RETURNING *", params).fetchall()
+        return [self._decode(table, row) for row in rows]
+
+    def explain(self, sql, params):
+        with self.lock:
+            return [row['detail'] for row in self.db.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+    def count(self, table):
+        with self.lock:
+            return self.db.execute(f"SELECT COUNT(*) FROM {self._table(table)}").fetchone()[0]
+
+
+def seed_projects(store, org_id, count, seed=0, inactive_share=0.1, batch_size=50000):
+    """Insert `count` projects for one org with a realistic status and activity mix"""
+    rng = random.Random(f"{org_id}:{seed}")
+    now = datetime.now(timezone.utc)
+    cities = [('Austin', 'TX'), ('Dallas', 'TX'), ('Denver', 'CO'), ('Phoenix', 'AZ'), ('Raleigh', 'NC')]
+
+    def rows():
+        for i in range(count):
+            city, state = rng.choice(cities)
+            created = now - timedelta(seconds=rng.randint(0, 730 * 86400))
+            roll = rng.random()
+            status = 'active' if roll < 0.7 else ('completed' if roll < 0.95 else 'archived')
+            idle_days = rng.randint(15, 120) if rng.random() < inactive_share else rng.randint(0, 13)
+            activity = max(created, now - timedelta(days=idle_days, seconds=rng.randint(0, 86399)))
+            yield (f"{org_id}-p{i}", org_id, f"Project {i} - {city}", city, state,
+                   f"owner{i}@example.com" if rng.random() < 0.6 else None,
+                   f"gc{i}@example.com" if rng.random() < 0.4 else None,
+                   status, iso_timestamp(created), iso_timestamp(activity), iso_timestamp(activity))
+
+    sql = ("INSERT INTO projects (id, org_id, name, city, state, owner_email, gc_email, status, "
+           "created_at, updated_at, last_activity_date) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+    with store.lock, store.db:
+        store.db.execute("INSERT OR IGNORE INTO organizations (id, name, plan) VALUES (?, ?, 'enterprise')",
+                         (org_id, f"Org {org_id}"))
+        batch = []
+        for row in rows():
+            batch.append(row)
+            if len(batch) >= batch_size:
+                store.db.executemany(sql, batch)
+                batch = []
+        store.db.executemany(sql, batch)
+
+
+def _prefer(header):
+    prefs = {}
+    for item in (header or '').split(','):
+        name, _, value = item.strip().partition('=')
+        if name:
+            prefs[name] = value
+    return prefs
+
+
+class PostgrestHandler(JsonRequestHandler):
+    def route(self, method):
+        server = self.server
+        path = self.route_path
+        if path == '/_standin/stats' and method == 'GET':
+            return self.send_json(200, server.counters.snapshot())
+        if not path.startswith('/rest/v1/'):
+            return self.send_json(404, PostgrestError(404, 'PGRST000', f"Unknown path {path}").body())
+
+        table = path[len('/rest/v1/'):].strip('/')
+        params = parse_qsl(urlsplit(self.path).query, keep_blank_values=True)
+        options = {k: v for k, v in params if k in RESERVED_PARAMS}
+        filters = [(k, v) for k, v in params if k not in RESERVED_PARAMS]
+        prefer = _prefer(self.headers.get('Prefer'))
+        single = 'vnd.pgrst.object' in (self.headers.get('Accept') or '')
+        server.counters.incr(f"{table}.{method.lower()}")
+
+        try:
+            status = 200
+            total = None
+            if method in ('GET', 'HEAD'):
+                limit = options.get('limit')
+                if server.max_rows:
+                    limit = min(int(limit or server.max_rows), server.max_rows)
+                rows, total = server.store.select(
+                    table, filters, options.get('select'), options.get('order'), limit, options.get('offset'),
+                    count=prefer.get('count') in ('exact', 'planned', 'estimated'), head=method == 'HEAD'
+                )
+            elif method == 'POST':
+                body = self.read_json()
+                records = body if isinstance(body, list) else [body]
+                rows = server.store.insert(table, records, options.get('on_conflict'),
+                                           merge=prefer.get('resolution') != 'ignore-duplicates')
+                status = 201
+            elif method == 'PATCH':
+                rows = server.store.update(table, filters, self.read_json())
+            elif method == 'DELETE':
+                rows = server.store.delete(table, filters)
+            else:
+                raise PostgrestError(405, 'PGRST000', f"Unsupported method {method}")
+        except PostgrestError as e:
+            server.counters.incr('errors')
+            return self.send_json(e.status, e.body())
+        except (sqlite3.Error, ValueError) as e:
+            server.counters.incr('errors')
+            return self.send_json(400, PostgrestError(400, 'PGRST000', str(e)).body())
+
+        headers = {'Content-Range': f"{'0-' + str(len(rows) - 1) if rows else '*'}/{'*' if total is None else total}"}
+        if method in ('POST', 'PATCH', 'DELETE') and prefer.get('return') != 'representation':
+            return self.send_body(201 if method == 'POST' else 204, b'', headers=headers)
+        if single:
+            if len(rows) != 1:
+                return self.send_json(406, PostgrestError(
+                    406, 'PGRST116', 'JSON object requested, multiple (or no) rows returned',
+                    f"The result contains {len(rows)} rows").body())
+            return self.send_json(status, self._select_columns(rows[0], options), headers=headers)
+        self.send_json(status, [self._select_columns(row, options) for row in rows], headers=headers)
+
+    @staticmethod
+    def _select_columns(row, options):
+        select = EMBEDDED_RESOURCE.sub('', options.get('select') or '*')
+        if '*' in select:
+            return row
+        return {c.strip(): row[c.strip()] for c in select.split(',') if c.strip() in row}
+
+
+def start_postgrest_standin(host='127.0.0.1', port=0, db_path=':memory:', max_rows=DEFAULT_MAX_ROWS, store=None):
+    """Start the stand-in on a background thread and return the server"""
+    return start_server(
+        PostgrestHandler, host, port,
+        store=store or TableStore(db_path),
+        max_rows=max_rows,
+        counters=Counters()
+    )
+
+
+# The queries each handler in app/api/[[...path]]/route.js sends, as (method, params, prefer)
+def handler_queries(org_id, cutoff):
+    return {
+        'getProjects': ('GET', [('select', '*'), ('org_id', f'eq.{org_id}'), ('order', 'created_at.desc')], None),
+        'getActiveProjects': ('GET', [('select', '*'), ('org_id', f'eq.{org_id}'), ('status', 'eq.active'),
+                                      ('order', 'created_at.desc')], None),
+        'getCompletedProjects': ('GET', [('select', '*'), ('org_id', f'eq.{org_id}'),
+                                         ('status', 'in.(completed,archived)'), ('order', 'created_at.desc')], None),
+        'getProjectCount': ('HEAD', [('select', '*'), ('org_id', f'eq.{org_id}'), ('status', 'eq.active')],
+                            'count=exact'),
+        'autoCloseProjects.select': ('GET', [('select', 'id,name,org_id,owner_email,gc_email'),
+                                             ('status', 'eq.active'), ('last_activity_date', f'lt.{cutoff}')], None),
+    }
+
+
+# The same handlers through the Next.js API, for --app-url runs
+APP_ROUTES = {
+    'getProjects': ('GET', '/api/projects?org_id={org_id}'),
+    'getActiveProjects': ('GET', '/api/projects/active?org_id={org_id}'),
+    'getCompletedProjects': ('GET', '/api/projects/completed?org_id={org_id}'),
+    'getProjectCount': ('GET', '/api/project-count?org_id={org_id}&status=active'),
+}
+
+
+def _query_string(params):
+    return '&'.join(f"{k}={quote(v, safe='*,.()')}" for k, v in params)
+
+
+def time_request(method, url, **kwargs):
+    """Return (latency seconds, response)"""
+    start = time.perf_counter()
+    response = http_client.get_client().request(method, url, **kwargs)
+    return time.perf_counter() - start, response
+
+
+def auto_close(base_url, cutoff):
+    """autoCloseProjects' select-then-update round trip, the update sent AUTO_CLOSE_BATCH ids at a time;
+    return (latency seconds, closed count)"""
+    method, params, _ = handler_queries('', cutoff)['autoCloseProjects.select']
+    start = time.perf_counter()
+    selected = http_client.get(f"{base_url}/rest/v1/projects?{_query_string(params)}").json()
+    if not selected:
+        return time.perf_counter() - start, 0
+    closed = 0
+    updated_at = iso_timestamp(datetime.now(timezone.utc))
+    for i in range(0, len(selected), AUTO_CLOSE_BATCH):
+        ids = ','.join(row['id'] for row in selected[i:i + AUTO_CLOSE_BATCH])
+        response = http_client.get_client().request(
+            'PATCH', f"{base_url}/rest/v1/projects?id=in.({quote(ids, safe=',')})&select=*",
+            json={'status': 'completed', 'updated_at': updated_at},
+            headers={'Prefer': 'return=representation'}
+        )
+        response.raise_for_status()
+        closed += len(response.json())
+    return time.perf_counter() - start, closed
+
+
+def run_scale(scale, args):
+    """Seed one database at `scale` projects for the benchmark org and time every handler query"""
+    org_id = f"org-{scale}"
+    store = TableStore(args.db.format(scale=scale) if args.db else ':memory:')
+    print(f"\n📦 Seeding {scale:,} projects for {org_id} plus {args.other_orgs} org(s) of {args.other_size:,}")
+    start = time.perf_counter()
+    seed_projects(store, org_id, scale, seed=args.seed)
+    for i in range(args.other_orgs):
+        seed_projects(store, f"org-other-{i}", args.other_size, seed=args.seed)
+    print(f"   Seeded {store.count('projects'):,} rows in {time.perf_counter() - start:.1f}s")
+
+    server = start_postgrest_standin(port=args.port if args.app_url else 0, store=store, max_rows=args.max_rows)
+    base_url = server_url(server)
+    cutoff = iso_timestamp(datetime.now(timezone.utc) - timedelta(days=14))
+    results = []
+
+    for name, (method, params, prefer) in handler_queries(org_id, cutoff).items():
+        if args.explain:
+            filters = [p for p in params if p[0] not in RESERVED_PARAMS]
+            options = dict(params)
+            sql, sql_params = store.count_sql('projects', filters) if method == 'HEAD' else store.select_sql(
+                'projects', filters, options.get('select'), options.get('order'), args.max_rows or None)
+            for detail in store.explain(sql, sql_params):
+                print(f"   🔍 {name}: {detail}")
+        if args.app_url:
+            if name not in APP_ROUTES:
+                continue
+            app_method, route = APP_ROUTES[name]
+            url = args.app_url.rstrip('/') + route.format(org_id=org_id)
+            kwargs = {}
+        else:
+            app_method, url = method, f"{base_url}/rest/v1/projects?{_query_string(params)}"
+            kwargs = {'headers': {'Prefer': prefer}} if prefer else {}
+
+        latencies = []
+        response = None
+        for _ in range(args.warmup + args.repeat):
+            latency, response = time_request(app_method, url, **kwargs)
+            if response.status_code >= 400:
+                print(f"   ❌ {name}: HTTP {response.status_code} {response.text[:200]}")
+                latencies = []
+                break
+            latencies.append(latency)
+        results.append(_summarise(scale, name, latencies[args.warmup:], _row_count(name, method, response, args)))
+
+    if args.app_url:
+        latency, response = time_request('POST', f"{args.app_url.rstrip('/')}/api/auto-close-projects", json={})
+        closed = response.json().get('closed_count') if response.status_code == 200 else None
+    else:
+        latency, closed = auto_close(base_url, cutoff)
+    results.append(_summarise(scale, 'autoCloseProjects', [latency], closed))
+
+    server.shutdown()
+    server.server_close()
+    store.db.close()
+    return results
+
+
+def _row_count(name, method, response, args):
+    if response is None or response.status_code >= 400:
+        return None
+    if args.app_url:
+        body = response.json()
+        return body.get('count') if name == 'getProjectCount' else len(body.get('data') or [])
+    if method == 'HEAD':
+        return response.headers.get('Content-Range')
+    return len(response.json())
+
+
+def _summarise(scale, name, latencies, rows):
+    ordered = sorted(latencies)
+    result = {
+        'scale': scale,
+        'endpoint': name,
+        'runs': len(ordered),
+        'rows': rows,
+        'p50_ms': percentile(ordered, 50) * 1000,
+        'p95_ms': percentile(ordered, 95) * 1000,
+        'max_ms': (ordered[-1] if ordered else 0.0) * 1000
+    }
+    print(f"   {'✅' if ordered else '❌'} {name}: p50 {result['p50_ms']:.1f} ms, "
+          f"p95 {result['p95_ms']:.1f} ms ({rows} rows)")
+    return result
+
+
+def print_results(results):
+    print(f"\n{'projects':>10} {'endpoint':<26} {'runs':>5} {'rows':>14} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for r in results:
+        print(f"{r['scale']:>10,} {r['endpoint']:<26} {r['runs']:>5} {str(r['rows']):>14} "
+              f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['max_ms']:>9.1f}")
+
+
+def run_bench(args):
+    print(f"🗄️  PROJECT QUERY SCALE BENCHMARK")
+    print(f"📍 Target: {args.app_url or 'PostgREST stand-in (handler queries sent directly)'}")
+    print(f"📏 Scales: {', '.join(f'{s:,}' for s in args.scales)} projects per org, max rows {args.max_rows}")
+    results = []
+    for scale in args.scales:
+        results.extend(run_scale(scale, args))
+    print_results(results)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'target': args.app_url or 'standin', 'results': results}, f, indent=2)
+        print(f"\n💾 Results written to {args.json_path}")
+    return all(r['runs'] for r in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Supabase/PostgREST stand-in backed by SQLite")
+    sub = parser.add_subparsers(dest='command')
+    for name in ('serve', 'bench'):
+        p = sub.add_parser(name)
+        p.add_argument('--port', type=int, default=DEFAULT_PORT)
+        p.add_argument('--max-rows', type=int, default=DEFAULT_MAX_ROWS,
+                       help="Row cap per response like Supabase's db-max-rows (0 for none)")
+        p.add_argument('--seed', type=int, default=0)
+    serve = sub.choices['serve']
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--db', default=':memory:', help="SQLite file for the tables")
+    serve.add_argument('--org', default='org-bench', help="Org to seed projects for")
+    serve.add_argument('--projects', type=int, default=0, help="Projects to seed for --org")
+    bench = sub.choices['bench']
+    bench.add_argument('--scales', type=parse_int_list, default=[1000, 100000, 1000000],
+                       help="Comma-separated projects-per-org sizes")
+    bench.add_argument('--other-orgs', type=int, default=10, help="Background orgs sharing the table")
+    bench.add_argument('--other-size', type=int, default=1000, help="Projects per background org")
+    bench.add_argument('--repeat', type=int, default=20)
+    bench.add_argument('--warmup', type=int, default=2)
+    bench.add_argument('--db', help="SQLite file pattern, e.g. /tmp/projects-{scale}.db (default in memory)")
+    bench.add_argument('--app-url', help="Time the Next.js API routes instead; the app must use this stand-in "
+                                         "on --port and run with NODE_ENV=production")
+    bench.add_argument('--explain', action='store_true', help="Print SQLite query plans")
+    bench.add_argument('--json', dest='json_path', help="Write results to this JSON file")
+
+    argv = sys.argv[1:]
+    if not argv or argv[0] not in sub.choices and argv[0] not in ('-h', '--help'):
+        argv = ['serve'] + argv
+    args = parser.parse_args(argv)
+
+    if args.command == 'bench':
+        return run_bench(args)
+
+    store = TableStore(args.db)
+    if args.projects:
+        seed_projects(store, args.org, args.projects, seed=args.seed)
+    server = start_postgrest_standin(args.host, args.port, store=store, max_rows=args.max_rows)
+    print(f"🗄️  PostgREST stand-in listening on {server_url(server)} ({store.count('projects'):,} projects)")
+    print(f"   Set NEXT_PUBLIC_SUPABASE_URL={server_url(server)} and run the app with NODE_ENV=production")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Load generator for POST /api/generate-report
+Uses the demo path (photos sent inline as base64, no DB writes) and sweeps photo counts
+and concurrency levels, reporting throughput and p50/p95/p99 latency per configuration.
+With --stream, photos are read from disk and base64-encoded while the body is uploaded,
+so memory stays flat however large the payloads get. With --rate, requests are sent open-loop
+at that arrival rate instead, and latency counts from each request's scheduled send time
+"""
+
+import argparse
+import base64
+import glob
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import http_client
+import open_loop
+from env_config import get_base_url
+from streaming_body import StreamingJsonBody
+from synthetic_jpeg import make_jpeg
+
+LOCAL_BASE_URL = "http://localhost:3000"
+
+# Stage A runs once per photo, so a report can take minutes at high photo counts
+REPORT_TIMEOUT = (10, 600)
+
+
+def parse_int_list(value):
+    return [int(v) for v in value.split(',') if v.strip()]
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def make_photo_pool(count, width, height, detail):
+    """Distinct synthetic photos, base64 encoded once and reused across requests"""
+    return [
+        base64.b64encode(make_jpeg(width, height, seed=i, detail=detail)).decode('ascii')
+        for i in range(count)
+    ]
+
+
+def write_photo_files(count, width, height, detail, directory):
+    """Distinct synthetic photos written to disk for streamed bodies"""
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"photo-{i:04d}.jpg")
+        with open(path, 'wb') as f:
+            f.write(make_jpeg(width, height, seed=i, detail=detail))
+        paths.append(path)
+    return paths
+
+
+def report_fields():
+    return {
+        "project_id": "load-test",
+        "project_name": "Load Test Project",
+        "date": date.today().isoformat()
+    }
+
+
+def build_payload(photo_pool, photo_count, request_index):
+    photos = [{"base64": photo_pool[(request_index + i) % len(photo_pool)]} for i in range(photo_count)]
+    return dict(report_fields(), photos=photos)
+
+
+def build_streaming_payload(photo_paths, photo_count, request_index):
+    paths = [photo_paths[(request_index + i) % len(photo_paths)] for i in range(photo_count)]
+    return StreamingJsonBody.report(report_fields(), paths)
+
+
+def send_report_request(url, payload, timeout, chunked=True):
+    """Return (latency seconds, error or None)"""
+    start = time.perf_counter()
+    try:
+        if isinstance(payload, StreamingJsonBody):
+            response = http_client.post(url, data=payload.chunked() if chunked else payload, timeout=timeout,
+                                        headers={'Content-Type': payload.content_type})
+        else:
+            response = http_client.post(url, json=payload, timeout=timeout)
+        latency = time.perf_counter() - start
+        if response.status_code != 200:
+            return latency, f"HTTP {response.status_code}"
+        if not response.json().get('success'):
+            return latency, "success flag is false"
+        return latency, None
+    except Exception as e:
+        return time.perf_counter() - start, str(e)
+
+
+def run_configuration(url, photo_pool, photo_count, concurrency, requests_per_config, timeout,
+                      stream=False, chunked=True):
+    """Run one (photo count, concurrency) cell of the sweep"""
+    build = build_streaming_payload if stream else build_payload
+    payloads = [build(photo_pool, photo_count, i) for i in range(requests_per_config)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda p: send_report_request(url, p, timeout, chunked), payloads))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, error in results if error is None)
+    errors = [error for _, error in results if error is not None]
+    completed = len(latencies)
+    return {
+        "photos": photo_count,
+        "concurrency": concurrency,
+        "requests": requests_per_config,
+        "completed": completed,
+        "errors": len(errors),
+        "error_samples": sorted(set(errors))[:3],
+        "elapsed_s": elapsed,
+        "throughput_rps": completed / elapsed if elapsed else 0.0,
+        "photos_per_s": completed * photo_count / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1000
+    }
+
+
+def run_open_loop_configuration(url, photo_pool, photo_count, rate, args, timeout):
+    """Send reports open-loop at `rate` req/s; payloads are built when each request fires"""
+    build = build_streaming_payload if args.stream else build_payload
+
+    def send(index):
+        return send_report_request(url, build(photo_pool, photo_count, index), timeout,
+                                   not args.content_length)[1]
+
+    return open_loop.run_open_loop(send, rate, args.duration, args.arrival, args.seed)
+
+
+def print_results(results):
+    print(f"\n{'photos':>6} {'conc':>5} {'ok':>5} {'err':>4} {'req/s':>8} {'photo/s':>8} "
+          f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for r in results:
+        print(f"{r['photos']:>6} {r['concurrency']:>5} {r['completed']:>5} {r['errors']:>4} "
+              f"{r['throughput_rps']:>8.2f} {r['photos_per_s']:>8.2f} {r['p50_ms']:>9.0f} "
+              f"{r['p95_ms']:>9.0f} {r['p99_ms']:>9.0f} {r['max_ms']:>9.0f}")
+        for sample in r['error_samples']:
+            print(f"       ❌ {sample}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep POST /api/generate-report load")
+    parser.add_argument('--base-url', default=LOCAL_BASE_URL,
+                        help="Target base URL ('production' uses NEXT_PUBLIC_BASE_URL)")
+    parser.add_argument('--photos', type=parse_int_list, default=[1, 5, 10],
+                        help="Comma-separated photo counts per report")
+    parser.add_argument('--concurrency', type=parse_int_list, default=[1, 4, 8],
+                        help="Comma-separated concurrency levels")
+    parser.add_argument('--requests', type=int, default=20, help="Requests per configuration")
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--detail', type=int, default=12,
+                        help="AC coefficients per 8x8 block (controls photo size)")
+    parser.add_argument('--stream', action='store_true',
+                        help="Stream bodies from photo files instead of building them in memory")
+    parser.add_argument('--photo-dir', help="With --stream, send the .jpg files in this directory")
+    parser.add_argument('--content-length', action='store_true',
+                        help="With --stream, send Content-Length instead of a chunked upload")
+    parser.add_argument('--rate', type=open_loop.parse_float_list,
+                        help="Comma-separated open-loop arrival rates (req/s), replacing the concurrency sweep")
+    parser.add_argument('--duration', type=float, default=60, help="With --rate, seconds of arrivals per rate")
+    parser.add_argument('--arrival', choices=open_loop.ARRIVALS, default='constant',
+                        help="With --rate, evenly spaced or Poisson arrivals")
+    parser.add_argument('--seed', type=int, help="Seed for Poisson arrivals")
+    parser.add_argument('--adaptive', action='store_true',
+                        help="Let the client cut in-flight reports with AIMD on errors, slowdowns and "
+                             "Stage A fallbacks (concurrency levels become ceilings)")
+    parser.add_argument('--json', dest='json_path', help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    base_url = get_base_url() if args.base_url == 'production' else args.base_url
+    url = f"{base_url}/api/generate-report"
+
+    print(f"🧪 GENERATE-REPORT LOAD SWEEP")
+    print(f"📍 Target: {url}")
+    print(f"📷 Photos: {args.photos} at {args.width}x{args.height}")
+    if args.rate:
+        print(f"⏲️  Open-loop {args.arrival} arrivals at {args.rate} req/s for {args.duration:g}s each")
+    else:
+        print(f"🔀 Concurrency: {args.concurrency}, {args.requests} requests each")
+
+    controller = None
+    if args.adaptive:
+        ceiling = open_loop.DEFAULT_MAX_IN_FLIGHT if args.rate else max(args.concurrency)
+        controller = http_client.get_client().enable_adaptive_concurrency(max_limit=ceiling)
+        print(f"🎚️  Adaptive concurrency up to {ceiling} in flight")
+
+    photo_dir = None
+    if not args.stream:
+        photo_pool = make_photo_pool(max(args.photos), args.width, args.height, args.detail)
+        print(f"📦 Photo size: {len(photo_pool[0]) / 1024:.0f} KiB base64")
+    elif args.photo_dir:
+        photo_pool = sorted(glob.glob(os.path.join(args.photo_dir, '*.jpg')))
+        if not photo_pool:
+            print(f"❌ No .jpg files in {args.photo_dir}")
+            return False
+    else:
+        photo_dir = tempfile.TemporaryDirectory(prefix='report-load-')
+        photo_pool = write_photo_files(max(args.photos), args.width, args.height, args.detail, photo_dir.name)
+    if args.stream:
+        largest = len(build_streaming_payload(photo_pool, max(args.photos), 0))
+        print(f"📦 Streaming {len(photo_pool)} photo file(s), largest body {largest / 1048576:.1f} MiB "
+              f"({'Content-Length' if args.content_length else 'chunked'})")
+
+    results = []
+    for photo_count in args.photos:
+        if args.rate:
+            for rate in args.rate:
+                result = run_open_loop_configuration(url, photo_pool, photo_count, rate, args, REPORT_TIMEOUT)
+                open_loop.print_open_loop(result, label=f"{photo_count} photo(s) at ")
+                results.append(dict(open_loop.summarise(result), photos=photo_count))
+            continue
+        for concurrency in args.concurrency:
+            print(f"\n🔍 {photo_count} photo(s) at concurrency {concurrency}")
+            result = run_configuration(url, photo_pool, photo_count, concurrency, args.requests, REPORT_TIMEOUT,
+                                       stream=args.stream, chunked=not args.content_length)
+            print(f"   {result['completed']}/{result['requests']} ok, "
+                  f"{result['throughput_rps']:.2f} req/s, p95 {result['p95_ms']:.0f} ms")
+            results.append(result)
+
+    if not args.rate:
+        print_results(results)
+    if controller:
+        controller.print_summary()
+    if photo_dir:
+        photo_dir.cleanup()
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({"target": url, "results": results,
+                       "concurrency": controller.to_dict() if controller else None}, f, indent=2)
+        print(f"\n💾 Results written to {args.json_path}")
+
+    return all(r['errors'] == 0 for r in results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Local Resend stand-in for load-testing the email paths
+Accepts POST /emails and /emails/batch like the Resend API, stores every captured message
+in an indexed SQLite store queryable by recipient, subject and time, and exposes send-rate
+and latency metrics.
+
+Point the app at it with RESEND_BASE_URL=http://127.0.0.1:8151 (any RESEND_API_KEY works)
+
+    python resend_standin.py serve
+    python resend_standin.py bench --sends 5000 --concurrency 1
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import http_client
+from standin_server import (
+    Counters, JsonRequestHandler, LatencyDistribution, SeededRandom, TokenBucket, server_url, sleep_ms,
+    start_server
+)
+
+DEFAULT_PORT = 8151
+
+# Latency samples kept for the metrics endpoint
+METRIC_WINDOW = 100000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS emails (
+    id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    sender TEXT,
+    subject TEXT,
+    html TEXT,
+    text TEXT,
+    payload TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS recipients (
+    email_id TEXT NOT NULL REFERENCES emails(id),
+    recipient TEXT NOT NULL,
+    kind TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS emails_created_at_idx ON emails(created_at);
+CREATE INDEX IF NOT EXISTS emails_subject_idx ON emails(subject);
+CREATE INDEX IF NOT EXISTS recipients_recipient_idx ON recipients(recipient, email_id);
+"""
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+class EmailStore:
+    """Captured messages with indexes on recipient, subject and send time"""
+
+    def __init__(self, path=':memory:'):
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.executescript(SCHEMA)
+        self.lock = threading.Lock()
+
+    def add(self, message):
+        email_id = str(uuid.uuid4())
+        created_at = time.time()
+        recipients = [(email_id, r.lower(), kind)
+                      for kind in ('to', 'cc', 'bcc') for r in _as_list(message.get(kind))]
+        with self.lock, self.db:
+            self.db.execute(
+                "INSERT INTO emails (id, created_at, sender, subject, html, text, payload) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (email_id, created_at, message.get('from'), message.get('subject'),
+                 message.get('html'), message.get('text'), json.dumps(message))
+            )
+            self.db.executemany("INSERT INTO recipients (email_id, recipient, kind) VALUES (?, ?, ?)", recipients)
+        return email_id, created_at
+
+    def get(self, email_id):
+        with self.lock:
+            row = self.db.execute("SELECT id, created_at, payload FROM emails WHERE id = ?", (email_id,)).fetchone()
+        return self._row(row) if row else None
+
+    def query(self, to=None, subject=None, subject_contains=None, since=None, until=None, limit=100):
+        """Messages matching every given filter, newest first"""
+        sql = "SELECT DISTINCT e.id, e.created_at, e.payload FROM emails e"
+        where = []
+        params = []
+        if to:
+            sql += " JOIN recipients r ON r.email_id = e.id"
+            where.append("r.recipient = ?")
+            params.append(to.lower())
+        if subject:
+            where.append("e.subject = ?")
+            params.append(subject)
+        if subject_contains:
+            where.append("e.subject LIKE ?")
+            params.append(f"%{subject_contains}%")
+        if since is not None:
+            where.append("e.created_at >= ?")
+            params.append(float(since))
+        if until is not None:
+            where.append("e.created_at < ?")
+            params.append(float(until))
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY e.created_at DESC LIMIT ?"
+        params.append(int(limit))
+        with self.lock:
+            rows = self.db.execute(sql, params).fetchall()
+        return [self._row(row) for row in rows]
+
+    def count(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM emails").fetchone()[0]
+
+    def clear(self):
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM recipients")
+            self.db.execute("DELETE FROM emails")
+
+    @staticmethod
+    def _row(row):
+        email_id, created_at, payload = row
+        return dict(json.loads(payload), id=email_id, created_at=created_at)
+
+
+class SendMetrics:
+    """Send timestamps and handling latency for rate and percentile reporting"""
+
+    def __init__(self, window=METRIC_WINDOW):
+        self.samples = deque(maxlen=window)
+        self.total = 0
+        self.first = None
+        self.last = None
+        self.lock = threading.Lock()
+
+    def record(self, sent_at, latency_s, count=1):
+        with self.lock:
+            self.samples.append((sent_at, latency_s))
+            self.total += count
+            self.first = sent_at if self.first is None else self.first
+            self.last = sent_at
+
+    def snapshot(self):
+        now = time.time()
+        with self.lock:
+            samples = list(self.samples)
+            total, first, last = self.total, self.first, self.last
+        latencies = sorted(latency for _, latency in samples)
+
+        def pct(q):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(q / 100 * len(latencies)))] * 1000
+
+        span = (last - first) if first is not None else 0.0
+        return {
+            'sent_total': total,
+            'first_sent_at': first,
+            'last_sent_at': last,
+            'span_s': span,
+            'rate_overall_per_s': total / span if span > 0 else float(total),
+            'rate_last_1s': sum(1 for t, _ in samples if t >= now - 1),
+            'rate_last_10s': sum(1 for t, _ in samples if t >= now - 10) / 10.0,
+            'latency_ms': {'p50': pct(50), 'p90': pct(90), 'p99': pct(99),
+                           'max': latencies[-1] * 1000 if latencies else 0.0}
+        }
+
+
+def _resend_error(status, name, message):
+    return {'statusCode': status, 'name': name, 'message': message}
+
+
+class ResendHandler(JsonRequestHandler):
+    def route(self, method):
+        server = self.server
+        path = self.route_path
+
+        if path == '/emails' and method == 'POST':
+            return self._send(batch=False)
+        if path == '/emails/batch' and method == 'POST':
+            return self._send(batch=True)
+        if path.startswith('/emails/') and method == 'GET':
+            message = server.store.get(path.split('/')[2])
+            if not message:
+                return self.send_json(404, _resend_error(404, 'not_found', 'Email not found'))
+            return self.send_json(200, message)
+
+        if path == '/_standin/emails' and method == 'GET':
+            q = self.query
+            return self.send_json(200, {'data': server.store.query(
+                to=q.get('to'), subject=q.get('subject'), subject_contains=q.get('subject_contains'),
+                since=q.get('since'), until=q.get('until'), limit=q.get('limit', 100)
+            )})
+        if path == '/_standin/metrics' and method == 'GET':
+            metrics = server.metrics.snapshot()
+            metrics['stored'] = server.store.count()
+            metrics['outcomes'] = server.counters.snapshot()
+            return self.send_json(200, metrics)
+        if path == '/_standin/reset' and method == 'POST':
+            server.store.clear()
+            server.metrics = SendMetrics()
+            server.counters = Counters()
+            return self.send_json(200, {'reset': True})
+        return self.send_json(404, _resend_error(404, 'not_found', f"Unknown path {path}"))
+
+    def _send(self, batch):
+        server = self.server
+        start = time.perf_counter()
+        # Read the body before any early answer, or it is parsed as the next keep-alive request
+        raw = self.read_body()
+        if not self.headers.get('Authorization', '').startswith('Bearer '):
+            server.counters.incr('unauthorized')
+            return self.send_json(401, _resend_error(401, 'missing_api_key', 'Missing API key in the authorization header'))
+        if server.bucket and not server.bucket.take():
+            server.counters.incr('rate_limited')
+            return self.send_json(429, _resend_error(429, 'rate_limit_exceeded', 'Too many requests. Please slow down.'))
+        if server.random.random() < server.error_rate:
+            server.counters.incr('errors')
+            return self.send_json(500, _resend_error(500, 'internal_server_error', 'An unexpected error occurred.'))
+
+        body = json.loads(raw) if raw else {}
+        messages = body if batch else [body]
+        for message in messages:
+            for field in ('from', 'to', 'subject'):
+                if not message.get(field):
+                    server.counters.incr('invalid')
+                    return self.send_json(422, _resend_error(422, 'validation_error', f"Missing `{field}` field."))
+
+        sleep_ms(server.random.latency_ms(server.latency))
+        ids = [server.store.add(message)[0] for message in messages]
+        server.metrics.record(time.time(), time.perf_counter() - start, len(ids))
+        server.counters.incr('sent', len(ids))
+        if batch:
+            return self.send_json(200, {'data': [{'id': email_id} for email_id in ids]})
+        return self.send_json(200, {'id': ids[0]})
+
+
+def start_resend_standin(host='127.0.0.1', port=0, latency='none', error_rate=0.0, rps=None,
+                         seed=None, db_path=':memory:'):
+    """Start the stand-in on a background thread and return the server"""
+    return start_server(
+        ResendHandler, host, port,
+        store=EmailStore(db_path),
+        metrics=SendMetrics(),
+        counters=Counters(),
+        latency=LatencyDistribution.parse(latency),
+        error_rate=error_rate,
+        bucket=TokenBucket(rps * 60, burst=max(1.0, rps)) if rps else None,
+        random=SeededRandom(seed)
+    )
+
+
+def send_notification(base_url, index):
+    """One autoCloseProjects-style notification"""
+    return http_client.post(
+        f"{base_url}/emails",
+        json={
+            'from': 'support@siterecap.com',
+            'to': [f"owner{index}@example.com"],
+            'subject': f'Project "Load Project {index}" marked as completed due to inactivity',
+            'html': '<p>Hello,</p><p>Your project has been marked as completed due to inactivity.</p>'
+        },
+        headers={'Authorization': 'Bearer re_standin'}
+    )
+
+
+def run_bench(args):
+    """Drive N notification sends the way autoCloseProjects does (concurrency 1 = its sequential loop)"""
+    server = start_resend_standin(latency=args.latency, error_rate=args.error_rate, rps=args.rps, seed=args.seed)
+    base_url = server_url(server)
+    print(f"📧 RESEND NOTIFICATION LOOP BENCHMARK")
+    print(f"📍 Stand-in: {base_url} (latency {server.latency})")
+    print(f"🔁 {args.sends} sends at concurrency {args.concurrency}")
+
+    failures = 0
+    start = time.perf_counter()
+    if args.concurrency == 1:
+        for i in range(args.sends):
+            failures += send_notification(base_url, i).status_code != 200
+    else:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            for response in executor.map(lambda i: send_notification(base_url, i), range(args.sends)):
+                failures += response.status_code != 200
+    elapsed = time.perf_counter() - start
+
+    metrics = server.metrics.snapshot()
+    print(f"\n⏱️  {args.sends} sends took {elapsed:.2f}s ({args.sends / elapsed:.0f}/s), {failures} failed")
+    print(f"📊 Server latency p50 {metrics['latency_ms']['p50']:.1f} ms, "
+          f"p99 {metrics['latency_ms']['p99']:.1f} ms, stored {server.store.count()}")
+    sample = server.store.query(to='owner0@example.com', limit=1)
+    if sample:
+        print(f"🔎 Query by recipient: {sample[0]['subject']}")
+    server.shutdown()
+    return failures == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Resend stand-in with a capture store")
+    sub = parser.add_subparsers(dest='command')
+    for name in ('serve', 'bench'):
+        p = sub.add_parser(name)
+        p.add_argument('--latency', default='none', help="Send latency, e.g. lognormal:120,0.4")
+        p.add_argument('--error-rate', type=float, default=0.0, help="Share of sends answered with 500")
+        p.add_argument('--rps', type=float, help="Rate limit in sends per second (429 beyond it)")
+        p.add_argument('--seed', type=int, default=0)
+    serve = sub.choices['serve']
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve.add_argument('--db', default=':memory:', help="SQLite file for captured messages")
+    bench = sub.choices['bench']
+    bench.add_argument('--sends', type=int, default=5000)
+    bench.add_argument('--concurrency', type=int, default=1)
+    argv = sys.argv[1:]
+    if not argv or argv[0] not in sub.choices and argv[0] not in ('-h', '--help'):
+        argv = ['serve'] + argv
+    args = parser.parse_args(argv)
+
+    if args.command == 'bench':
+        return run_bench(args)
+
+    server = start_resend_standin(args.host, args.port, args.latency, args.error_rate, args.rps, args.seed, args.db)
+    print(f"📧 Resend stand-in listening on {server_url(server)}")
+    print(f"   Set RESEND_BASE_URL={server_url(server)} for the Next.js app")
+    print(f"   Query captured mail at {server_url(server)}/_standin/emails?to=...&subject_contains=...")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
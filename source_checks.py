@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Single-pass source checks for the SiteRecap test scripts
+Every pattern registered against a file is matched in one pass over its text with an
+Aho-Corasick automaton, so adding rules no longer means rereading or re-lowering files
+"""
+
+import errno
+import os
+import threading
+from collections import deque
+
+
+class Pattern:
+    """A substring to look for; ignore_case matches like `text in content.lower()`"""
+
+    __slots__ = ('text', 'ignore_case')
+
+    def __init__(self, text, ignore_case=False):
+        self.text = text.lower() if ignore_case else text
+        self.ignore_case = ignore_case
+
+    def __eq__(self, other):
+        return isinstance(other, Pattern) and (self.text, self.ignore_case) == (other.text, other.ignore_case)
+
+    def __hash__(self):
+        return hash((self.text, self.ignore_case))
+
+    def __repr__(self):
+        return f"ci({self.text!r})" if self.ignore_case else repr(self.text)
+
+
+def ci(text):
+    """Case-insensitive pattern"""
+    return Pattern(text, ignore_case=True)
+
+
+def _as_pattern(pattern):
+    return pattern if isinstance(pattern, Pattern) else Pattern(pattern)
+
+
+def _fold(ch):
+    # Lower-case one character without changing the text length, so match
+    # offsets still line up with the original text
+    low = ch.lower()
+    return low if len(low) == 1 else ch
+
+
+class PatternAutomaton:
+    """Aho-Corasick automaton over case-folded patterns"""
+
+    def __init__(self, patterns):
+        self.patterns = list(dict.fromkeys(_as_pattern(p) for p in patterns))
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for index, pattern in enumerate(self.patterns):
+            self._insert(index, pattern)
+        self._link()
+
+    def _insert(self, index, pattern):
+        state = 0
+        for ch in pattern.text:
+            ch = _fold(ch)
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = next_state
+        self._out[state].append(index)
+
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(ch, 0)
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def find(self, text):
+        """Return the set of patterns that occur in text, from a single pass"""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        remaining = len(self.patterns)
+        state = 0
+        for position, ch in enumerate(text):
+            ch = _fold(ch)
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for index in out[state]:
+                if index in found:
+                    continue
+                pattern = self.patterns[index]
+                # Case-sensitive patterns share the folded trie; confirm the exact text
+                if not pattern.ignore_case:
+                    start = position + 1 - len(pattern.text)
+                    if text[start:position + 1] != pattern.text:
+                        continue
+                found.add(index)
+                remaining -= 1
+            if not remaining:
+                break
+        return {self.patterns[index] for index in found}
+
+
+class SourceChecks:
+    """Named groups of substring checks answered from one scan per file"""
+
+    def __init__(self):
+        self._groups = {}
+        self._patterns = {}
+        self._found = None
+        self._missing = set()
+        self._lock = threading.Lock()
+
+    def add(self, group, name, *requirements):
+        """Register a check passing when every (path, pattern) requirement is found"""
+        requirements = [(path, _as_pattern(pattern)) for path, pattern in requirements]
+        self._groups.setdefault(group, []).append((name, requirements))
+        for path, pattern in requirements:
+            self._patterns.setdefault(path, set()).add(pattern)
+        self._found = None
+
+    def _scan(self):
+        found = {}
+        missing = set()
+        for path, patterns in self._patterns.items():
+            try:
+                with open(path, 'r') as f:
+                    content = f.read()
+            except FileNotFoundError:
+                missing.add(path)
+                continue
+            found[path] = PatternAutomaton(patterns).find(content)
+        return found, missing
+
+    def _results(self):
+        with self._lock:
+            if self._found is None:
+                self._found, self._missing = self._scan()
+            return self._found, self._missing
+
+    def missing(self, group):
+        """Files required by a group that could not be read"""
+        _, missing = self._results()
+        return list(dict.fromkeys(path for _, requirements in self._groups[group]
+                                  for path, _ in requirements if path in missing))
+
+    def require(self, group):
+        """Raise FileNotFoundError for the first file a group needs but could not read"""
+        for path in self.missing(group):
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+
+    def results(self, group):
+        """Return [(check name, passed)] for a group, scanning the files on first use"""
+        found, _ = self._results()
+        return [
+            (name, all(pattern in found.get(path, ()) for path, pattern in requirements))
+            for name, requirements in self._groups[group]
+        ]
+
+    def refresh(self):
+        """Forget the last scan so the next lookup rereads the files"""
+        with self._lock:
+            self._found = None
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Shared pieces for the local stand-in servers used by the SiteRecap benchmarks
+Latency distributions, a JSON request handler and a threaded server runner
+"""
+
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class LatencyDistribution:
+    """Latency in milliseconds (or any non-negative quantity) drawn from a named distribution
+
+    Specs: none, fixed:V, uniform:LO,HI, normal:MEAN,SD, lognormal:MEDIAN,SIGMA, exp:MEAN, poisson:MEAN
+    """
+
+    KINDS = ('none', 'fixed', 'uniform', 'normal', 'lognormal', 'exp', 'poisson')
+
+    def __init__(self, kind='none', params=()):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        self.kind = kind
+        self.params = tuple(float(p) for p in params)
+
+    @classmethod
+    def parse(cls, spec):
+        kind, _, params = spec.partition(':')
+        return cls(kind.strip(), [p for p in params.split(',') if p.strip()])
+
+    def sample(self, rng):
+        p = self.params
+        if self.kind == 'none':
+            return 0.0
+        if self.kind == 'fixed':
+            value = p[0]
+        elif self.kind == 'uniform':
+            value = rng.uniform(p[0], p[1])
+        elif self.kind == 'normal':
+            value = rng.gauss(p[0], p[1])
+        elif self.kind == 'lognormal':
+            value = p[0] * rng.lognormvariate(0.0, p[1])
+        elif self.kind == 'poisson':
+            value = _poisson(rng, p[0])
+        else:
+            value = rng.expovariate(1.0 / p[0])
+        return max(0.0, value)
+
+    def __str__(self):
+        return f"{self.kind}:{','.join(f'{p:g}' for p in self.params)}" if self.params else self.kind
+
+
+def _poisson(rng, mean):
+    """Knuth's method for small means, a rounded normal approximation above 30"""
+    if mean > 30:
+        return max(0, round(rng.gauss(mean, mean ** 0.5)))
+    limit = math.exp(-mean)
+    count = 0
+    product = rng.random()
+    while product > limit:
+        count += 1
+        product *= rng.random()
+    return count
+
+
+class SeededRandom:
+    """Thread-safe random source so a seeded run draws the same sequence of outcomes"""
+
+    def __init__(self, seed=None):
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def random(self):
+        with self._lock:
+            return self._rng.random()
+
+    def latency_ms(self, distribution):
+        with self._lock:
+            return distribution.sample(self._rng)
+
+
+class TokenBucket:
+    """Requests-per-minute quota; callers answer 429 when take() fails
+
+    burst caps how many requests may go through back to back (default: a full minute's worth).
+    """
+
+    def __init__(self, per_minute, burst=None):
+        self.capacity = float(per_minute if burst is None else burst)
+        self.tokens = self.capacity
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class Counters:
+    """Thread-safe named counters exposed by each stand-in's stats endpoint"""
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts)
+
+
+def sleep_ms(ms):
+    if ms > 0:
+        time.sleep(ms / 1000.0)
+
+
+class JsonRequestHandler(BaseHTTPRequestHandler):
+    """Base handler with JSON helpers; subclasses implement route(method)"""
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without this Nagle adds ~40 ms per keep-alive response
+    disable_nagle_algorithm = True
+    quiet = True
+
+    def _dispatch(self):
+        parts = urlsplit(self.path)
+        self.route_path = parts.path
+        self.query = {k: v[-1] for k, v in parse_qs(parts.query, keep_blank_values=True).items()}
+        self.body_state = 'unread' if self._chunked() or int(self.headers.get('Content-Length') or 0) else 'read'
+        try:
+            self.route(self.command)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        except Exception as e:
+            self.send_json(500, {'error': {'code': 500, 'message': str(e)}})
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = _dispatch
+
+    def route(self, method):
+        self.send_json(404, {'error': 'Not found'})
+
+    def _chunked(self):
+        return 'chunked' in (self.headers.get('Transfer-Encoding') or '').lower()
+
+    def iter_body(self, chunk_size=65536):
+        """Yield the request body in pieces, for Content-Length and chunked uploads alike"""
+        self.body_state = 'partial'
+        if self._chunked():
+            while True:
+                size = int(self.rfile.readline().split(b';')[0].strip() or b'0', 16)
+                if size == 0:
+                    while self.rfile.readline().strip():
+                        pass  # trailers
+                    break
+                yield from self._read_exactly(size, chunk_size)
+                self.rfile.readline()
+        else:
+            yield from self._read_exactly(int(self.headers.get('Content-Length') or 0), chunk_size)
+        self.body_state = 'read'
+
+    def _settle_body(self):
+        """Extra headers for an answer sent before the request body was fully read
+
+        An unread body is drained so the keep-alive connection stays in sync (clients send the
+        whole body before reading the answer anyway); a half-read one closes the connection.
+        """
+        if getattr(self, 'body_state', 'read') == 'read':
+            return {}
+        if self.body_state == 'unread':
+            try:
+                for _ in self.iter_body():
+                    pass
+                return {}
+            except (OSError, ValueError):
+                pass
+        return {'Connection': 'close'}
+
+    def _read_exactly(self, remaining, chunk_size):
+        while remaining > 0:
+            data = self.rfile.read(min(chunk_size, remaining))
+            if not data:
+                raise ConnectionResetError("Client closed the connection mid-body")
+            remaining -= len(data)
+            yield data
+
+    def read_body(self):
+        return b''.join(self.iter_body())
+
+    def read_json(self):
+        body = self.read_body()
+        return json.loads(body) if body else {}
+
+    def send_body(self, status, body, content_type='application/json', headers=None):
+        headers = dict(headers or {}, **self._settle_body())
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def send_json(self, status, payload, headers=None):
+        self.send_body(status, json.dumps(payload).encode(), headers=headers)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def start_server(handler_class, host='127.0.0.1', port=0, **state):
+    """Start a stand-in on a background thread; state is attached to the server object"""
+    server = StandinServer((host, port), handler_class)
+    for name, value in state.items():
+        setattr(server, name, value)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def server_url(server):
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Local Supabase Storage stand-in and upload benchmark for /api/upload-photo
+Accepts supabase-js storage uploads (POST/PUT /storage/v1/object/{bucket}/{path}), streams
+them to disk with an optional per-upload bandwidth cap, serves public object URLs, and
+answers /rest/v1 through the PostgREST stand-in so uploadPhoto's photos insert works too.
+
+Point the app at it with NEXT_PUBLIC_SUPABASE_URL=http://127.0.0.1:8153 and NODE_ENV=production.
+
+    python storage_standin.py serve --bandwidth 20
+    python storage_standin.py bench --concurrency 1,2,4,8,16,32 --width 4032 --height 3024
+"""
+
+import argparse
+import json
+import mimetypes
+import mmap
+import multiprocessing
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date
+
+import http_client
+from postgrest_standin import DEFAULT_MAX_ROWS, PostgrestHandler, TableStore
+from report_load_test import parse_int_list, percentile
+from standin_server import Counters, LatencyDistribution, SeededRandom, server_url, sleep_ms, start_server
+from streaming_body import MultipartBody
+from synthetic_jpeg import make_jpeg
+
+DEFAULT_PORT = 8153
+
+OBJECT_PREFIX = '/storage/v1/object/'
+PUBLIC_PREFIX = '/storage/v1/object/public/'
+
+RECEIVE_CHUNK = 256 * 1024
+
+# Throughput gains below this share mean the extra concurrency bought nothing
+SATURATION_GAIN = 0.10
+
+
+def extract_multipart_file(path, boundary):
+    """Cut the first file part out of a multipart body stored at `path`, in place"""
+    delimiter = b'--' + boundary.encode()
+    with open(path, 'r+b') as f:
+        if not os.fstat(f.fileno()).st_size:
+            raise ValueError("Empty multipart body")
+        with mmap.mmap(f.fileno(), 0) as mapped:
+            position = 0
+            while True:
+                start = mapped.find(delimiter, position)
+                if start < 0:
+                    raise ValueError("No file part in multipart body")
+                header_end = mapped.find(b'\r\n\r\n', start)
+                end = mapped.find(b'\r\n' + delimiter, header_end)
+                if header_end < 0 or end < 0:
+                    raise ValueError("Truncated multipart body")
+                if b'filename=' in mapped[start:header_end]:
+                    break
+                position = end + 2
+            data_start = header_end + 4
+            length = end - data_start
+            mapped.move(0, data_start, length)
+            mapped.flush()
+        f.truncate(length)
+    return length
+
+
+def _boundary(content_type):
+    for item in content_type.split(';')[1:]:
+        name, _, value = item.strip().partition('=')
+        if name.lower() == 'boundary':
+            return value.strip('"')
+    return None
+
+
+class StorageHandler(PostgrestHandler):
+    def route(self, method):
+        server = self.server
+        path = self.route_path
+        if path == '/_standin/stats' and method == 'GET':
+            return self.send_json(200, server.counters.snapshot())
+        if path.startswith(PUBLIC_PREFIX) and method in ('GET', 'HEAD'):
+            return self._download(path[len(PUBLIC_PREFIX):])
+        if path.startswith(OBJECT_PREFIX) and method in ('POST', 'PUT'):
+            return self._upload(path[len(OBJECT_PREFIX):], overwrite=method == 'PUT' or
+                                self.headers.get('x-upsert') == 'true')
+        return super().route(method)
+
+    def _object_path(self, key):
+        full = os.path.normpath(os.path.join(self.server.root, key))
+        if not full.startswith(self.server.root + os.sep):
+            raise ValueError(f"Invalid object key {key}")
+        return full
+
+    def _upload(self, key, overwrite):
+        server = self.server
+        start = time.perf_counter()
+        try:
+            target = self._object_path(key)
+        except ValueError as e:
+            return self.send_json(400, {'statusCode': '400', 'error': 'InvalidKey', 'message': str(e)})
+        if os.path.exists(target) and not overwrite:
+            return self.send_json(400, {'statusCode': '409', 'error': 'Duplicate',
+                                        'message': 'The resource already exists'})
+
+        received = 0
+        partial = os.devnull if server.discard else f"{target}.{uuid.uuid4().hex}.part"
+        if not server.discard:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(partial, 'wb') as f:
+            for chunk in self.iter_body(RECEIVE_CHUNK):
+                received += len(chunk)
+                f.write(chunk)
+                if server.bandwidth:
+                    # Hold each upload to the configured link speed
+                    sleep_ms((received / server.bandwidth - (time.perf_counter() - start)) * 1000)
+        content_type = self.headers.get('Content-Type') or ''
+        boundary = _boundary(content_type) if content_type.startswith('multipart/') else None
+        if boundary and not server.discard:
+            try:
+                extract_multipart_file(partial, boundary)
+            except ValueError as e:
+                os.remove(partial)
+                return self.send_json(400, {'statusCode': '400', 'error': 'InvalidBody', 'message': str(e)})
+        if not server.discard:
+            os.replace(partial, target)
+
+        sleep_ms(server.random.latency_ms(server.latency))
+        server.counters.incr('uploads')
+        server.counters.incr('bytes_received', received)
+        self.send_json(200, {'Key': key, 'Id': str(uuid.uuid4())})
+
+    def _download(self, key):
+        try:
+            target = self._object_path(key)
+        except ValueError:
+            target = None
+        if not target or not os.path.isfile(target):
+            return self.send_json(404, {'statusCode': '404', 'error': 'not_found', 'message': 'Object not found'})
+        self.server.counters.incr('downloads')
+        size = os.path.getsize(target)
+        self.send_response(200)
+        self.send_header('Content-Type', mimetypes.guess_type(target)[0] or 'application/octet-stream')
+        self.send_header('Content-Length', str(size))
+        self.end_headers()
+        if self.command != 'HEAD':
+            with open(target, 'rb') as f:
+                shutil.copyfileobj(f, self.wfile, RECEIVE_CHUNK)
+
+
+def start_storage_standin(host='127.0.0.1', port=0, root=None, bandwidth=None, latency='none', seed=None,
+                          db_path=':memory:', discard=False, max_rows=DEFAULT_MAX_ROWS):
+    """Start the stand-in on a background thread and return the server; bandwidth is bytes/s per upload"""
+    root = os.path.realpath(root or tempfile.mkdtemp(prefix='storage-standin-'))
+    return start_server(
+        StorageHandler, host, port,
+        root=root,
+        bandwidth=bandwidth,
+        latency=LatencyDistribution.parse(latency),
+        random=SeededRandom(seed),
+        discard=discard,
+        store=TableStore(db_path),
+        max_rows=max_rows,
+        counters=Counters()
+    )
+
+
+def _serve_in_child(port, options, ready):
+    start_storage_standin(port=port, **options)
+    ready.set()
+    threading.Event().wait()
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def write_photo(args):
+    """Process-pool task: one synthetic JPEG written to disk"""
+    directory, index, width, height, detail = args
+    path = os.path.join(directory, f"photo-{index:05d}.jpg")
+    with open(path, 'wb') as f:
+        f.write(make_jpeg(width, height, seed=index, detail=detail))
+    return path
+
+
+def make_photo_files(count, width, height, detail, directory, workers):
+    tasks = [(directory, i, width, height, detail) for i in range(count)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(write_photo, tasks))
+
+
+def upload_request(args, base_url, index, path):
+    """(url, MultipartBody) for one upload, through the app or straight to storage"""
+    if args.app_url:
+        fields = {'project_id': args.project_id, 'shot_date': date.today().isoformat()}
+        return f"{args.app_url.rstrip('/')}/api/upload-photo", MultipartBody(fields, 'file', path)
+    # The key uploadPhoto builds: photos/{projectId}/{Date.now()}-{random}.{ext}
+    key = f"photos/photos/{args.project_id}/{int(time.time() * 1000)}-{index}-{uuid.uuid4().hex[:6]}.jpg"
+    return f"{base_url}{OBJECT_PREFIX}{key}", MultipartBody({'cacheControl': '3600'}, '', path)
+
+
+def upload_one(args, base_url, index, path):
+    """Return (latency seconds, bytes sent, error or None)"""
+    url, body = upload_request(args, base_url, index, path)
+    start = time.perf_counter()
+    try:
+        response = http_client.post(url, data=body if args.content_length else body.chunked(),
+                                    headers={'Content-Type': body.content_type})
+        latency = time.perf_counter() - start
+        if response.status_code != 200:
+            return latency, len(body), f"HTTP {response.status_code}"
+        return latency, len(body), None
+    except Exception as e:
+        return time.perf_counter() - start, len(body), str(e)
+
+
+def run_level(args, base_url, paths, concurrency):
+    """Upload every photo at one concurrency level"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda item: upload_one(args, base_url, *item), enumerate(paths)))
+    elapsed = time.perf_counter() - start
+    latencies = sorted(latency for latency, _, error in results if error is None)
+    sent = sum(size for _, size, error in results if error is None)
+    errors = [error for _, _, error in results if error is not None]
+    return {
+        'concurrency': concurrency,
+        'uploads': len(results),
+        'completed': len(latencies),
+        'errors': len(errors),
+        'error_samples': sorted(set(errors))[:3],
+        'elapsed_s': elapsed,
+        'files_per_s': len(latencies) / elapsed if elapsed else 0.0,
+        'mb_per_s': sent / elapsed / 1e6 if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'max_ms': (latencies[-1] if latencies else 0.0) * 1000
+    }
+
+
+def saturation_point(results, gain=SATURATION_GAIN):
+    """First level whose successor adds less than `gain` throughput, or None if it kept scaling"""
+    for current, following in zip(results, results[1:]):
+        if following['mb_per_s'] < current['mb_per_s'] * (1 + gain):
+            return current
+    return None
+
+
+def run_bench(args):
+    print(f"📤 UPLOAD-PHOTO THROUGHPUT BENCHMARK")
+    work_dir = tempfile.TemporaryDirectory(prefix='upload-bench-')
+    child = None
+    if args.app_url:
+        base_url = args.app_url
+        print(f"📍 Target: {args.app_url}/api/upload-photo (the app must use a storage stand-in)")
+    else:
+        # The stand-in gets its own process so it does not share a GIL with the upload threads
+        port = _free_port()
+        ready = multiprocessing.Event()
+        options = {'root': os.path.join(work_dir.name, 'storage'), 'discard': args.discard,
+                   'bandwidth': args.bandwidth * 1e6 if args.bandwidth else None, 'latency': args.latency}
+        child = multiprocessing.Process(target=_serve_in_child, args=(port, options, ready), daemon=True)
+        child.start()
+        ready.wait(10)
+        base_url = f"http://127.0.0.1:{port}"
+        print(f"📍 Target: storage stand-in {base_url} (bandwidth "
+              f"{f'{args.bandwidth} MB/s' if args.bandwidth else 'unlimited'} per upload, latency {args.latency})")
+
+    start = time.perf_counter()
+    paths = make_photo_files(args.files, args.width, args.height, args.detail,
+                             work_dir.name, args.workers)
+    average = sum(os.path.getsize(p) for p in paths) / len(paths)
+    print(f"📷 {len(paths)} synthetic {args.width}x{args.height} JPEGs, {average / 1e6:.2f} MB average, "
+          f"generated in {time.perf_counter() - start:.1f}s with {args.workers} process(es)")
+
+    results = []
+    for concurrency in args.concurrency:
+        print(f"\n🔍 Concurrency {concurrency}")
+        result = run_level(args, base_url, paths, concurrency)
+        print(f"   {result['completed']}/{result['uploads']} ok, {result['mb_per_s']:.1f} MB/s, "
+              f"p95 {result['p95_ms']:.0f} ms")
+        results.append(result)
+
+    print(f"\n{'conc':>5} {'ok':>5} {'err':>4} {'files/s':>8} {'MB/s':>8} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'max ms':>9}")
+    for r in results:
+        print(f"{r['concurrency']:>5} {r['completed']:>5} {r['errors']:>4} {r['files_per_s']:>8.1f} "
+              f"{r['mb_per_s']:>8.1f} {r['p50_ms']:>9.0f} {r['p95_ms']:>9.0f} {r['p99_ms']:>9.0f} "
+              f"{r['max_ms']:>9.0f}")
+        for sample in r['error_samples']:
+            print(f"      ❌ {sample}")
+
+    saturated = saturation_point(results)
+    if saturated:
+        print(f"\n📈 Throughput saturates at concurrency {saturated['concurrency']} "
+              f"({saturated['mb_per_s']:.1f} MB/s)")
+    else:
+        print(f"\n📈 Throughput still rising at concurrency {results[-1]['concurrency']}; try higher levels")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'target': base_url, 'results': results,
+                       'saturation_concurrency': saturated and saturated['concurrency']}, f, indent=2)
+        print(f"💾 Results written to {args.json_path}")
+
+    if child:
+        child.terminate()
+    work_dir.cleanup()
+    return all(r['errors'] == 0 for r in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Supabase Storage stand-in and upload benchmark")
+    sub = parser.add_subparsers(dest='command')
+    for name in ('serve', 'bench'):
+        p = sub.add_parser(name)
+        p.add_argument('--bandwidth', type=float, help="Per-upload link speed in MB/s (default unlimited)")
+        p.add_argument('--latency', default='none', help="Added latency per upload, e.g. lognormal:80,0.5")
+        p.add_argument('--discard', action='store_true', help="Count uploaded bytes without keeping them")
+    serve = sub.choices['serve']
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve.add_argument('--root', help="Directory objects are written to (default a temp dir)")
+    serve.add_argument('--db', default=':memory:', help="SQLite file for the /rest/v1 tables")
+    bench = sub.choices['bench']
+    bench.add_argument('--files', type=int, default=64, help="Uploads per concurrency level")
+    bench.add_argument('--width', type=int, default=4032)
+    bench.add_argument('--height', type=int, default=3024)
+    bench.add_argument('--detail', type=int, default=12, help="AC coefficients per 8x8 block")
+    bench.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Processes generating photos")
+    bench.add_argument('--concurrency', type=parse_int_list, default=[1, 2, 4, 8, 16, 32])
+    bench.add_argument('--project-id', default='upload-bench')
+    bench.add_argument('--app-url', help="Upload through the Next.js /api/upload-photo route instead")
+    bench.add_argument('--content-length', action='store_true', help="Send Content-Length instead of chunked")
+    bench.add_argument('--json', dest='json_path', help="Write results to this JSON file")
+
+    argv = sys.argv[1:]
+    if not argv or argv[0] not in sub.choices and argv[0] not in ('-h', '--help'):
+        argv = ['serve'] + argv
+    args = parser.parse_args(argv)
+
+    if args.command == 'bench':
+        return run_bench(args)
+
+    server = start_storage_standin(args.host, args.port, args.root, args.bandwidth and args.bandwidth * 1e6,
+                                   args.latency, db_path=args.db, discard=args.discard)
+    print(f"📦 Storage stand-in listening on {server_url(server)}, objects in {server.root}")
+    print(f"   Set NEXT_PUBLIC_SUPABASE_URL={server_url(server)} and run the app with NODE_ENV=production")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
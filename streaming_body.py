@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Streaming request bodies for large photo payloads
+Photos are read from disk through mmap in fixed-size chunks while the body is being sent,
+either base64-encoded inside JSON (generate-report) or raw inside multipart/form-data
+(upload-photo), so a large body never exists in memory as a whole.
+
+Pass the body as `data=` to http_client: iterating it gives a chunked upload, and because
+the encoded length is known up front, len() lets requests send Content-Length instead.
+"""
+
+import base64
+import json
+import mmap
+import os
+import uuid
+
+# Raw bytes encoded per chunk; a multiple of 3 so chunks concatenate into valid base64
+ENCODE_CHUNK = 3 * 64 * 1024
+
+
+class FilePart:
+    """A file on disk that streams out as-is"""
+
+    def __init__(self, path, chunk_size=ENCODE_CHUNK):
+        self.path = path
+        self.size = os.path.getsize(path)
+        self.chunk_size = chunk_size
+
+    def encoded_length(self):
+        return self.size
+
+    def encode(self, chunk):
+        return bytes(chunk)
+
+    def __iter__(self):
+        if not self.size:
+            return
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, self.size, self.chunk_size):
+                    yield self.encode(view[offset:offset + self.chunk_size])
+            finally:
+                view.release()
+
+
+class Base64File(FilePart):
+    """A file on disk that streams out as base64 text"""
+
+    def __init__(self, path, chunk_size=ENCODE_CHUNK):
+        if chunk_size % 3:
+            raise ValueError("chunk_size must be a multiple of 3")
+        super().__init__(path, chunk_size)
+
+    def encoded_length(self):
+        return 4 * ((self.size + 2) // 3)
+
+    def encode(self, chunk):
+        return base64.b64encode(chunk)
+
+
+class StreamingBody:
+    """Re-iterable body made of literal byte parts and FileParts"""
+
+    content_type = 'application/octet-stream'
+
+    def __init__(self, parts):
+        self.parts = list(parts)
+
+    def __len__(self):
+        return sum(part.encoded_length() if isinstance(part, FilePart) else len(part) for part in self.parts)
+
+    def __iter__(self):
+        for part in self.parts:
+            if isinstance(part, FilePart):
+                yield from part
+            else:
+                yield part
+
+    def chunked(self):
+        """A plain generator, so the body goes out with Transfer-Encoding: chunked"""
+        return iter(self)
+
+
+class StreamingJsonBody(StreamingBody):
+    """JSON body whose photo strings are Base64File parts"""
+
+    content_type = 'application/json'
+
+    @classmethod
+    def report(cls, fields, photo_paths, chunk_size=ENCODE_CHUNK):
+        """{...fields, "photos": [{"base64": "<file>"}, ...]} as sent to /api/generate-report"""
+        prefix = json.dumps(fields)[:-1]
+        parts = [(prefix + (', ' if fields else '') + '"photos": [').encode()]
+        for i, path in enumerate(photo_paths):
+            parts.append(b'{"base64": "' if i == 0 else b', {"base64": "')
+            parts.append(Base64File(path, chunk_size))
+            parts.append(b'"}')
+        parts.append(b']}')
+        return cls(parts)
+
+
+class MultipartBody(StreamingBody):
+    """multipart/form-data body with text fields and one file streamed from disk"""
+
+    def __init__(self, fields, file_field, path, filename=None, file_type='image/jpeg', chunk_size=ENCODE_CHUNK):
+        self.boundary = f"----siterecap{uuid.uuid4().hex}"
+        head = b''.join(
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+            for name, value in fields.items()
+        )
+        head += (f'--{self.boundary}\r\nContent-Disposition: form-data; name="{file_field}"; '
+                 f'filename="{filename or os.path.basename(path)}"\r\nContent-Type: {file_type}\r\n\r\n').encode()
+        super().__init__([head, FilePart(path, chunk_size), f'\r\n--{self.boundary}--\r\n'.encode()])
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
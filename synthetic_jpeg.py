@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Synthetic JPEG generator for the SiteRecap load tools
+Writes valid baseline grayscale JPEGs of any resolution without an imaging library.
+Coefficients are generated directly in the frequency domain, so there is no DCT cost,
+and `detail` controls how many AC coefficients each block carries (and so file size)
+"""
+
+import random
+import struct
+
+# Standard luminance Huffman tables (JPEG Annex K.3)
+DC_BITS = [0, 1, 5, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0]
+DC_VALUES = list(range(12))
+AC_BITS = [0, 2, 1, 3, 3, 2, 4, 3, 5, 5, 4, 4, 0, 0, 1, 0x7d]
+AC_VALUES = [
+    0x01, 0x02, 0x03, 0x00, 0x04, 0x11, 0x05, 0x12,
+    0x21, 0x31, 0x41, 0x06, 0x13, 0x51, 0x61, 0x07,
+    0x22, 0x71, 0x14, 0x32, 0x81, 0x91, 0xa1, 0x08,
+    0x23, 0x42, 0xb1, 0xc1, 0x15, 0x52, 0xd1, 0xf0,
+    0x24, 0x33, 0x62, 0x72, 0x82, 0x09, 0x0a, 0x16,
+    0x17, 0x18, 0x19, 0x1a, 0x25, 0x26, 0x27, 0x28,
+    0x29, 0x2a, 0x34, 0x35, 0x36, 0x37, 0x38, 0x39,
+    0x3a, 0x43, 0x44, 0x45, 0x46, 0x47, 0x48, 0x49,
+    0x4a, 0x53, 0x54, 0x55, 0x56, 0x57, 0x58, 0x59,
+    0x5a, 0x63, 0x64, 0x65, 0x66, 0x67, 0x68, 0x69,
+    0x6a, 0x73, 0x74, 0x75, 0x76, 0x77, 0x78, 0x79,
+    0x7a, 0x83, 0x84, 0x85, 0x86, 0x87, 0x88, 0x89,
+    0x8a, 0x92, 0x93, 0x94, 0x95, 0x96, 0x97, 0x98,
+    0x99, 0x9a, 0xa2, 0xa3, 0xa4, 0xa5, 0xa6, 0xa7,
+    0xa8, 0xa9, 0xaa, 0xb2, 0xb3, 0xb4, 0xb5, 0xb6,
+    0xb7, 0xb8, 0xb9, 0xba, 0xc2, 0xc3, 0xc4, 0xc5,
+    0xc6, 0xc7, 0xc8, 0xc9, 0xca, 0xd2, 0xd3, 0xd4,
+    0xd5, 0xd6, 0xd7, 0xd8, 0xd9, 0xda, 0xe1, 0xe2,
+    0xe3, 0xe4, 0xe5, 0xe6, 0xe7, 0xe8, 0xe9, 0xea,
+    0xf1, 0xf2, 0xf3, 0xf4, 0xf5, 0xf6, 0xf7, 0xf8,
+    0xf9, 0xfa
+]
+
+
+def _huffman_codes(bits, values):
+    """Canonical Huffman codes: symbol -> (code, length)"""
+    codes = {}
+    code = 0
+    index = 0
+    for length, count in enumerate(bits, 1):
+        for _ in range(count):
+            codes[values[index]] = (code, length)
+            code += 1
+            index += 1
+        code <<= 1
+    return codes
+
+
+DC_CODES = _huffman_codes(DC_BITS, DC_VALUES)
+AC_CODES = _huffman_codes(AC_BITS, AC_VALUES)
+
+
+class _BitWriter:
+    def __init__(self):
+        self.out = bytearray()
+        self.acc = 0
+        self.nbits = 0
+
+    def write(self, value, length):
+        self.acc = (self.acc << length) | (value & ((1 << length) - 1))
+        self.nbits += length
+        while self.nbits >= 8:
+            self.nbits -= 8
+            byte = (self.acc >> self.nbits) & 0xFF
+            self.out.append(byte)
+            if byte == 0xFF:
+                self.out.append(0x00)  # byte stuffing
+        self.acc &= (1 << self.nbits) - 1
+
+    def finish(self):
+        if self.nbits:
+            self.write((1 << (8 - self.nbits)) - 1, 8 - self.nbits)
+        return bytes(self.out)
+
+
+def _magnitude(value):
+    """JPEG size category and the bits that encode value within it"""
+    size = abs(value).bit_length()
+    return size, (value if value >= 0 else value + (1 << size) - 1)
+
+
+def _segment(marker, payload):
+    return struct.pack('>HH', marker, len(payload) + 2) + payload
+
+
+def _headers(width, height):
+    jfif = _segment(0xFFE0, b'JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00')
+    # Unit quantisation: the generated coefficients are the quantised values
+    dqt = _segment(0xFFDB, b'\x00' + bytes([1] * 64))
+    sof = _segment(0xFFC0, struct.pack('>BHHB', 8, height, width, 1) + b'\x01\x11\x00')
+    dht_dc = _segment(0xFFC4, b'\x00' + bytes(DC_BITS) + bytes(DC_VALUES))
+    dht_ac = _segment(0xFFC4, b'\x10' + bytes(AC_BITS) + bytes(AC_VALUES))
+    sos = _segment(0xFFDA, b'\x01\x01\x00\x00\x3f\x00')
+    return b'\xff\xd8' + jfif + dqt + sof + dht_dc + dht_ac + sos
+
+
+def make_jpeg(width=640, height=480, seed=0, detail=12):
+    """Return the bytes of a width x height grayscale JPEG, deterministic per seed"""
+    rng = random.Random(seed)
+    blocks_x = (width + 7) // 8
+    blocks_y = (height + 7) // 8
+    detail = max(0, min(63, detail))
+    phase_x = rng.uniform(0, 6.28)
+    phase_y = rng.uniform(0, 6.28)
+    writer = _BitWriter()
+    previous_dc = 0
+
+    for by in range(blocks_y):
+        for bx in range(blocks_x):
+            # Smooth gradient in the DC terms, within the 8-bit range (-1024..1016)
+            shade = ((bx * 37 + by * 23 + int(phase_x * 40)) % 200) - 100
+            dc = max(-1000, min(1000, shade * 8 + int(phase_y * 10)))
+            size, bits = _magnitude(dc - previous_dc)
+            code, length = DC_CODES[size]
+            writer.write(code, length)
+            if size:
+                writer.write(bits, size)
+            previous_dc = dc
+
+            # Sparse random AC terms in zigzag order, favouring low frequencies
+            positions = sorted(rng.sample(range(1, 64), detail)) if detail else []
+            last = 0
+            for position in positions:
+                value = rng.randint(-40, 40) or 1
+                run = position - last - 1
+                while run > 15:
+                    code, length = AC_CODES[0xF0]  # ZRL: sixteen zeros
+                    writer.write(code, length)
+                    run -= 16
+                size, bits = _magnitude(value)
+                code, length = AC_CODES[(run << 4) | size]
+                writer.write(code, length)
+                writer.write(bits, size)
+                last = position
+            if last != 63:
+                code, length = AC_CODES[0x00]  # EOB
+                writer.write(code, length)
+
+    return _headers(width, height) + writer.finish() + b'\xff\xd9'
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Side-by-side local vs production latency comparison for SiteRecap
+Runs the same endpoint workloads against both deployments in interleaved rounds (target
+and endpoint order reshuffled every round, so drift on either side hits both equally)
+and reports per-endpoint latency distributions with a Mann-Whitney U test, Cliff's delta
+effect size and the Hodges-Lehmann estimate of the shift between them
+"""
+
+import argparse
+import json
+import math
+import random
+import statistics
+import time
+
+import env_config
+from http_client import HttpClient
+from report_load_test import percentile
+
+LOCAL_BASE_URL = "http://localhost:3000"
+
+# Placeholder organization for the read-only project count; no project belongs to it
+PLACEHOLDER_ORG_ID = '00000000-0000-0000-0000-000000000001'
+
+# (method, path, request kwargs, expected status codes). Only calls without side effects: the
+# POSTs carry an empty body and stop at validation, so production never sends an email. A call
+# answering any other status is counted as an error rather than timed.
+WORKLOADS = (
+    ('GET', f'/api/project-count?org_id={PLACEHOLDER_ORG_ID}&status=active', {}, (200,)),
+    ('GET', '/api/debug-urls', {}, (200,)),
+    ('GET', '/auth/callback?code=invalid123', {'allow_redirects': False}, (302, 307)),
+    ('POST', '/api/send-confirmation', {'json': {}}, (400,)),
+    ('POST', '/api/resend-confirmation', {'json': {}}, (400,)),
+)
+
+# Romano et al. thresholds for |Cliff's delta|
+EFFECT_SIZES = ((0.147, 'negligible'), (0.33, 'small'), (0.474, 'medium'), (1.0, 'large'))
+
+
+def rank(values):
+    """1-based ranks with ties given their average rank, plus the tie groups' sizes"""
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    ties = []
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2 + 1
+        if j > i:
+            ties.append(j - i + 1)
+        i = j + 1
+    return ranks, ties
+
+
+def mann_whitney_u(a, b):
+    """Two-sided Mann-Whitney U test of a vs b: (U of a, z, p), normal approximation
+    with tie and continuity correction, good from roughly 20 samples per side"""
+    n1, n2 = len(a), len(b)
+    if not n1 or not n2:
+        return 0.0, 0.0, 1.0
+    ranks, ties = rank(list(a) + list(b))
+    u = sum(ranks[:n1]) - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    mean = n1 * n2 / 2
+    variance = n1 * n2 / 12 * ((n + 1) - sum(t ** 3 - t for t in ties) / (n * (n - 1)))
+    if variance <= 0:
+        return u, 0.0, 1.0
+    z = (abs(u - mean) - 0.5) / math.sqrt(variance)
+    z = max(z, 0.0) * (1 if u >= mean else -1)
+    return u, z, math.erfc(abs(z) / math.sqrt(2))
+
+
+def cliffs_delta(u, n1, n2):
+    """P(a > b) - P(a < b), derived from the U statistic of a"""
+    return 2 * u / (n1 * n2) - 1 if n1 and n2 else 0.0
+
+
+def effect_size_label(delta):
+    magnitude = abs(delta)
+    for limit, label in EFFECT_SIZES:
+        if magnitude < limit:
+            return label
+    return EFFECT_SIZES[-1][1]
+
+
+def hodges_lehmann(a, b):
+    """Median of all pairwise differences a - b: the typical shift between the two samples"""
+    if not a or not b:
+        return 0.0
+    return statistics.median(x - y for x in a for y in b)
+
+
+def compare_samples(a, b, alpha=0.05):
+    """Test sample a against sample b; positive delta/shift means a is slower"""
+    u, z, p = mann_whitney_u(a, b)
+    delta = cliffs_delta(u, len(a), len(b))
+    return {
+        'u': u,
+        'z': z,
+        'p_value': p,
+        'cliffs_delta': delta,
+        'effect_size': effect_size_label(delta),
+        'shift': hodges_lehmann(a, b),
+        'significant': p < alpha
+    }
+
+
+def time_call(client, method, url, kwargs, expected, timeout):
+    """(seconds, error) where error is None, an unexpected 'HTTP <status>' or the exception's name"""
+    start = time.perf_counter()
+    try:
+        response = client.request(method, url, timeout=timeout, **kwargs)
+        error = None if response.status_code in expected else f"HTTP {response.status_code}"
+    except Exception as e:
+        error = type(e).__name__
+    return time.perf_counter() - start, error
+
+
+def run_comparison(targets, workloads=WORKLOADS, rounds=30, warmup=3, timeout=30, seed=None):
+    """Interleaved rounds against every target; returns {endpoint: {target: [seconds]}} and
+    {endpoint: {target: {error: count}}}"""
+    rng = random.Random(seed)
+    client = HttpClient(timeout=timeout, recorder=None)
+    names = list(targets)
+    samples = {f"{method} {path}": {name: [] for name in names} for method, path, _, _ in workloads}
+    errors = {endpoint: {name: {} for name in names} for endpoint in samples}
+
+    for round_index in range(warmup + rounds):
+        order = list(workloads)
+        rng.shuffle(order)
+        for method, path, kwargs, expected in order:
+            endpoint = f"{method} {path}"
+            round_targets = list(names)
+            rng.shuffle(round_targets)
+            for name in round_targets:
+                seconds, error = time_call(client, method, targets[name] + path, kwargs, expected, timeout)
+                if round_index < warmup:
+                    continue
+                if error:
+                    errors[endpoint][name][error] = errors[endpoint][name].get(error, 0) + 1
+                else:
+                    samples[endpoint][name].append(seconds)
+        if round_index >= warmup:
+            print(f"\r   round {round_index - warmup + 1}/{rounds}", end='', flush=True)
+    print()
+    return samples, errors
+
+
+def summarise(samples, errors, subject, reference, alpha=0.05):
+    results = []
+    for endpoint, by_target in samples.items():
+        row = {'endpoint': endpoint}
+        for name in (subject, reference):
+            values = sorted(by_target[name])
+            row[name] = {
+                'count': len(values),
+                'errors': sum(errors[endpoint][name].values()),
+                'error_kinds': errors[endpoint][name],
+                'p50_ms': percentile(values, 50) * 1000,
+                'p90_ms': percentile(values, 90) * 1000,
+                'p99_ms': percentile(values, 99) * 1000
+            }
+        test = compare_samples(by_target[subject], by_target[reference], alpha)
+        test['shift_ms'] = test.pop('shift') * 1000
+        row['test'] = test
+        results.append(row)
+    return results
+
+
+def print_results(results, subject, reference, alpha):
+    print(f"\n📊 {subject} vs {reference} (ms; shift > 0 means {subject} is slower)")
+    print(f"   {'endpoint':<36} {reference + ' p50':>15} {subject + ' p50':>15} {'shift':>8} "
+          f"{'p-value':>9} {'delta':>6}  effect")
+    for row in results:
+        test = row['test']
+        marker = '❗' if test['significant'] else '  '
+        print(f"{marker} {row['endpoint']:<36.36} {row[reference]['p50_ms']:>15.1f} {row[subject]['p50_ms']:>15.1f} "
+              f"{test['shift_ms']:>8.1f} {test['p_value']:>9.4f} {test['cliffs_delta']:>6.2f}  {test['effect_size']}")
+        failed = {name: row[name]['error_kinds'] for name in (reference, subject) if row[name]['errors']}
+        if failed:
+            print(f"     ⚠️  failed or unexpected-status calls excluded: {failed}")
+    significant = [row for row in results if row['test']['significant']]
+    print(f"\n{len(significant)}/{len(results)} endpoints differ at α={alpha}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--local', default=LOCAL_BASE_URL, help="Local base URL")
+    parser.add_argument('--production', help="Production base URL (default: NEXT_PUBLIC_BASE_URL from .env)")
+    parser.add_argument('--rounds', type=int, default=30, help="Measured rounds per endpoint and target")
+    parser.add_argument('--warmup', type=int, default=3, help="Unmeasured rounds run first")
+    parser.add_argument('--alpha', type=float, default=0.05, help="Significance level")
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--seed', type=int, help="Seed for the interleaving order")
+    parser.add_argument('--json', help="Write samples and results to this JSON file")
+    args = parser.parse_args(argv)
+
+    targets = {'local': args.local.rstrip('/'),
+               'production': (args.production or env_config.get_base_url()).rstrip('/')}
+    print(f"🏠 Local URL: {targets['local']}")
+    print(f"🌐 Production URL: {targets['production']}")
+    print(f"🔁 {args.rounds} interleaved rounds (+{args.warmup} warmup) over {len(WORKLOADS)} endpoints")
+
+    samples, errors = run_comparison(targets, rounds=args.rounds, warmup=args.warmup,
+                                     timeout=args.timeout, seed=args.seed)
+    results = summarise(samples, errors, 'production', 'local', args.alpha)
+    print_results(results, 'production', 'local', args.alpha)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'targets': targets, 'rounds': args.rounds, 'alpha': args.alpha,
+                       'results': results, 'samples': samples}, f, indent=2)
+        print(f"💾 Results written to {args.json}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""DDSketch and LatencyHistogram percentiles against exact NumPy percentiles on recorded latencies"""
+
+import json
+import os
+
+import pytest
+
+from latency_histogram import DDSketch, LatencyHistogram, LatencyRecorder, histogram_from_dict
+
+PERCENTILES = (1, 10, 25, 50, 75, 90, 95, 99, 99.9, 100)
+
+RECORDED_PATH = os.path.join(os.path.dirname(__file__), 'data', 'recorded_latencies.json')
+
+
+@pytest.fixture(scope='module')
+def recorded():
+    """{endpoint: [microseconds]} from tests/data/recorded_latencies.json"""
+    with open(RECORDED_PATH) as f:
+        return json.load(f)['endpoints']
+
+
+def assert_within(histogram, values, relative_error, percentiles=PERCENTILES):
+    """Every percentile within relative_error of NumPy's nearest-rank (inverted CDF) percentile"""
+    numpy = pytest.importorskip('numpy')
+    exact = numpy.percentile(numpy.array(values), percentiles, method='inverted_cdf')
+    for q, truth in zip(percentiles, exact):
+        estimate = histogram.percentile(q)
+        # One microsecond of slack for the seconds -> microseconds round trip of record_seconds
+        assert abs(estimate - truth) <= relative_error * truth + 1, (q, estimate, truth)
+
+
+def sketch_of(values, relative_accuracy=0.01, **options):
+    sketch = DDSketch(relative_accuracy, **options)
+    for value in values:
+        sketch.record(value)
+    return sketch
+
+
+@pytest.mark.parametrize('relative_accuracy', [0.005, 0.01, 0.05])
+def test_sketch_percentiles_within_relative_accuracy(recorded, relative_accuracy):
+    for values in recorded.values():
+        assert_within(sketch_of(values, relative_accuracy), values, relative_accuracy)
+
+
+def test_hdr_percentiles_within_three_significant_figures(recorded):
+    for values in recorded.values():
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(value)
+        assert_within(histogram, values, 1 / 1024)
+
+
+def test_recorder_keeps_a_sketch_per_endpoint(recorded):
+    recorder = LatencyRecorder()
+    for endpoint, values in recorded.items():
+        method, path = endpoint.split(' ', 1)
+        for value in values:
+            recorder.record(method, path, value / 1e6)
+    for endpoint, values in recorded.items():
+        histogram = recorder.histograms[tuple(endpoint.split(' ', 1))]
+        assert isinstance(histogram, DDSketch)
+        assert histogram.total == len(values)
+        assert_within(histogram, values, histogram.relative_accuracy)
+
+
+def test_merge_across_workers_equals_single_stream(recorded):
+    for values in recorded.values():
+        whole = sketch_of(values)
+        merged = sketch_of(values[0::4])
+        for worker in range(1, 4):
+            merged.merge(sketch_of(values[worker::4]))
+        assert (merged.offset, list(merged.bins), merged.total) == (whole.offset, list(whole.bins), whole.total)
+        assert (merged.min, merged.max, merged.sum) == (whole.min, whole.max, whole.sum)
+
+
+def test_merge_across_endpoints(recorded):
+    merged = DDSketch()
+    for values in recorded.values():
+        merged.merge(sketch_of(values))
+    everything = [value for values in recorded.values() for value in values]
+    assert merged.total == len(everything)
+    assert_within(merged, everything, 0.01)
+
+
+def test_merge_rejects_different_accuracy():
+    with pytest.raises(ValueError):
+        DDSketch(0.01).merge(DDSketch(0.02))
+
+
+def test_round_trip_through_json(recorded):
+    merged = DDSketch()
+    for values in recorded.values():
+        merged.merge(sketch_of(values))
+    restored = histogram_from_dict(json.loads(json.dumps(merged.to_dict())))
+    assert isinstance(restored, DDSketch)
+    assert restored.total == merged.total
+    assert [restored.percentile(q) for q in PERCENTILES] == [merged.percentile(q) for q in PERCENTILES]
+    assert_within(restored, [value for values in recorded.values() for value in values], 0.01)
+
+
+def test_recorder_converts_merged_hdr_histograms(recorded):
+    # Timings exported before the recorder kept sketches still seed it
+    recorder = LatencyRecorder()
+    for endpoint, values in recorded.items():
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(value)
+        recorder.merge_histogram(*endpoint.split(' ', 1), histogram_from_dict(histogram.to_dict()))
+    for endpoint, values in recorded.items():
+        sketch = recorder.histograms[tuple(endpoint.split(' ', 1))]
+        assert isinstance(sketch, DDSketch)
+        assert (sketch.total, sketch.min, sketch.max) == (len(values), min(values), max(values))
+        assert_within(sketch, values, 0.01 + 1 / 1024)
+
+
+def test_zero_values(recorded):
+    values = [0] * 100 + recorded['GET /v1/forecast'][:900]
+    sketch = sketch_of(values)
+    assert sketch.percentile(5) == 0
+    assert_within(sketch, values, 0.01)
+
+
+def test_collapsed_sketch_keeps_tail_accuracy(recorded):
+    # 64 bins at 1% span about 3.6x of the 12x range; only the bins below that collapse
+    values = recorded['POST /v1beta/models/gemini-1.5-flash:generateContent']
+    sketch = sketch_of(values, max_bins=64)
+    assert len(sketch.bins) == 64
+    assert_within(sketch, values, 0.01, percentiles=(75, 90, 99, 99.9, 100))
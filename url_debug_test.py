@@ -4,35 +4,15 @@ URL Configuration Debug Test for SiteRecap
 Tests URL configuration and debug the Vercel redirect issue
 """
 
-import requests
+import argparse
 import json
 import os
 import sys
 from urllib.parse import urlparse, parse_qs
 
-# Get base URL from environment
-def get_base_url():
-    try:
-        with open('/app/.env', 'r') as f:
-            for line in f:
-                if line.startswith('NEXT_PUBLIC_BASE_URL='):
-                    return line.split('=', 1)[1].strip()
-    except:
-        pass
-    return 'https://siterecap.com'
-
-def get_all_env_vars():
-    """Get all environment variables from .env file"""
-    env_vars = {}
-    try:
-        with open('/app/.env', 'r') as f:
-            for line in f:
-                if '=' in line and not line.startswith('#'):
-                    key, value = line.strip().split('=', 1)
-                    env_vars[key] = value
-    except:
-        pass
-    return env_vars
+import http_client
+from env_config import get_all_env_vars, get_base_url
+from url_scanner import APP_ROOT, DEFAULT_PATTERNS, scan_tree
 
 BASE_URL = get_base_url()
 API_BASE = f"{BASE_URL}/api"
@@ -47,7 +27,7 @@ def test_debug_urls_endpoint():
     print("\n🔍 Testing GET /api/debug-urls endpoint...")
     
     try:
-        response = requests.get(f"{API_BASE}/debug-urls", timeout=10)
+        response = http_client.get(f"{API_BASE}/debug-urls")
         
         print(f"   Status: {response.status_code}")
         
@@ -143,9 +123,8 @@ def test_auth_callback_redirect_logic():
             print(f"   URL: {test_case['url']}")
             
             try:
-                response = requests.get(test_case['url'], 
-                                      allow_redirects=False,
-                                      timeout=10)
+                response = http_client.get(test_case['url'], 
+                                         allow_redirects=False)
                 
                 print(f"   Status: {response.status_code}")
                 
@@ -249,38 +228,11 @@ def test_hardcoded_vercel_urls():
     print("\n🔍 Testing for Hardcoded Vercel URLs...")
     
     try:
-        files_to_check = [
-            '/app/app/auth/callback/route.js',
-            '/app/app/api/send-confirmation/route.js',
-            '/app/app/api/resend-confirmation/route.js',
-            '/app/app/login/page.js'
-        ]
-        
-        vercel_patterns = [
-            'vercel.app',
-            'preview.emergentagent.com',
-            'dailysitereport.preview'
-        ]
-        
-        vercel_urls_found = []
-        
-        for file_path in files_to_check:
-            try:
-                with open(file_path, 'r') as f:
-                    content = f.read()
-                
-                for pattern in vercel_patterns:
-                    if pattern in content:
-                        # Find the specific line
-                        lines = content.split('\n')
-                        for i, line in enumerate(lines, 1):
-                            if pattern in line:
-                                vercel_urls_found.append(f"{file_path}:{i} - {line.strip()}")
-                                
-            except FileNotFoundError:
-                print(f"   ⚠️  File not found: {file_path}")
-            except Exception as e:
-                print(f"   ❌ Error reading {file_path}: {str(e)}")
+        # Scan the whole app tree, not just the auth and email routes
+        vercel_urls_found, stats = scan_tree(APP_ROOT, DEFAULT_PATTERNS)
+        print(f"   📁 Checked {stats['files']} files ({stats['cached']} unchanged since last run)")
+        for error in stats['errors']:
+            print(f"   ❌ Error reading {error}")
         
         if vercel_urls_found:
             print("   🚨 HARDCODED VERCEL URLs FOUND:")
@@ -335,7 +287,7 @@ def test_auth_callback_redirect_to_siterecap():
         print("\n   🧪 Testing actual redirect behavior...")
         
         test_url = f"{BASE_URL}/auth/callback?email=test@siterecap.com"
-        response = requests.get(test_url, allow_redirects=False, timeout=10)
+        response = http_client.get(test_url, allow_redirects=False)
         
         if response.status_code in [301, 302, 307, 308]:
             redirect_url = response.headers.get('Location', '')
@@ -437,6 +389,7 @@ def main():
             passed += 1
     
     print(f"\nOverall: {passed}/{total} tests passed")
+    http_client.print_timings()
     
     # Critical findings
     print("\n" + "=" * 80)
@@ -498,5 +451,22 @@ def main():
         return False
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--latency-json', help="Write per-endpoint latency histograms to this JSON file")
+    parser.add_argument('--phases', action='store_true',
+                        help="Time DNS/connect/TLS/TTFB/transfer per call (fresh connection for every request)")
+    parser.add_argument('--adaptive-timeouts', action='store_true',
+                        help="Lower each endpoint's read timeout to 3x its learned p99")
+    parser.add_argument('--hedge', action='store_true',
+                        help="With adaptive timeouts, re-send GETs still pending at their endpoint's p95")
+    parser.add_argument('--learn-from', help="Latency JSON from an earlier --latency-json run to learn from")
+    args = parser.parse_args()
+    if args.phases:
+        http_client.get_client().enable_phase_timing()
+    if args.adaptive_timeouts or args.hedge:
+        http_client.get_client().enable_adaptive_timeouts(hedge=args.hedge, seed_path=args.learn_from)
     success = main()
+    if args.latency_json:
+        http_client.export_timings(args.latency_json)
+        print(f"💾 Latency histograms written to {args.latency_json}")
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Hardcoded URL scanner for the SiteRecap source tree
+Walks the whole app tree, scans files across a process pool through mmap, and keeps an
+on-disk cache keyed by path, mtime and content hash so unchanged files are skipped
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+APP_ROOT = '/app'
+
+DEFAULT_PATTERNS = [
+    'vercel.app',
+    'preview.emergentagent.com',
+    'dailysitereport.preview'
+]
+
+SOURCE_EXTENSIONS = ('.js', '.jsx', '.ts', '.tsx', '.mjs', '.cjs', '.json')
+SKIP_DIRS = {'node_modules', '.next', '.git', '.cache', '__pycache__'}
+
+CACHE_PATH = os.path.join(APP_ROOT, '.cache', 'url_scan.json')
+CACHE_VERSION = 1
+
+
+def iter_source_files(root, extensions=SOURCE_EXTENSIONS, skip_dirs=SKIP_DIRS):
+    """Yield every source file under root, skipping build output and dependencies"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in skip_dirs and not d.startswith('.'))
+        for filename in sorted(filenames):
+            if filename.endswith(extensions):
+                yield os.path.join(dirpath, filename)
+
+
+def _compile(patterns):
+    return re.compile(b'|'.join(re.escape(p.encode()) for p in patterns))
+
+
+def scan_file(path, patterns, known_hash=None):
+    """Scan one file; returns (hash, findings) or (hash, None) if the content is unchanged"""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return hashlib.blake2b(b'').hexdigest(), []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            digest = hashlib.blake2b(mm).hexdigest()
+            if digest == known_hash:
+                return digest, None
+
+            findings = []
+            regex = _compile(patterns)
+            line_number = 1
+            counted_to = 0
+            position = 0
+            while True:
+                match = regex.search(mm, position)
+                if not match:
+                    break
+                start = match.start()
+                line_start = mm.rfind(b'\n', 0, start) + 1
+                line_end = mm.find(b'\n', start)
+                if line_end == -1:
+                    line_end = size
+                # Count newlines only over the span since the previous hit
+                line_number += mm[counted_to:line_start].count(b'\n')
+                counted_to = line_start
+                text = mm[line_start:line_end].decode('utf-8', 'replace').strip()
+                findings.append([line_number, text])
+                # One finding per line, however many patterns it contains
+                position = line_end + 1
+            return digest, findings
+
+
+def _scan_job(job):
+    path, patterns, known_hash = job
+    try:
+        return path, scan_file(path, patterns, known_hash), None
+    except OSError as e:
+        return path, None, str(e)
+
+
+def load_cache(cache_path, patterns):
+    try:
+        with open(cache_path, 'r') as f:
+            cache = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    if cache.get('version') != CACHE_VERSION or cache.get('patterns') != list(patterns):
+        return {}
+    return cache.get('files', {})
+
+
+def save_cache(cache_path, patterns, files):
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'version': CACHE_VERSION, 'patterns': list(patterns), 'files': files}, f)
+    os.replace(tmp_path, cache_path)
+
+
+def scan_tree(root=APP_ROOT, patterns=DEFAULT_PATTERNS, cache_path=CACHE_PATH, workers=None):
+    """Scan the tree and return (findings, stats); findings are 'file:line - text' strings"""
+    patterns = list(patterns)
+    cached = load_cache(cache_path, patterns) if cache_path else {}
+    files = {}
+    jobs = []
+    stats = {'files': 0, 'cached': 0, 'scanned': 0, 'errors': []}
+
+    for path in iter_source_files(root):
+        stats['files'] += 1
+        try:
+            st = os.stat(path)
+        except OSError as e:
+            stats['errors'].append(f"{path}: {str(e)}")
+            continue
+        entry = cached.get(path)
+        if entry and entry['mtime_ns'] == st.st_mtime_ns and entry['size'] == st.st_size:
+            files[path] = entry
+            stats['cached'] += 1
+            continue
+        files[path] = {'mtime_ns': st.st_mtime_ns, 'size': st.st_size}
+        jobs.append((path, patterns, entry['hash'] if entry else None))
+
+    if jobs:
+        if workers == 1 or len(jobs) == 1:
+            results = list(map(_scan_job, jobs))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_scan_job, jobs, chunksize=max(1, len(jobs) // 64)))
+        for path, result, error in results:
+            if error:
+                stats['errors'].append(f"{path}: {error}")
+                files.pop(path, None)
+                continue
+            digest, findings = result
+            if findings is None:
+                # Touched but unchanged; reuse the previous findings
+                findings = cached[path]['findings']
+                stats['cached'] += 1
+            else:
+                stats['scanned'] += 1
+            files[path].update({'hash': digest, 'findings': findings})
+
+    if cache_path:
+        save_cache(cache_path, patterns, files)
+
+    findings = [
+        f"{path}:{line_number} - {text}"
+        for path in sorted(files)
+        for line_number, text in files[path]['findings']
+    ]
+    return findings, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan the app tree for hardcoded preview/Vercel URLs")
+    parser.add_argument('root', nargs='?', default=APP_ROOT)
+    parser.add_argument('--pattern', action='append', default=[],
+                        help="Extra pattern to flag (repeatable)")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--cache', default=CACHE_PATH, help="Cache file ('' disables caching)")
+    args = parser.parse_args()
+
+    findings, stats = scan_tree(args.root, DEFAULT_PATTERNS + args.pattern, args.cache or None, args.workers)
+    print(f"📁 {stats['files']} files: {stats['scanned']} scanned, {stats['cached']} unchanged")
+    for error in stats['errors']:
+        print(f"❌ Error reading {error}")
+    for finding in findings:
+        print(f"   {finding}")
+    return not findings
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
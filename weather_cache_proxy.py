@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Grid-bucketed caching proxy for Open-Meteo weather and geocoding
+Serves /v1/forecast and /v1/search for lib/weather.js. Forecasts are cached per lat/lon
+grid cell (the upstream is asked for the cell centre, so every project in a cell shares
+one answer) with a short TTL; geocodes are cached per normalized place string with a long
+TTL, and the first spelling seen is the one sent upstream. Concurrent misses for the same
+key wait for a single upstream call.
+
+Point the app at it with OPEN_METEO_BASE_URL=http://127.0.0.1:8157
+
+    python weather_cache_proxy.py serve --grid 0.1 --weather-ttl 900
+    python weather_cache_proxy.py bench --projects 300 --concurrency 8
+"""
+
+import argparse
+import math
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from gemini_cache_proxy import DiskTier, MemoryTier, ResponseCache
+from http_client import HttpClient
+from openmeteo_standin import normalize_place, start_openmeteo_standin
+from report_load_test import percentile
+from standin_server import JsonRequestHandler, server_url, start_server
+
+DEFAULT_PORT = 8157
+FORECAST_UPSTREAM = 'https://api.open-meteo.com'
+GEOCODING_UPSTREAM = 'https://geocoding-api.open-meteo.com'
+
+# 0.1° is about 11 km north-south: finer than Open-Meteo's model grid for current conditions
+DEFAULT_GRID = 0.1
+DEFAULT_WEATHER_TTL = 15 * 60
+DEFAULT_GEOCODE_TTL = 30 * 24 * 3600
+
+UPSTREAM_TIMEOUT = (5, 30)
+
+
+def grid_cell(lat, lon, grid=DEFAULT_GRID):
+    """Centre of the grid cell containing (lat, lon)"""
+    return (round((math.floor(lat / grid) + 0.5) * grid, 6),
+            round((math.floor(lon / grid) + 0.5) * grid, 6))
+
+
+def _other_params(query, skip):
+    return '&'.join(f"{k}={v}" for k, v in sorted(query.items()) if k not in skip)
+
+
+class SingleFlight:
+    """Lets one caller fetch a key while concurrent callers for it wait for that result"""
+
+    def __init__(self):
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def do(self, key, fetch):
+        """Return (result, shared) where shared is True if another caller did the fetch"""
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = {'done': threading.Event(), 'result': None}
+        if not leader:
+            call['done'].wait()
+            return call['result'], True
+        try:
+            call['result'] = fetch()
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call['done'].set()
+        return call['result'], False
+
+
+class WeatherCacheHandler(JsonRequestHandler):
+    def route(self, method):
+        server = self.server
+        if self.route_path == '/_cache/stats' and method == 'GET':
+            return self.send_json(200, {'weather': server.weather.stats(), 'geocode': server.geocode.stats()})
+        if self.route_path == '/_cache/clear' and method == 'POST':
+            server.weather.clear()
+            server.geocode.clear()
+            return self.send_json(200, {'cleared': True})
+        if method != 'GET' or self.route_path not in ('/v1/forecast', '/v1/search'):
+            return self.send_json(404, {'error': True, 'reason': f"Unknown path {self.route_path}"})
+
+        query = dict(self.query)
+        if self.route_path == '/v1/forecast':
+            try:
+                lat, lon = grid_cell(float(query['latitude']), float(query['longitude']), server.grid)
+            except (KeyError, ValueError):
+                return self.send_json(400, {'error': True, 'reason': 'Parameter latitude and longitude required'})
+            query.update(latitude=lat, longitude=lon)
+            key = f"forecast:{lat},{lon}:{_other_params(query, ('latitude', 'longitude'))}"
+            cache, upstream = server.weather, server.forecast_upstream
+        else:
+            key = f"search:{normalize_place(query.get('name', ''))}:{_other_params(query, ('name',))}"
+            cache, upstream = server.geocode, server.geocoding_upstream
+
+        cached = cache.get(key)
+        if cached is not None:
+            return self.send_body(200, cached, headers={'X-Cache': 'HIT'})
+
+        def fetch():
+            start = time.perf_counter()
+            cache.counters.incr('upstream_calls')
+            response = server.client.get(f"{upstream}{self.route_path}?{urlencode(query)}", timeout=UPSTREAM_TIMEOUT)
+            if response.status_code == 200:
+                cache.put(key, response.content, (time.perf_counter() - start) * 1000)
+            else:
+                cache.counters.incr('upstream_errors')
+            return response.status_code, response.content
+
+        try:
+            (status, body), shared = server.flights.do(key, fetch)
+        except Exception as e:
+            cache.counters.incr('upstream_errors')
+            return self.send_json(502, {'error': True, 'reason': f"Upstream unreachable: {e}"})
+        if shared:
+            cache.counters.incr('coalesced')
+        self.send_body(status, body, headers={'X-Cache': 'COALESCED' if shared else 'MISS'})
+
+
+def start_weather_cache_proxy(forecast_upstream=FORECAST_UPSTREAM, geocoding_upstream=GEOCODING_UPSTREAM,
+                              host='127.0.0.1', port=0, grid=DEFAULT_GRID, weather_ttl=DEFAULT_WEATHER_TTL,
+                              geocode_ttl=DEFAULT_GEOCODE_TTL, geocode_disk=None):
+    """Start the proxy on a background thread and return the server"""
+    return start_server(
+        WeatherCacheHandler, host, port,
+        forecast_upstream=forecast_upstream.rstrip('/'),
+        geocoding_upstream=geocoding_upstream.rstrip('/'),
+        grid=grid,
+        weather=ResponseCache(MemoryTier(max_entries=50000, ttl=weather_ttl)),
+        geocode=ResponseCache(MemoryTier(max_entries=50000, ttl=geocode_ttl),
+                              DiskTier(geocode_disk, ttl=geocode_ttl) if geocode_disk else None),
+        client=HttpClient(timeout=UPSTREAM_TIMEOUT, recorder=None),
+        flights=SingleFlight()
+    )
+
+
+def metro_projects(count, center, spread, places, seed):
+    """Projects scattered around one metro, each with lat/lon and a free-typed location string"""
+    rng = random.Random(seed)
+    projects = []
+    for _ in range(count):
+        city, state, postal = rng.choice(places)
+        location = rng.choice((f"{city}, {state}, {postal}", f"{city.upper()},{state} {postal}".replace(' ', '  ', 1),
+                               f"{city.lower()} , {state.lower()}, {postal}"))
+        projects.append({'lat': center[0] + rng.gauss(0, spread), 'lon': center[1] + rng.gauss(0, spread),
+                         'location': location})
+    return projects
+
+
+# Austin metro; nightly batches cluster around a handful of suburbs
+METRO_CENTER = (30.2672, -97.7431)
+METRO_PLACES = [('Austin', 'TX', '78701'), ('Austin', 'TX', '78745'), ('Round Rock', 'TX', '78664'),
+                ('Cedar Park', 'TX', '78613'), ('Pflugerville', 'TX', '78660'), ('Georgetown', 'TX', '78626'),
+                ('Leander', 'TX', '78641'), ('Kyle', 'TX', '78640'), ('Buda', 'TX', '78610'),
+                ('Lakeway', 'TX', '78734'), ('Manor', 'TX', '78653'), ('Dripping Springs', 'TX', '78620')]
+
+
+def weather_url(base_url, project):
+    """The URL getCurrentWeather builds for a project"""
+    return (f"{base_url}/v1/forecast?latitude={project['lat']}&longitude={project['lon']}"
+            f"&current_weather=true&temperature_unit=fahrenheit&timezone=auto")
+
+
+def geocode_url(base_url, project):
+    """The URL geocodeLocation builds for a project"""
+    return f"{base_url}/v1/search?{urlencode({'name': project['location'], 'count': 1, 'language': 'en', 'format': 'json'})}"
+
+
+def run_pass(client, urls, concurrency):
+    def fetch(url):
+        start = time.perf_counter()
+        status = client.get(url).status_code
+        return time.perf_counter() - start, status
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(fetch, urls))
+    elapsed = time.perf_counter() - start
+    latencies = sorted(latency for latency, _ in results)
+    return {
+        'elapsed_s': elapsed,
+        'errors': sum(status != 200 for _, status in results),
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'mean_ms': sum(latencies) / len(latencies) * 1000 if latencies else 0.0
+    }
+
+
+def run_bench(args):
+    """The Open-Meteo lookups a nightly batch makes, replayed direct, through a cold cache and a warm one
+
+    Only the weather share of generate-report (and the geocode share of geocode-project) is timed:
+    the requests are the ones lib/weather.js would send, not calls to the app routes themselves.
+    """
+    standin = start_openmeteo_standin(latency=args.latency, seed=args.seed)
+    upstream = server_url(standin)
+    proxy = start_weather_cache_proxy(upstream, upstream, grid=args.grid)
+    projects = metro_projects(args.projects, METRO_CENTER, args.spread, METRO_PLACES, args.seed)
+    client = HttpClient(pool_size=args.concurrency, recorder=None)
+    cells = {grid_cell(p['lat'], p['lon'], args.grid) for p in projects}
+    places = {normalize_place(p['location']) for p in projects}
+
+    print(f"🌦️  OPEN-METEO CACHE BENCHMARK")
+    print(f"📍 Proxy {server_url(proxy)} → stand-in {upstream} (latency {standin.latency})")
+    print(f"🏗️  {args.projects} projects around {METRO_CENTER} (σ {args.spread}°): {len(cells)} grid cells "
+          f"at {args.grid}°, {len(places)} distinct places; concurrency {args.concurrency}")
+
+    ok = True
+    print(f"\n   {'Open-Meteo lookup only':<28} {'pass':<7} {'total s':>8} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'upstream':>9}")
+    for kind, build in (('forecast (report weather)', weather_url), ('search (project geocode)', geocode_url)):
+        for label, base_url in (('direct', upstream), ('cold', server_url(proxy)), ('warm', server_url(proxy))):
+            before = sum(standin.counters.snapshot().values())
+            result = run_pass(client, [build(base_url, p) for p in projects], args.concurrency)
+            calls = sum(standin.counters.snapshot().values()) - before
+            ok &= result['errors'] == 0
+            print(f"   {kind:<28} {label:<7} {result['elapsed_s']:>8.2f} {result['mean_ms']:>8.1f} "
+                  f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {calls:>9}")
+
+    stats = {'weather': proxy.weather.stats(), 'geocode': proxy.geocode.stats()}
+    for kind, s in stats.items():
+        print(f"📊 {kind}: hit rate {s['hit_rate']:.1%}, {s.get('upstream_calls', 0)} upstream calls, "
+              f"{s.get('coalesced', 0)} coalesced, {s['upstream_seconds_saved']:.1f}s of upstream time saved")
+    proxy.shutdown()
+    standin.shutdown()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grid-bucketed caching proxy for Open-Meteo")
+    sub = parser.add_subparsers(dest='command')
+    for name in ('serve', 'bench'):
+        p = sub.add_parser(name)
+        p.add_argument('--grid', type=float, default=DEFAULT_GRID, help="Weather grid cell size in degrees")
+    serve = sub.choices['serve']
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve.add_argument('--forecast-upstream', default=FORECAST_UPSTREAM)
+    serve.add_argument('--geocoding-upstream', default=GEOCODING_UPSTREAM)
+    serve.add_argument('--weather-ttl', type=float, default=DEFAULT_WEATHER_TTL, help="Seconds")
+    serve.add_argument('--geocode-ttl', type=float, default=DEFAULT_GEOCODE_TTL, help="Seconds")
+    serve.add_argument('--geocode-disk', help="SQLite file that keeps geocodes across restarts")
+    bench = sub.choices['bench']
+    bench.add_argument('--projects', type=int, default=300)
+    bench.add_argument('--spread', type=float, default=0.15, help="Std dev of project lat/lon around the metro")
+    bench.add_argument('--concurrency', type=int, default=8)
+    bench.add_argument('--latency', default='lognormal:150,0.4', help="Stand-in latency")
+    bench.add_argument('--seed', type=int, default=0)
+    argv = sys.argv[1:]
+    if not argv or argv[0] not in sub.choices and argv[0] not in ('-h', '--help'):
+        argv = ['serve'] + argv
+    args = parser.parse_args(argv)
+
+    if args.command == 'bench':
+        return run_bench(args)
+
+    server = start_weather_cache_proxy(args.forecast_upstream, args.geocoding_upstream, args.host, args.port,
+                                       args.grid, args.weather_ttl, args.geocode_ttl, args.geocode_disk)
+    print(f"🌦️  Open-Meteo cache proxy listening on {server_url(server)}")
+    print(f"   Weather: {args.grid}° cells for {args.weather_ttl:g}s → {server.forecast_upstream}")
+    print(f"   Geocode: normalized places for {args.geocode_ttl:g}s → {server.geocoding_upstream}")
+    print(f"   Set OPEN_METEO_BASE_URL={server_url(server)} for the Next.js app")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)